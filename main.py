@@ -1,18 +1,66 @@
+import argparse
+
 from src.data_loader import load_cleaned_dataset_df
-from src.time_series_builder import build_time_series
-from src.sarima_model import train_sarima
+from src.time_series_builder import build_all_time_series, build_time_series
+from src.model_store import ModelStore
+from src.sarima_model import train_sarima, train_sarima_many
 
 STATE = "karnataka"
 CROP = "rice"
 
+parser = argparse.ArgumentParser()
+parser.add_argument(
+    "--all", action="store_true", help="Train a model for every state/crop series"
+)
+parser.add_argument(
+    "--workers", type=int, default=None, help="Worker processes for --all"
+)
+parser.add_argument(
+    "--incremental",
+    action="store_true",
+    help="With --all, update each series from its previous stored fit",
+)
+parser.add_argument(
+    "--auto-order",
+    action="store_true",
+    help="With --all, select each series' SARIMA order by AIC",
+)
+args = parser.parse_args()
+
 # Load data
 df = load_cleaned_dataset_df()
 print("✅ Dataset loaded")
 
-# Build time series
-series = build_time_series(df, STATE, CROP)
-print("📈 Time Series Ready")
+if args.all:
+    series_index = build_all_time_series(df)
+    print(f"📈 {len(series_index)} Time Series Ready")
+
+    fitted = skipped = failed = 0
+    results = train_sarima_many(
+        series_index,
+        workers=args.workers,
+        store=ModelStore(),
+        incremental=args.incremental,
+        auto_order=args.auto_order,
+    )
+    for result in results:
+        state, crop = result.key
+        if result.skipped:
+            skipped += 1
+        elif result.ok:
+            fitted += 1
+            print(f"  {state}/{crop}: fitted in {result.seconds:.2f}s")
+        else:
+            failed += 1
+            print(f"  {state}/{crop}: FAILED\n{result.error}")
+    print(
+        f"✅ SARIMA models trained: {fitted} fitted, {skipped} skipped, {failed} failed"
+    )
+else:
+    # Build time series
+    series = build_time_series(df, STATE, CROP)
+    print("📈 Time Series Ready")
 
-# Train SARIMA model
-model = train_sarima(series)
-print("✅ SARIMA model trained")
+    # Train SARIMA model
+    model = train_sarima(series)
+    print("✅ SARIMA model trained")
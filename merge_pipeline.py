@@ -1,32 +1,164 @@
+import argparse
 import os
+
+import numpy as np
 import pandas as pd
 
+from src.normalize import normalize_series
+
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 RAW_DIR = os.path.join(BASE_DIR, "data", "raw")
 PROCESSED_DIR = os.path.join(BASE_DIR, "data", "processed")
 
-os.makedirs(PROCESSED_DIR, exist_ok=True)
+INPUT_FILE = os.path.join(RAW_DIR, "Crop_production.csv")
+OUTPUT_FILE = os.path.join(PROCESSED_DIR, "cleaned_crop_data.csv")
+
+# values kept per column to estimate its median in streaming mode; columns
+# with at most this many values get their exact median
+RESERVOIR_SIZE = 100_000
+
+
+def _standardize(df):
+    # Drop unwanted column
+    if "Unnamed: 0" in df.columns:
+        df = df.drop(columns=["Unnamed: 0"])
+
+    # Standardize text columns
+    df["State_Name"] = normalize_series(df["State_Name"])
+    df["Crop"] = normalize_series(df["Crop"])
+    return df
+
+
+def clean_in_memory(input_path=INPUT_FILE, output_path=OUTPUT_FILE):
+    print("📥 Loading main dataset...")
+
+    df = pd.read_csv(input_path)
+
+    print("✅ Original shape:", df.shape)
+
+    df = _standardize(df)
+
+    # Handle missing values
+    df.fillna(df.median(numeric_only=True), inplace=True)
+
+    # Save cleaned data
+    df.to_csv(output_path, index=False)
+
+    print("✅ Cleaned dataset saved")
+    print("📊 Final shape:", df.shape)
+    return df.shape
+
+
+class StreamingMedian:
+    """Median estimate of a column seen in chunks, in bounded memory.
+
+    Keeps a uniform reservoir sample of at most `size` values (exact while
+    fewer values have been seen) and reports the sample median.
+    """
+
+    def __init__(self, size=RESERVOIR_SIZE, seed=0):
+        self.size = size
+        self.seen = 0
+        self.sample = np.empty(0)
+        self._rng = np.random.default_rng(seed)
+
+    def update(self, values):
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        room = self.size - len(self.sample)
+        if room > 0:
+            self.sample = np.concatenate([self.sample, values[:room]])
+            self.seen += min(room, len(values))
+            values = values[room:]
+        if len(values):
+            # reservoir sampling (Algorithm R), one draw per incoming value
+            positions = self.seen + np.arange(len(values))
+            slots = self._rng.integers(0, positions + 1)
+            keep = slots < self.size
+            self.sample[slots[keep]] = values[keep]
+            self.seen += len(values)
+
+    def median(self):
+        return float(np.median(self.sample)) if len(self.sample) else np.nan
+
+
+def _column_medians(input_path, chunksize, reservoir_size):
+    """First pass: streaming medians of the numeric columns.
+
+    Returns (medians, float_cols) where float_cols are numeric columns with
+    missing values, which the in-memory path would hold as floats.
+    """
+    estimators = {}
+    non_numeric = set()
+    has_missing = set()
+    for chunk in pd.read_csv(input_path, chunksize=chunksize):
+        chunk = chunk.drop(columns=["Unnamed: 0"], errors="ignore")
+        for col in chunk.columns:
+            if col in non_numeric:
+                continue
+            if not pd.api.types.is_numeric_dtype(chunk[col]):
+                if chunk[col].notna().any():
+                    non_numeric.add(col)
+                    estimators.pop(col, None)
+                    continue
+            if chunk[col].isna().any():
+                has_missing.add(col)
+            est = estimators.setdefault(col, StreamingMedian(reservoir_size))
+            est.update(pd.to_numeric(chunk[col], errors="coerce").to_numpy())
+    medians = pd.Series({c: est.median() for c, est in estimators.items()})
+    return medians.dropna(), sorted(has_missing & set(estimators))
+
+
+def clean_streaming(
+    input_path=INPUT_FILE,
+    output_path=OUTPUT_FILE,
+    chunksize=200_000,
+    reservoir_size=RESERVOIR_SIZE,
+):
+    """Clean the crop CSV in bounded memory.
 
-print("📥 Loading main dataset...")
+    Two passes over `input_path`: the first estimates the column medians
+    (see `StreamingMedian`), the second standardizes and fills each chunk
+    and appends it to the output. Peak memory depends on `chunksize` and
+    `reservoir_size`, not on the size of the file.
+    """
+    print("📥 Pass 1/2: computing column medians...")
+    medians, float_cols = _column_medians(input_path, chunksize, reservoir_size)
 
-df = pd.read_csv(os.path.join(RAW_DIR, "Crop_production.csv"))
+    print("🧹 Pass 2/2: cleaning and writing chunks...")
+    tmp = output_path + ".tmp"
+    rows = 0
+    n_cols = 0
+    for i, chunk in enumerate(pd.read_csv(input_path, chunksize=chunksize)):
+        chunk = _standardize(chunk)
+        for col in float_cols:
+            chunk[col] = chunk[col].astype(float)
+        chunk = chunk.fillna(medians)
+        chunk.to_csv(tmp, mode="w" if i == 0 else "a", header=i == 0, index=False)
+        rows += len(chunk)
+        n_cols = chunk.shape[1]
+    os.replace(tmp, output_path)
 
-print("✅ Original shape:", df.shape)
+    print("✅ Cleaned dataset saved")
+    print("📊 Final shape:", (rows, n_cols))
+    return rows, n_cols
 
-# Drop unwanted column
-if "Unnamed: 0" in df.columns:
-    df.drop(columns=["Unnamed: 0"], inplace=True)
 
-# Standardize text columns
-df["State_Name"] = df["State_Name"].str.lower().str.strip()
-df["Crop"] = df["Crop"].str.lower().str.strip()
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Process the input in chunks (bounded memory, two passes)",
+    )
+    parser.add_argument("--chunksize", type=int, default=200_000)
+    args = parser.parse_args(argv)
 
-# Handle missing values
-df.fillna(df.median(numeric_only=True), inplace=True)
+    os.makedirs(PROCESSED_DIR, exist_ok=True)
+    if args.stream:
+        return clean_streaming(chunksize=args.chunksize)
+    return clean_in_memory()
 
-# Save cleaned data
-output_path = os.path.join(PROCESSED_DIR, "cleaned_crop_data.csv")
-df.to_csv(output_path, index=False)
 
-print("✅ Cleaned dataset saved")
-print("📊 Final shape:", df.shape)
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,11 @@
 import os
+import numpy as np
 import pandas as pd
 
+from src.mapping_store import get_store
+from src.normalize import normalize_series, normalize_text
+from src.schemas import read_typed_csv
+
 BASE_DIR = os.path.dirname(os.path.dirname(__file__))
 RAW_DIR = os.path.join(BASE_DIR, "data", "raw")
 PROC_DIR = os.path.join(BASE_DIR, "data", "processed")
@@ -27,49 +32,152 @@ MONTHS = [
 # Optional external manual mapping CSV (state -> subdivision)
 MANUAL_MAP_FILE = os.path.join(PROC_DIR, "manual_state_to_subdivision.csv")
 
+# Seasons a crop_type can resolve to, in precedence order: the first season
+# with a keyword contained in the (lower-cased) crop_type wins, anything else
+# gets whole-year rainfall. Each season adds a `<season>_rain` column.
+SEASONS = [
+    ("kharif", ("kharif",), ["jun", "jul", "aug", "sep"]),
+    ("rabi", ("rabi",), ["oct", "nov", "dec", "jan", "feb", "mar"]),
+]
+
+# Optional CSV with extra seasons (columns: season, keywords, months; the
+# last two are comma-separated), e.g. summer/zaid, autumn, winter. Rows are
+# checked after the built-in seasons; a row reusing a built-in name
+# replaces it in place. Rows with a blank cell are skipped.
+SEASON_FILE = os.path.join(PROC_DIR, "season_definitions.csv")
+
 
 def load_manual_map(path):
     """Load manual mapping CSV with columns 'state' and 'subdivision'.
     Returns a dict mapping normalized state -> normalized subdivision, or None.
+
+    The parsed file is cached per path (see `src.mapping_store`), so repeated
+    calls only re-read it after it changed.
     """
-    if not os.path.exists(path):
+    store = get_store(path)
+    if not store.exists():
         return None
     try:
-        df = pd.read_csv(path)
-        if "state" not in df.columns or "subdivision" not in df.columns:
-            print(
-                f"WARN: Manual map file {path} missing required columns 'state' and 'subdivision'"
-            )
-            return None
-        # normalize and build dict
-        mapping = {}
-        for _, r in df.iterrows():
-            s = normalize_text(r["state"])
-            sub = normalize_text(r["subdivision"])
-            if pd.isna(s) or pd.isna(sub):
-                continue
-            mapping[s] = sub
-        return mapping
+        return store.load()
+    except ValueError as e:
+        print(f"WARN: Manual map file {path} {e}")
+        return None
     except Exception as e:
         print(f"WARN: Failed to load manual map {path}: {e}")
         return None
 
 
-def normalize_text(s):
-    if pd.isna(s):
-        return s
-    s = str(s).lower().strip()
-    s = s.replace("&", "and")
-    # remove punctuation except whitespace
-    s = "".join(ch if ch.isalnum() or ch.isspace() else " " for ch in s)
-    s = " ".join(s.split())
-    return s
+def load_seasons(path=None):
+    """Return the season table: built-in `SEASONS` plus rows from `path`."""
+    seasons = {name: (keywords, months) for name, keywords, months in SEASONS}
+    path = SEASON_FILE if path is None else path
+    if path and os.path.exists(path):
+        table = pd.read_csv(path, dtype=str)
+        for _, r in table.iterrows():
+            if r[["season", "keywords", "months"]].isna().any():
+                print(f"WARN: Skipping incomplete season definition in {path}")
+                continue
+            name = normalize_text(r["season"]).replace(" ", "_")
+            keywords = tuple(
+                k.strip().lower() for k in str(r["keywords"]).split(",") if k.strip()
+            )
+            months = [m.strip().lower() for m in str(r["months"]).split(",")]
+            unknown = set(months) - set(MONTHS)
+            if unknown or not keywords:
+                print(f"WARN: Skipping invalid season definition '{name}' in {path}")
+                continue
+            # a built-in season keeps its place in the precedence order
+            seasons[name] = (keywords, months)
+    return [(name, kw, months) for name, (kw, months) in seasons.items()]
+
+
+def assign_seasonal_rainfall(merged, seasons):
+    """Pick the seasonal rainfall column matching each row's crop_type.
+
+    Season resolution runs once per distinct crop_type value; rows then
+    select their value from the `<season>_rain` columns with one indexed
+    lookup, so there is no per-row Python code.
+    """
+    if "crop_type" in merged.columns:
+        crop_type = merged["crop_type"].astype(str).str.lower()
+    else:
+        crop_type = pd.Series("", index=merged.index)
+    codes, uniques = pd.factorize(crop_type)
+
+    columns = [f"{name}_rain" for name, _, _ in seasons] + ["whole_year_rain"]
+    fallback = len(columns) - 1
+    choice = np.full(len(uniques), fallback)
+    for u, ct in enumerate(uniques):
+        for i, (_, keywords, _) in enumerate(seasons):
+            if any(k in ct for k in keywords):
+                choice[u] = i
+                break
+
+    values = merged[columns].to_numpy(dtype=float)
+    rows = np.arange(len(merged))
+    return pd.Series(values[rows, choice[codes]], index=merged.index)
+
 
+# Used when no manual mapping CSV is available
+DEFAULT_MANUAL_MAP = {
+    "odisha": "orissa",
+    "puducherry": "tamil nadu",
+    "nagaland": "naga mani mizo tripura",
+    "manipur": "naga mani mizo tripura",
+    "mizoram": "naga mani mizo tripura",
+    "dadra and nagar haveli": "gujarat region",
+}
+
+
+def resolve_subdivisions(states, subdivisions, manual_map=None):
+    """Resolve each distinct (normalized) state to a rainfall subdivision.
+
+    Rules are tried in order on the unique states only: exact name match,
+    then the manual mapping (if it points at a known subdivision), then a
+    fuzzy match on the first subdivision containing the state name.
+
+    Returns a DataFrame with one row per distinct state and columns
+    `state_name`, `subdivision` (NaN if unresolved) and `match`
+    ('exact', 'manual', 'fuzzy' or None).
+    """
+    known = pd.unique(pd.Series(subdivisions).dropna())
+    known_set = set(known)
+    manual_map = manual_map or {}
+
+    rows = []
+    for state in pd.unique(pd.Series(states).dropna()):
+        if state in known_set:
+            rows.append((state, state, "exact"))
+        elif manual_map.get(state) in known_set:
+            rows.append((state, manual_map[state], "manual"))
+        else:
+            # look for any subdivision that contains this state_name as substring
+            # (choose the first candidate, best-effort)
+            match = next((sub for sub in known if state in sub), None)
+            rows.append((state, match, "fuzzy" if match is not None else None))
+    return pd.DataFrame(rows, columns=["state_name", "subdivision", "match"])
+
+
+def main(
+    crop_file=None,
+    rainfall_file=None,
+    out_file=None,
+    manual_map_file=None,
+    season_file=None,
+):
+    """Write the crop data joined with year and seasonal rainfall.
+
+    Paths default to the module constants (`CROP_FILE`, `RAINFALL_FILE`,
+    `OUT_FILE`, `MANUAL_MAP_FILE`, `SEASON_FILE`).
+    """
+    crop_file = crop_file or CROP_FILE
+    rainfall_file = rainfall_file or RAINFALL_FILE
+    out_file = out_file or OUT_FILE
+    manual_map_file = manual_map_file or MANUAL_MAP_FILE
 
-def main():
     print("Loading files...")
-    crop = pd.read_csv(CROP_FILE)
-    rain = pd.read_csv(RAINFALL_FILE)
+    crop = read_typed_csv(crop_file, project=False)
+    rain = read_typed_csv(rainfall_file, kind="rainfall")
 
     print("Normalizing columns and names...")
     crop.columns = crop.columns.str.strip().str.lower()
@@ -96,8 +204,8 @@ def main():
     # month columns are already lowercased; we'll ensure missing months are added later
 
     # normalize values for join
-    crop["state_name"] = crop["state_name"].apply(normalize_text)
-    rain["subdivision"] = rain["subdivision"].apply(normalize_text)
+    crop["state_name"] = normalize_series(crop["state_name"])
+    rain["subdivision"] = normalize_series(rain["subdivision"])
 
     # compute seasonal rainfall per row in rain
     print("Computing seasonal rainfall metrics (kharif/rabi/whole_year)...")
@@ -107,137 +215,48 @@ def main():
             rain[m] = 0
 
     # seasonal definitions
-    kharif = ["jun", "jul", "aug", "sep"]
-    rabi = ["oct", "nov", "dec", "jan", "feb", "mar"]
-    rain["kharif_rain"] = rain[kharif].sum(axis=1)
-    rain["rabi_rain"] = rain[rabi].sum(axis=1)
+    seasons = load_seasons(season_file)
+    for name, _, months in seasons:
+        rain[f"{name}_rain"] = rain[months].sum(axis=1)
     rain["whole_year_rain"] = rain[MONTHS].sum(axis=1)
+    rain_cols = [f"{name}_rain" for name, _, _ in seasons] + ["whole_year_rain"]
 
-    # keep only subdivision/year/kharif_rain/rabi_rain/whole_year_rain
-    rain_small = rain[
-        ["subdivision", "year", "kharif_rain", "rabi_rain", "whole_year_rain"]
-    ].drop_duplicates()
+    # keep only subdivision/year and the seasonal rainfall columns
+    rain_small = rain[["subdivision", "year"] + rain_cols].drop_duplicates()
 
-    # make a simple mapping try exact merge first
+    # resolve each distinct state to a subdivision once, then join once
     print("Merging datasets (state -> subdivision) ...")
-    merged = crop.merge(
-        rain_small, left_on="state_name", right_on="subdivision", how="left"
+    # prefer loading CSV mapping if present
+    csv_map = load_manual_map(manual_map_file)
+    if csv_map:
+        manual_map = csv_map
+        print(f"Loaded manual map from {manual_map_file} ({len(manual_map)} entries)")
+    else:
+        manual_map = DEFAULT_MANUAL_MAP
+
+    resolved = resolve_subdivisions(
+        crop["state_name"], rain_small["subdivision"], manual_map
     )
+    print("State -> subdivision matches by method:")
+    print(resolved["match"].value_counts(dropna=False).to_string())
 
-    missing_years = merged["year"].isna().sum()
-    print(f"Rows missing YEAR after exact match: {missing_years}")
-
-    if missing_years > 0:
-        # first try manual known mappings for problematic states
-        print("Applying manual state -> subdivision mappings for known mismatches...")
-        # prefer loading CSV mapping if present
-        csv_map = load_manual_map(MANUAL_MAP_FILE)
-        if csv_map:
-            manual_map = csv_map
-            print(
-                f"Loaded manual map from {MANUAL_MAP_FILE} ({len(manual_map)} entries)"
-            )
-        else:
-            manual_map = {
-                "odisha": "orissa",
-                "puducherry": "tamil nadu",
-                "nagaland": "naga mani mizo tripura",
-                "manipur": "naga mani mizo tripura",
-                "mizoram": "naga mani mizo tripura",
-                "dadra and nagar haveli": "gujarat region",
-            }
-        # map only where missing
-        need_map_idx = merged[merged["year"].isna()].index
-        merged.loc[need_map_idx, "subdivision_manual"] = merged.loc[
-            need_map_idx, "state_name"
-        ].map(manual_map)
-        # merge manual mapped subdivisions
-        merged = merged.merge(
-            rain_small,
-            left_on="subdivision_manual",
-            right_on="subdivision",
-            how="left",
-            suffixes=("", "_manual"),
-        )
-        # prefer existing year, then manual
-        if "year_manual" in merged.columns:
-            merged["year"] = merged["year"].fillna(merged["year_manual"])
-        merged["kharif_rain"] = merged["kharif_rain"].fillna(
-            merged.get("kharif_rain_manual")
-        )
-        merged["rabi_rain"] = merged["rabi_rain"].fillna(merged.get("rabi_rain_manual"))
-        merged["whole_year_rain"] = merged["whole_year_rain"].fillna(
-            merged.get("whole_year_rain_manual")
-        )
-        # drop helper manual cols
-        merged = merged.drop(
-            columns=[c for c in merged.columns if c.endswith("_manual")]
-        )
-
-        # try fuzzy: match where subdivision contains state_name or vice versa
-        still_missing_states = merged.loc[merged["year"].isna(), "state_name"].unique()
-        if len(still_missing_states) > 0:
-            print("Trying fuzzy matches for remaining unmatched states...")
-            corrections = {}
-            for s in still_missing_states:
-                # look for any subdivision that contains this state_name as substring
-                candidates = rain_small[
-                    rain_small["subdivision"].str.contains(s, na=False)
-                ]["subdivision"].unique()
-                if len(candidates) == 1:
-                    corrections[s] = candidates[0]
-                elif len(candidates) > 1:
-                    # choose the first candidate (best-effort)
-                    corrections[s] = candidates[0]
-
-            if corrections:
-                print(
-                    f"Found fuzzy matches for {len(corrections)} states. Applying corrections..."
-                )
-                merged["subdivision_fuzzy"] = merged["state_name"].map(corrections)
-                # merge where subdivision_fuzzy is set (match on subdivision only to bring fuzzy year/rain)
-                merged = merged.merge(
-                    rain_small,
-                    left_on=["subdivision_fuzzy"],
-                    right_on=["subdivision"],
-                    how="left",
-                    suffixes=("", "_fuzzy"),
-                )
-                # prefer exact year, then fuzzy
-                if "year_fuzzy" in merged.columns:
-                    merged["year"] = merged["year"].fillna(merged["year_fuzzy"])
-                merged["kharif_rain"] = merged["kharif_rain"].fillna(
-                    merged.get("kharif_rain_fuzzy")
-                )
-                merged["rabi_rain"] = merged["rabi_rain"].fillna(
-                    merged.get("rabi_rain_fuzzy")
-                )
-                merged["whole_year_rain"] = merged["whole_year_rain"].fillna(
-                    merged.get("whole_year_rain_fuzzy")
-                )
-                merged = merged.drop(
-                    columns=[c for c in merged.columns if c.endswith("_fuzzy")]
-                )
+    lookup = resolved.set_index("state_name")["subdivision"]
+    crop["subdivision"] = crop["state_name"].map(lookup)
+    # unresolved states have a NaN key; never let it join NaN subdivisions
+    merged = crop.merge(
+        rain_small.dropna(subset=["subdivision"]), on="subdivision", how="left"
+    )
 
     # Now, assign seasonal rainfall to each crop row based on crop_type
-    def pick_seasonal_rain(row):
-        ct = str(row.get("crop_type", "")).lower()
-        if "kharif" in ct:
-            return row.get("kharif_rain")
-        if "rabi" in ct:
-            return row.get("rabi_rain")
-        # fallback to whole_year
-        return row.get("whole_year_rain")
-
-    merged["seasonal_rainfall"] = merged.apply(pick_seasonal_rain, axis=1)
+    merged["seasonal_rainfall"] = assign_seasonal_rainfall(merged, seasons)
 
     # Count still missing years
     still_missing = merged["year"].isna().sum()
     print(f"Remaining rows missing YEAR after fuzzy attempts: {still_missing}")
 
     # Save result
-    print(f"Saving merged dataset to: {OUT_FILE}")
-    merged.to_csv(OUT_FILE, index=False)
+    print(f"Saving merged dataset to: {out_file}")
+    merged.to_csv(out_file, index=False)
     print(
         "Done. Review the CSV and run tests; if many rows are missing YEAR, we should add a manual mapping table."
     )
@@ -0,0 +1,104 @@
+"""Prebuilt lookup tables for tolerant state/crop name matching.
+
+`AliasIndex` is built once from the distinct names of a dataset column and
+answers the questions the UI used to answer by scanning every name:
+
+- `match(value)`: the canonical name for a typed or stale value, tried as
+  an exact normalized form, a known alias, a name containing the value,
+  a name contained in the value, then a name containing one of its tokens;
+- `search(query)`: every name containing the query (or matching it as an
+  alias), for search boxes.
+
+All substrings of every normalized name are indexed up front, so a lookup
+costs a few dictionary hits that depend on the length of the value, not
+on the number of names. When several names qualify, the first in sorted
+order wins, as with the scans it replaces.
+
+Aliases map other spellings to names: for states, the rainfall
+subdivisions of `manual_state_to_subdivision.csv` (and the built-in
+defaults of `add_year_month`), e.g. "orissa" -> "odisha". An alias never
+shadows a real name, and an alias shared by several names is ignored.
+"""
+
+from src.add_year_month import DEFAULT_MANUAL_MAP, MANUAL_MAP_FILE, load_manual_map
+from src.normalize import normalize_text
+
+
+def _substrings(text):
+    n = len(text)
+    return {text[i:j] for i in range(n) for j in range(i + 1, n + 1)}
+
+
+class AliasIndex:
+    """Tolerant lookups of canonical names (see module docstring)."""
+
+    def __init__(self, names, aliases=()):
+        """`aliases` holds (alias, name) pairs (or an {alias: name} dict)."""
+        self.names = sorted({str(n) for n in names})
+        by_norm = {}
+        for name in self.names:
+            norm = normalize_text(name)
+            if norm:
+                by_norm.setdefault(norm, name)
+        self._exact = dict(by_norm)
+
+        # alias (normalized) -> canonical, only where it is unambiguous
+        targets = {}
+        if isinstance(aliases, dict):
+            aliases = aliases.items()
+        for alias, target in aliases:
+            alias, target = normalize_text(alias), normalize_text(target)
+            if alias and target in by_norm and alias not in by_norm:
+                targets.setdefault(alias, set()).add(by_norm[target])
+        self._alias = {a: t.pop() for a, t in targets.items() if len(t) == 1}
+
+        # substring -> canonical names whose normalized form contains it
+        self._containing = {}
+        for norm, name in sorted(by_norm.items(), key=lambda kv: kv[1]):
+            for sub in _substrings(norm):
+                self._containing.setdefault(sub, []).append(name)
+
+    def __len__(self):
+        return len(self.names)
+
+    def match(self, value):
+        """Return the canonical name closest to `value`, or None."""
+        norm = normalize_text(value)
+        if not isinstance(norm, str) or not norm:
+            return None
+        # 1) exact after normalization, then a known alias
+        found = self._exact.get(norm) or self._alias.get(norm)
+        if found:
+            return found
+        # 2) a name containing the value, or contained in it
+        candidates = list(self._containing.get(norm, ()))
+        candidates += [
+            self._exact[sub] for sub in _substrings(norm) if sub in self._exact
+        ]
+        if candidates:
+            return min(candidates)
+        # 3) a name containing one of the value's tokens
+        candidates = [
+            names[0]
+            for tok in norm.split()
+            for names in [self._containing.get(tok)]
+            if names
+        ]
+        return min(candidates) if candidates else None
+
+    def search(self, query):
+        """Names containing `query` (all names for an empty query), sorted."""
+        norm = normalize_text(query)
+        if not isinstance(norm, str) or not norm:
+            return list(self.names)
+        found = set(self._containing.get(norm, ()))
+        if norm in self._alias:
+            found.add(self._alias[norm])
+        return sorted(found)
+
+
+def load_state_aliases(path=None):
+    """(alias, state) pairs from the manual subdivision map and its defaults."""
+    mapping = dict(DEFAULT_MANUAL_MAP)
+    mapping.update(load_manual_map(path or MANUAL_MAP_FILE) or {})
+    return [(subdivision, state) for state, subdivision in mapping.items()]
@@ -0,0 +1,104 @@
+"""Rolling-origin (expanding window) backtests of the SARIMA model.
+
+For every series the model is estimated once, on the first `initial`
+observations. The forecast origin is then rolled forward one observation
+at a time by extending the fitted results with the next observation
+(`results.extend`), which updates the Kalman filter state from where it
+stopped instead of running a new MLE fit. At each origin the next `horizon`
+steps are forecast and compared with what actually happened.
+
+Origins of one series form a chain of cheap state updates and run in
+order; series are spread over a process pool. `summarize_backtest` turns
+the per-forecast errors into one metrics table per horizon.
+"""
+
+import traceback
+
+import numpy as np
+import pandas as pd
+
+from src import evaluation, sarima_model
+
+BACKTEST_COLUMNS = ["state", "crop", "origin", "horizon", "actual", "forecast"]
+
+
+def _backtest_one(key, series, horizon, initial, store):
+    """Return (rows, error) for one series; error is a traceback or None."""
+    try:
+        values = np.asarray(series, dtype=float)
+        state, crop = key
+        if len(values) <= initial:
+            return [], None
+        res = sarima_model.train_sarima(values[:initial], store=store)
+        rows = []
+        for origin in range(initial, len(values)):
+            predicted = np.asarray(res.forecast(steps=horizon), dtype=float)
+            actual = values[origin : origin + horizon]
+            for h, a in enumerate(actual, start=1):
+                rows.append((state, crop, origin, h, a, predicted[h - 1]))
+            res = res.extend(values[origin : origin + 1])
+        return rows, None
+    except Exception:
+        return [], traceback.format_exc()
+
+
+def backtest_many(series_iter, horizon=3, initial=None, workers=None, store=None):
+    """Backtest every (key, series) pair from `series_iter`.
+
+    Keys are (state, crop) pairs, as yielded by a `SeriesIndex`. The model
+    is estimated on the first `initial` observations (default and minimum:
+    `sarima_model.MIN_OBSERVATIONS`) and every later observation is used as
+    a forecast origin. Series too short for that are skipped; failures are
+    reported and skipped without aborting the run.
+
+    Returns a DataFrame with columns `BACKTEST_COLUMNS`, one row per
+    (series, origin, horizon) whose actual value is known.
+    """
+    initial = max(initial or 0, sarima_model.MIN_OBSERVATIONS)
+    rows = []
+
+    def items():
+        for key, series in series_iter:
+            if len(series) <= initial:
+                yield key, None
+            else:
+                yield key, (key, series, horizon, initial, store)
+
+    def broken(key, error):
+        return [], error
+
+    results = sarima_model.bounded_map(_backtest_one, items(), workers, on_error=broken)
+    for key, result in results:
+        series_rows, error = result or ([], None)
+        if error:
+            print(f"WARN: Backtest failed for {key}:\n{error}")
+        rows.extend(series_rows)
+    return pd.DataFrame(rows, columns=BACKTEST_COLUMNS)
+
+
+def summarize_backtest(errors):
+    """Aggregate backtest rows into one metrics row per horizon.
+
+    Forecasts of each horizon become one NaN-padded row of a 2-D array, so
+    all horizons are scored in a single `evaluation.evaluate_many` call.
+    """
+    columns = ["horizon", "n", "rmse", "mae", "mape", "smape"]
+    if errors.empty:
+        return pd.DataFrame(columns=columns)
+    wide = errors.assign(pos=errors.groupby("horizon").cumcount())
+    actual = wide.pivot(index="horizon", columns="pos", values="actual")
+    predicted = wide.pivot(index="horizon", columns="pos", values="forecast")
+    metrics = evaluation.evaluate_many(actual.to_numpy(), predicted.to_numpy())
+    out = pd.DataFrame({"horizon": actual.index, "n": actual.notna().sum(axis=1)})
+    for name, values in metrics.items():
+        out[name] = values
+    return out.reset_index(drop=True)[columns]
+
+
+if __name__ == "__main__":
+    from src.data_loader import load_cleaned_dataset_df
+    from src.time_series_builder import build_all_time_series
+
+    series_index = build_all_time_series(load_cleaned_dataset_df())
+    errors = backtest_many(series_index)
+    print(summarize_backtest(errors).to_string(index=False))
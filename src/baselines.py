@@ -0,0 +1,142 @@
+"""Vectorized baseline forecasters for many short series at once.
+
+`train_sarima` needs at least `MIN_OBSERVATIONS` points; for the many
+state/crop pairs with less history these simple methods still give a
+forecast. All of them work on a 2-D float array with one series per row,
+right-aligned and left-padded with NaN (see `pad_series`), so forecasting
+thousands of series is a handful of NumPy operations rather than a Python
+loop per series:
+
+- naive: repeat the last observation
+- seasonal naive: repeat the last full season (naive if shorter than one)
+- drift: extend the line through the first and last observations
+- ses: simple exponential smoothing
+- holt: Holt's linear trend method
+
+Smoothing parameters of `ses` and `holt` are picked per series from a small
+grid by one-step-ahead squared error, evaluated for all series and all grid
+points in the same pass.
+"""
+
+import numpy as np
+
+METHODS = ("naive", "seasonal_naive", "drift", "ses", "holt")
+SMOOTHING_GRID = np.linspace(0.05, 0.95, 19)
+TREND_GRID = np.linspace(0.05, 0.95, 10)
+
+
+def pad_series(series_list):
+    """Stack 1-D series into a right-aligned, NaN-left-padded 2-D array.
+
+    Returns (values, lengths). Values inside a series may not be NaN.
+    """
+    arrays = [np.asarray(s, dtype=float).ravel() for s in series_list]
+    lengths = np.array([len(a) for a in arrays], dtype=int)
+    width = int(lengths.max()) if len(arrays) else 0
+    values = np.full((len(arrays), width), np.nan)
+    for i, a in enumerate(arrays):
+        if len(a):
+            values[i, width - len(a) :] = a
+    return values, lengths
+
+
+def _lengths(values):
+    return np.count_nonzero(~np.isnan(values), axis=1)
+
+
+def _horizon(steps):
+    return np.arange(1, steps + 1, dtype=float)
+
+
+def naive(values, steps):
+    return np.repeat(values[:, -1:], steps, axis=1)
+
+
+def seasonal_naive(values, steps, season_length=4):
+    width = values.shape[1]
+    m = min(season_length, width)
+    cols = width - m + (np.arange(steps) % m)
+    out = values[:, cols] if width else np.full((len(values), steps), np.nan)
+    short = _lengths(values) < season_length
+    out[short] = naive(values[short], steps)
+    return out
+
+
+def drift(values, steps):
+    lengths = _lengths(values)
+    rows = np.arange(len(values))
+    first = values[rows, values.shape[1] - np.maximum(lengths, 1)]
+    last = values[:, -1]
+    slope = np.where(lengths > 1, (last - first) / np.maximum(lengths - 1, 1), 0.0)
+    return last[:, None] + slope[:, None] * _horizon(steps)
+
+
+def ses(values, steps, alpha=None):
+    """Simple exponential smoothing; `alpha=None` picks it per series."""
+    alphas = SMOOTHING_GRID if alpha is None else np.atleast_1d(float(alpha))
+    n = len(values)
+    level = np.full((n, len(alphas)), np.nan)
+    sse = np.zeros((n, len(alphas)))
+    for t in range(values.shape[1]):
+        obs = values[:, t : t + 1]
+        seen = ~np.isnan(level)
+        has_obs = ~np.isnan(obs)
+        err = np.where(seen & has_obs, obs - level, 0.0)
+        sse += err**2
+        updated = np.where(seen, level + alphas * err, obs)
+        level = np.where(has_obs, updated, level)
+    rows = np.arange(n)
+    best = np.argmin(sse, axis=1)
+    return np.repeat(level[rows, best][:, None], steps, axis=1)
+
+
+def holt(values, steps, alpha=None, beta=None):
+    """Holt's linear trend method; `alpha`/`beta=None` pick them per series."""
+    alphas = SMOOTHING_GRID if alpha is None else np.atleast_1d(float(alpha))
+    betas = TREND_GRID if beta is None else np.atleast_1d(float(beta))
+    a, b = (g.ravel() for g in np.meshgrid(alphas, betas, indexing="ij"))
+    n = len(values)
+    level = np.full((n, len(a)), np.nan)
+    trend = np.full((n, len(a)), np.nan)
+    sse = np.zeros((n, len(a)))
+    for t in range(values.shape[1]):
+        obs = values[:, t : t + 1]
+        has_obs = ~np.isnan(obs)
+        first = has_obs & np.isnan(level)
+        second = has_obs & ~np.isnan(level) & np.isnan(trend)
+        steady = has_obs & ~np.isnan(trend)
+
+        err = np.where(steady, obs - (level + trend), 0.0)
+        sse += err**2
+        new_level = np.where(steady, level + trend + a * err, level)
+        new_trend = np.where(steady, trend + a * b * err, trend)
+        # initialize level on the first observation, trend on the second
+        new_trend = np.where(second, obs - level, new_trend)
+        new_level = np.where(first | second, obs, new_level)
+        level, trend = new_level, new_trend
+    trend = np.nan_to_num(trend)
+    rows = np.arange(n)
+    best = np.argmin(sse, axis=1)
+    return level[rows, best][:, None] + trend[rows, best][:, None] * _horizon(steps)
+
+
+def forecast_baselines(series_list, steps=5, methods=METHODS, season_length=4):
+    """Forecast every series in `series_list` with each baseline method.
+
+    Returns a dict mapping method name to an (n_series, steps) array.
+    Empty series forecast NaN.
+    """
+    unknown = set(methods) - set(METHODS)
+    if unknown:
+        raise ValueError(f"Unknown baseline methods: {', '.join(sorted(unknown))}")
+    values, _ = pad_series(series_list)
+    if values.shape[1] == 0:
+        return {m: np.full((len(values), steps), np.nan) for m in methods}
+    funcs = {
+        "naive": naive,
+        "seasonal_naive": lambda v, h: seasonal_naive(v, h, season_length),
+        "drift": drift,
+        "ses": ses,
+        "holt": holt,
+    }
+    return {m: funcs[m](values, steps) for m in methods}
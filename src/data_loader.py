@@ -1,13 +1,160 @@
-import pandas as pd
+import hashlib
+import json
 import os
 
+from src.parquet_dataset import (
+    filter_frame,
+    matches_source,
+    partition_values,
+    read_index,
+    read_partitioned,
+)
+from src.schemas import read_typed_csv
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except Exception:
+    pa = None
+    pq = None
+
 BASE_DIR = os.path.dirname(os.path.dirname(__file__))
 DATA_DIR = os.path.join(BASE_DIR, "data")
 PROCESSED_DIR = os.path.join(DATA_DIR, "processed")
+# partitioned Parquet copy of final_dataset.csv (see merge_datasets)
+FINAL_DATASET_DIR = "final_dataset"
+
+# Parquet sidecars live next to the CSV they mirror, e.g.
+# cleaned_crop_data_with_year.csv -> cleaned_crop_data_with_year.cache.parquet
+CACHE_SUFFIX = ".cache.parquet"
+_CACHE_META_KEY = b"crop_yield_source"
+# bumped when the way CSVs are parsed changes, so older sidecars are rebuilt
+_CACHE_FORMAT = 2
+
+
+def _cache_path(csv_path):
+    root, _ = os.path.splitext(csv_path)
+    return root + CACHE_SUFFIX
+
+
+def _file_digest(path, chunk_size=1 << 20):
+    """Return the sha256 hex digest of a file, read in fixed-size chunks."""
+    h = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(chunk_size), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _read_cache_meta(cache_path):
+    """Return the source metadata stored in a sidecar, or None if unusable."""
+    if not os.path.exists(cache_path):
+        return None
+    try:
+        meta = pq.read_schema(cache_path).metadata or {}
+        return json.loads(meta[_CACHE_META_KEY])
+    except Exception:
+        return None
+
+
+def _write_cache(df, cache_path, stat, digest):
+    """Write df to a Parquet sidecar atomically; failures are non-fatal."""
+    tmp = cache_path + ".tmp"
+    try:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        source = {
+            "format": _CACHE_FORMAT,
+            "mtime_ns": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "sha256": digest,
+        }
+        meta = dict(table.schema.metadata or {})
+        meta[_CACHE_META_KEY] = json.dumps(source).encode("utf-8")
+        pq.write_table(table.replace_schema_metadata(meta), tmp)
+        os.replace(tmp, cache_path)
+    except Exception as e:
+        print(f"WARN: Could not write dataset cache {cache_path}: {e}")
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+def read_csv_cached(path, use_cache: bool = True):
+    """Read a CSV through its Parquet sidecar cache.
+
+    The sidecar is reused while the source CSV keeps the same mtime and size,
+    or, if those changed, the same content hash. Otherwise the CSV is parsed
+    again and the sidecar rewritten. Without pyarrow there is no sidecar.
+    CSVs are parsed with the dtypes of their schema (`src.schemas`).
+    """
+    if not use_cache or pq is None:
+        return read_typed_csv(path, project=False)
+
+    stat = os.stat(path)
+    cache_path = _cache_path(path)
+    meta = _read_cache_meta(cache_path)
+    if meta is not None and meta.get("format") != _CACHE_FORMAT:
+        meta = None
+    digest = None
+
+    if meta is not None:
+        same_stat = (
+            meta.get("mtime_ns") == stat.st_mtime_ns
+            and meta.get("size") == stat.st_size
+        )
+        if same_stat:
+            return pq.read_table(cache_path).to_pandas()
+        digest = _file_digest(path)
+        if meta.get("sha256") == digest:
+            df = pq.read_table(cache_path).to_pandas()
+            # content unchanged (e.g. touched): refresh the recorded mtime
+            _write_cache(df, cache_path, stat, digest)
+            return df
+
+    df = read_typed_csv(path, project=False)
+    _write_cache(df, cache_path, stat, digest or _file_digest(path))
+    return df
+
+
+def load_final_dataset(use_cache: bool = True, states=None, crops=None, columns=None):
+    """Load the final dataset, optionally only some states, crops and columns.
+
+    Reads the partitioned Parquet dataset `data/final_dataset/` when it
+    is a current copy of `final_dataset.csv`, opening only the matching
+    partitions and columns (see `src.parquet_dataset`); otherwise reads
+    the CSV and filters it in memory. Names in `states`/`crops` may use
+    any spelling `normalize_text` maps together.
+    """
+    root = _final_partitions()
+    if use_cache and pq is not None and root is not None:
+        return read_partitioned(root, states=states, crops=crops, columns=columns)
+    df = read_csv_cached(os.path.join(DATA_DIR, "final_dataset.csv"), use_cache)
+    return filter_frame(df, states=states, crops=crops, columns=columns)
+
+
+def _final_partitions():
+    """The partitioned final dataset's root, or None if missing or stale.
+
+    The copy is stale when final_dataset.csv was rewritten after it (e.g.
+    by a run without pyarrow); without the CSV the copy is all there is.
+    """
+    root = os.path.join(DATA_DIR, FINAL_DATASET_DIR)
+    index = read_index(root)
+    if index is None:
+        return None
+    csv_path = os.path.join(DATA_DIR, "final_dataset.csv")
+    if os.path.exists(csv_path) and not matches_source(index, csv_path):
+        return None
+    return root
 
 
-def load_final_dataset():
-    return pd.read_csv(os.path.join(DATA_DIR, "final_dataset.csv"))
+def final_dataset_states():
+    """States present in the final dataset, without loading its rows if possible."""
+    root = _final_partitions()
+    index = read_index(root) if root is not None else None
+    if index is not None and "state_name" in index["partition_by"]:
+        return partition_values(root, "state_name")
+    df = load_final_dataset(columns=["state_name"])
+    return sorted(df["state_name"].dropna().astype(str).unique())
 
 
 def _cleaned_paths():
@@ -16,20 +163,21 @@ def _cleaned_paths():
     return cleaned, enriched
 
 
-def load_cleaned_dataset(prefer_enriched: bool = True):
+def load_cleaned_dataset(prefer_enriched: bool = True, use_cache: bool = True):
     """Load cleaned crop dataset.
 
     Returns (df, source) where source is 'enriched' or 'cleaned'.
     If prefer_enriched=True and the enriched file exists it will be used.
+    Parsed CSVs are cached in a Parquet sidecar (see `read_csv_cached`).
     """
     cleaned_path, enriched_path = _cleaned_paths()
 
     if prefer_enriched and os.path.exists(enriched_path):
-        df = pd.read_csv(enriched_path)
+        df = read_csv_cached(enriched_path, use_cache)
         return df, "enriched"
 
     if os.path.exists(cleaned_path):
-        df = pd.read_csv(cleaned_path)
+        df = read_csv_cached(cleaned_path, use_cache)
         return df, "cleaned"
 
     raise FileNotFoundError(
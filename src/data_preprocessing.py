@@ -1,6 +1,26 @@
+import pandas as pd
+
+from src.normalize import normalize_series, normalize_text
+
+
+def _names(col):
+    """Normalized name column; categorical columns (typed reads) stay categorical."""
+    if isinstance(col.dtype, pd.CategoricalDtype):
+        return normalize_series(col)
+    return normalize_series(col.astype(str))
+
+
 def prepare_sarima_series(df, state, crop):
-    # Normalize column names
-    df.columns = df.columns.str.strip().str.lower()
+    """Return the yearly production Series of one state/crop pair.
+
+    `df` is not modified: columns are matched on their stripped, lower-cased
+    names without renaming the caller's frame, and only the matching rows
+    of the year and production columns are copied.
+    """
+    # normalized column name -> original column
+    names = {}
+    for c in df.columns:
+        names.setdefault(str(c).strip().lower(), c)
 
     # find columns
     def find_col(cols, candidates):
@@ -16,7 +36,7 @@ def prepare_sarima_series(df, state, crop):
                     return c
         return None
 
-    cols = list(df.columns)
+    cols = list(names)
     state_col = find_col(cols, ["state_name", "state"])
     crop_col = find_col(cols, ["crop"])
     year_col = find_col(cols, ["year"])
@@ -28,31 +48,49 @@ def prepare_sarima_series(df, state, crop):
         )
 
     # filter (case-insensitive)
-    filtered = df[
-        (df[state_col].astype(str).str.lower() == state.lower())
-        & (df[crop_col].astype(str).str.lower() == crop.lower())
-    ]
+    mask = (_names(df[names[state_col]]) == normalize_text(state)) & (
+        _names(df[names[crop_col]]) == normalize_text(crop)
+    )
 
-    if filtered.empty:
+    if not mask.any():
         raise Exception("No data for selected State & Crop")
 
-    # ensure year is integer index (work on a copy to avoid SettingWithCopyWarning)
-    filtered = filtered.copy()
-    filtered.loc[:, year_col] = filtered[year_col].astype(float).astype(int)
+    # ensure year is integer index
+    years = df[names[year_col]][mask].astype(float).astype(int).rename(year_col)
 
     # ensure production column is numeric (raise on invalid values)
-    import pandas as pd
-
     try:
-        filtered.loc[:, prod_col] = pd.to_numeric(filtered[prod_col], errors="raise")
+        values = pd.to_numeric(df[names[prod_col]][mask], errors="raise")
     except Exception:
         raise Exception("Production column contains non-numeric values")
 
-    ts = filtered.groupby(year_col)[prod_col].sum().sort_index()
+    ts = values.rename(prod_col).groupby(years).sum().sort_index()
 
     return ts
 
 
+def _project(columns):
+    """Build a DataFrame over existing columns without copying them.
+
+    `columns` maps output names to Series or arrays of equal length. Series
+    contribute their values (not their index) and the result gets a fresh
+    RangeIndex, so no `reset_index` copy is needed afterwards.
+    """
+    n = len(next(iter(columns.values()))) if columns else 0
+    return pd.DataFrame(
+        {name: getattr(col, "array", col) for name, col in columns.items()},
+        index=pd.RangeIndex(n),
+        copy=False,
+    )
+
+
+def _first_rows(df, key):
+    """Rows of `df` whose `key` value appears for the first time, reindexed."""
+    out = df[~df[key].duplicated()]
+    out.index = pd.RangeIndex(len(out))
+    return out
+
+
 # New helper: clean_data
 def clean_data(df):
     """Normalize a dataset (crop, rainfall, fertilizer, temperature) into a common structure.
@@ -64,13 +102,21 @@ def clean_data(df):
     - crop production: contains 'year' and production columns
 
     Returns a dataframe with standardized column names tailored to input content.
+
+    `df` is never modified. The result is a projection: columns passed through
+    unchanged (measures, and year when already integer) share memory with
+    `df`; only derived columns (normalized names, computed values) are new.
+    Copy the result before writing into those shared columns in place.
     """
 
-    df = df.copy()
-    # normalize column names
-    df.columns = df.columns.str.strip().str.lower()
+    # normalized column name -> original column (first one wins)
+    names = {}
+    for c in df.columns:
+        names.setdefault(str(c).strip().lower(), c)
+    cols = set(names)
 
-    cols = set(df.columns)
+    def col(name):
+        return df[names[name]]
 
     months = {
         "jan",
@@ -89,113 +135,88 @@ def clean_data(df):
 
     # Fertilizer dataset
     if {"n", "p", "k"}.issubset(cols) and "crop" in cols:
-        df["crop"] = df["crop"].astype(str).str.lower().str.strip()
         # keep only relevant columns
-        keep = ["crop"] + [c for c in ["n", "p", "k", "ph"] if c in df.columns]
-        return df[keep].drop_duplicates(subset=["crop"]).reset_index(drop=True)
+        out = {"crop": _names(col("crop"))}
+        out.update({c: col(c) for c in ["n", "p", "k", "ph"] if c in cols})
+        return _first_rows(_project(out), "crop")
 
     # Temperature dataset (monthly columns present)
     if months.intersection(cols):
         # identify state column (first non-month column)
-        state_col = None
-        for c in df.columns:
-            if c not in months:
-                state_col = c
-                break
+        state_col = next((c for c in names if c not in months), None)
         if state_col is None:
             # fallback to first column
-            state_col = df.columns[0]
+            state_col = next(iter(names))
         # compute row-wise mean across months present
-        month_cols = [c for c in df.columns if c in months]
-        df["temperature"] = df[month_cols].astype(float).mean(axis=1)
-        df["state_name"] = (
-            df[state_col].astype(str).str.lower().str.replace("\n", " ").str.strip()
-        )
-        return (
-            df[["state_name", "temperature"]]
-            .drop_duplicates(subset=["state_name"])
-            .reset_index(drop=True)
-        )
+        month_cols = [names[c] for c in names if c in months]
+        out = {
+            "state_name": _names(col(state_col)),
+            "temperature": df[month_cols].astype(float).mean(axis=1),
+        }
+        return _first_rows(_project(out), "state_name")
 
     # Rainfall / Final dataset (contains 'rainfall')
     if "rainfall" in cols:
         # ensure state and crop columns
-        state_col = None
-        for c in ["state_name", "state"]:
-            if c in df.columns:
-                state_col = c
-                break
+        state_col = next((c for c in ["state_name", "state"] if c in cols), None)
         if not state_col:
             # try to find a column containing 'state'
-            for c in df.columns:
-                if "state" in c:
-                    state_col = c
-                    break
-        crop_col = None
-        for c in ["crop", "crop_name"]:
-            if c in df.columns:
-                crop_col = c
-                break
+            state_col = next((c for c in names if "state" in c), None)
+        crop_col = next((c for c in ["crop", "crop_name"] if c in cols), None)
         if not crop_col:
-            for c in df.columns:
-                if "crop" in c:
-                    crop_col = c
-                    break
+            crop_col = next((c for c in names if "crop" in c), None)
         # normalize
+        derived = {}
         if state_col:
-            df["state_name"] = df[state_col].astype(str).str.lower().str.strip()
+            derived["state_name"] = _names(col(state_col))
         if crop_col:
-            df["crop"] = df[crop_col].astype(str).str.lower().str.strip()
+            derived["crop"] = _names(col(crop_col))
         # keep commonly relevant columns
         keep = [
-            c
-            for c in [
-                "state_name",
-                "crop",
-                "crop_type",
-                "rainfall",
-                "area_in_hectares",
-                "production_in_tons",
-                "yield_ton_per_hec",
-                "temperature",
-            ]
-            if c in df.columns
+            "state_name",
+            "crop",
+            "crop_type",
+            "rainfall",
+            "area_in_hectares",
+            "production_in_tons",
+            "yield_ton_per_hec",
+            "temperature",
         ]
-        return df[[c for c in keep if c in df.columns]].reset_index(drop=True)
+        out = {}
+        for c in keep:
+            if c in derived:
+                out[c] = derived[c]
+            elif c in cols:
+                out[c] = col(c)
+        return _project(out)
 
     # Generic crop production dataset (has year and production)
     if "year" in cols and any(
         k in cols for k in ["production", "production_in_tons", "production_tons"]
     ):
         # find production column
-        prod_col = None
-        for c in ["production", "production_in_tons", "production_tons"]:
-            if c in df.columns:
-                prod_col = c
-                break
-        state_col = None
-        for c in ["state_name", "state"]:
-            if c in df.columns:
-                state_col = c
-                break
-        crop_col = None
-        for c in ["crop", "crop_name"]:
-            if c in df.columns:
-                crop_col = c
-                break
+        prod_col = next(
+            c
+            for c in ["production", "production_in_tons", "production_tons"]
+            if c in cols
+        )
+        state_col = next((c for c in ["state_name", "state"] if c in cols), None)
+        crop_col = next((c for c in ["crop", "crop_name"] if c in cols), None)
         # normalize
+        out = {}
         if state_col:
-            df["state_name"] = df[state_col].astype(str).str.lower().str.strip()
+            out["state_name"] = _names(col(state_col))
         if crop_col:
-            df["crop"] = df[crop_col].astype(str).str.lower().str.strip()
-        df["year"] = df["year"].astype(float).astype(int)
-        df["production"] = df[prod_col]
-        keep = ["state_name", "crop", "year", "production"]
+            out["crop"] = _names(col(crop_col))
+        year = col("year")
+        if not pd.api.types.is_integer_dtype(year):
+            year = year.astype(float).astype(int)
+        out["year"] = year
+        out["production"] = col(prod_col)
         for c in ["area_in_hectares", "yield_ton_per_hec", "crop_type"]:
-            if c in df.columns:
-                keep.append(c)
-        return df[[c for c in keep if c in df.columns]].reset_index(drop=True)
+            if c in cols:
+                out[c] = col(c)
+        return _project(out)
 
     # fallback: just return lower-cased columns
-    df = df.rename(columns={c: c.lower() for c in df.columns})
-    return df.copy()
+    return _project({name: col(name) for name in names})
@@ -1,7 +1,92 @@
-from sklearn.metrics import mean_squared_error
+"""Forecast accuracy metrics for one or many series, in pure NumPy.
+
+Every metric accepts `actual` and `predicted` arrays of the same shape. A
+1-D input is one series and gives a scalar; a 2-D input holds one series
+per row and gives one value per row. NaN in either array masks that
+position, so ragged series can be stacked into a NaN-padded 2-D array and
+scored in a single call. Rows with no valid positions score NaN.
+"""
+
 import numpy as np
 
 
+def _prepare(actual, predicted):
+    actual = np.asarray(actual, dtype=float)
+    predicted = np.asarray(predicted, dtype=float)
+    if actual.shape != predicted.shape:
+        raise ValueError(
+            f"actual and predicted shapes differ: {actual.shape} != {predicted.shape}"
+        )
+    mask = ~(np.isnan(actual) | np.isnan(predicted))
+    return actual, predicted, mask
+
+
+def _masked_mean(values, mask):
+    total = np.where(mask, values, 0.0).sum(axis=-1)
+    count = mask.sum(axis=-1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return total / count
+
+
+def rmse(actual, predicted):
+    a, p, mask = _prepare(actual, predicted)
+    return np.sqrt(_masked_mean((a - p) ** 2, mask))
+
+
+def mae(actual, predicted):
+    a, p, mask = _prepare(actual, predicted)
+    return _masked_mean(np.abs(a - p), mask)
+
+
+def mape(actual, predicted):
+    """Mean absolute percentage error, in percent; zero actuals are skipped."""
+    a, p, mask = _prepare(actual, predicted)
+    mask &= a != 0
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return 100 * _masked_mean(np.abs((a - p) / a), mask)
+
+
+def smape(actual, predicted):
+    """Symmetric MAPE, in percent (0-200); 0/0 positions are skipped."""
+    a, p, mask = _prepare(actual, predicted)
+    denom = np.abs(a) + np.abs(p)
+    mask &= denom != 0
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return _masked_mean(200 * np.abs(a - p) / denom, mask)
+
+
+def mase(actual, predicted, insample, season_length=1):
+    """Mean absolute scaled error.
+
+    Errors are scaled by the in-sample mean absolute error of the seasonal
+    naive forecast with period `season_length`, computed per series from
+    `insample` (same number of rows as `actual`, NaN-padded if ragged).
+    """
+    a, p, mask = _prepare(actual, predicted)
+    train = np.asarray(insample, dtype=float)
+    if train.ndim != a.ndim:
+        raise ValueError("insample must have the same number of dimensions as actual")
+    diffs = np.abs(train[..., season_length:] - train[..., :-season_length])
+    scale = _masked_mean(np.nan_to_num(diffs), ~np.isnan(diffs))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return _masked_mean(np.abs(a - p), mask) / scale
+
+
+def evaluate_many(actual, predicted, insample=None, season_length=1):
+    """Return a dict of all metrics for `actual` vs `predicted`.
+
+    MASE is included only when `insample` history is given.
+    """
+    out = {
+        "rmse": rmse(actual, predicted),
+        "mae": mae(actual, predicted),
+        "mape": mape(actual, predicted),
+        "smape": smape(actual, predicted),
+    }
+    if insample is not None:
+        out["mase"] = mase(actual, predicted, insample, season_length)
+    return out
+
+
 def evaluate(actual, predicted):
-    rmse = np.sqrt(mean_squared_error(actual, predicted))
-    return rmse
+    return rmse(actual, predicted)
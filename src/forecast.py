@@ -1,3 +1,131 @@
+import os
+
+import numpy as np
+
+from src.normalize import normalize_text
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except Exception:
+    pa = None
+    pq = None
+
+BASE_DIR = os.path.dirname(os.path.dirname(__file__))
+FORECAST_FILE = os.path.join(BASE_DIR, "data", "processed", "forecasts.parquet")
+
+FORECAST_COLUMNS = ["state", "crop", "horizon", "year", "mean", "lower", "upper"]
+
+
 def forecast_future(model, steps=5):
     forecast = model.forecast(steps=steps)
     return forecast
+
+
+def forecast_intervals(model, steps=5, alpha=0.05):
+    """Return (mean, lower, upper) arrays of a `steps`-ahead forecast."""
+    fc = model.get_forecast(steps=steps)
+    mean = np.asarray(fc.predicted_mean, dtype=float)
+    ci = np.asarray(fc.conf_int(alpha=alpha), dtype=float)
+    return mean, ci[:, 0], ci[:, 1]
+
+
+def _forecast_schema():
+    return pa.schema(
+        [
+            ("state", pa.string()),
+            ("crop", pa.string()),
+            ("horizon", pa.int16()),
+            ("year", pa.int32()),
+            ("mean", pa.float64()),
+            ("lower", pa.float64()),
+            ("upper", pa.float64()),
+        ]
+    )
+
+
+def export_forecasts(
+    models, path=FORECAST_FILE, steps=5, alpha=0.05, row_group_size=65536
+):
+    """Write forecasts of many fitted models to one long-format Parquet file.
+
+    `models` yields ((state, crop), results) or ((state, crop), results,
+    last_year) tuples; results can be fresh fits or rebuilt from cached
+    parameters (`sarima_model.load_sarima`). Each series contributes
+    `steps` rows with columns `FORECAST_COLUMNS`; `year` is
+    last_year + horizon, or null when the last year is unknown.
+
+    Rows are buffered up to `row_group_size` and then flushed as one Parquet
+    row group, so memory stays bounded however many series are exported.
+    A series whose forecast fails is reported and skipped. The file is
+    written to a temporary name and moved into place when complete.
+    Returns the number of series written.
+    """
+    if pq is None:
+        raise ImportError("pyarrow is required to export forecasts")
+
+    schema = _forecast_schema()
+    buffer = {c: [] for c in FORECAST_COLUMNS}
+    horizon = np.arange(1, steps + 1)
+    written = 0
+    tmp = str(path) + ".tmp"
+    os.makedirs(os.path.dirname(os.path.abspath(tmp)), exist_ok=True)
+
+    def flush(writer):
+        writer.write_table(pa.Table.from_pydict(buffer, schema=schema))
+        for col in buffer.values():
+            col.clear()
+
+    with pq.ParquetWriter(tmp, schema) as writer:
+        for item in models:
+            key, model = item[0], item[1]
+            last_year = item[2] if len(item) > 2 else None
+            state, crop = key
+            try:
+                mean, lower, upper = forecast_intervals(model, steps, alpha)
+            except Exception as e:
+                print(f"WARN: Forecast failed for {state}/{crop}: {e}")
+                continue
+            buffer["state"].extend([state] * steps)
+            buffer["crop"].extend([crop] * steps)
+            buffer["horizon"].extend(horizon.tolist())
+            if last_year is None or np.isnan(last_year):
+                buffer["year"].extend([None] * steps)
+            else:
+                buffer["year"].extend((int(last_year) + horizon).tolist())
+            buffer["mean"].extend(mean.tolist())
+            buffer["lower"].extend(lower.tolist())
+            buffer["upper"].extend(upper.tolist())
+            written += 1
+            if len(buffer["state"]) >= row_group_size:
+                flush(writer)
+        if buffer["state"]:
+            flush(writer)
+    os.replace(tmp, path)
+    return written
+
+
+def read_forecasts(path=FORECAST_FILE, state=None, crop=None):
+    """Read exported forecasts, optionally only one state and/or crop."""
+    if pq is None:
+        raise ImportError("pyarrow is required to read forecasts")
+    filters = []
+    if state is not None:
+        filters.append(("state", "=", normalize_text(state)))
+    if crop is not None:
+        filters.append(("crop", "=", normalize_text(crop)))
+    table = pq.read_table(path, filters=filters or None)
+    return table.to_pandas()
+
+
+if __name__ == "__main__":
+    from src.data_loader import load_cleaned_dataset_df
+    from src.model_store import ModelStore
+    from src.sarima_model import train_sarima_many
+    from src.time_series_builder import build_all_time_series
+
+    series_index = build_all_time_series(load_cleaned_dataset_df())
+    fits = train_sarima_many(series_index, store=ModelStore())
+    models = ((r.key, r.model, series_index.years(*r.key)[-1]) for r in fits if r.ok)
+    n = export_forecasts(models)
+    print(f"Forecasts for {n} series written to: {FORECAST_FILE}")
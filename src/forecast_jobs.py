@@ -0,0 +1,128 @@
+"""Background forecast jobs shared by every session of the UI.
+
+A Streamlit script run blocks its session for as long as it executes, so
+fitting a model inline freezes the page. `JobQueue` runs the fits in a
+shared thread pool instead; the page submits a job, stores its key, and
+on every rerun polls `get(key)` for its status until it is done.
+
+Jobs are keyed (e.g. by dataset version, state and crop): submitting a key
+that is already queued, running or finished returns the existing job, so
+several users asking for the same forecast share one fit. Failed jobs are
+replaced on the next submit, so a retry really runs again. Finished jobs
+are kept, least recently used first out, up to `max_finished`.
+"""
+
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import time
+import traceback
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+class Job:
+    """One submitted task; `state`, `progress` and `message` are live."""
+
+    def __init__(self, key):
+        self.key = key
+        self.state = QUEUED
+        self.progress = 0.0
+        self.message = "Waiting for a worker"
+        self.result = None
+        self.error = None
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.done_event = threading.Event()
+
+    def report(self, message, progress=None):
+        """Progress callback handed to the task (`progress` in [0, 1])."""
+        self.message = message
+        if progress is not None:
+            self.progress = min(max(float(progress), 0.0), 1.0)
+
+    @property
+    def finished(self):
+        return self.state in (DONE, FAILED)
+
+    @property
+    def elapsed(self):
+        start = self.started_at or self.submitted_at
+        return (self.finished_at or time.time()) - start
+
+    def wait(self, timeout=None):
+        """Block until the job finished; return whether it did."""
+        return self.done_event.wait(timeout)
+
+
+class JobQueue:
+    """Thread pool plus a registry of jobs by key (see module docstring)."""
+
+    def __init__(self, workers=2, max_finished=256):
+        self._pool = ThreadPoolExecutor(workers, thread_name_prefix="forecast")
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+        self.max_finished = max_finished
+
+    def submit(self, key, func, *args, **kwargs):
+        """Run `func(*args, report=job.report, **kwargs)` unless `key` is known.
+
+        Returns the job for `key`: the existing one if it is queued, running
+        or done, otherwise a newly submitted one.
+        """
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is not None and job.state != FAILED:
+                self._jobs.move_to_end(key)
+                return job
+            job = self._jobs[key] = Job(key)
+            self._evict()
+        self._pool.submit(self._run, job, func, args, kwargs)
+        return job
+
+    def _run(self, job, func, args, kwargs):
+        job.state = RUNNING
+        job.started_at = time.time()
+        job.report("Running", 0.0)
+        try:
+            job.result = func(*args, report=job.report, **kwargs)
+            job.state = DONE
+            job.report("Done", 1.0)
+        except Exception as e:
+            job.error = e
+            job.message = "".join(traceback.format_exception_only(type(e), e)).strip()
+            job.state = FAILED
+        finally:
+            job.finished_at = time.time()
+            job.done_event.set()
+
+    def _evict(self):
+        finished = [k for k, j in self._jobs.items() if j.finished]
+        for key in finished[: max(0, len(finished) - self.max_finished)]:
+            del self._jobs[key]
+
+    def get(self, key):
+        """Return the job for `key`, or None if there is none."""
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is not None:
+                self._jobs.move_to_end(key)
+            return job
+
+    def active(self):
+        """Number of jobs queued or running."""
+        with self._lock:
+            return sum(1 for j in self._jobs.values() if not j.finished)
+
+    def clear_finished(self):
+        """Forget finished jobs (running ones keep going)."""
+        with self._lock:
+            for key in [k for k, j in self._jobs.items() if j.finished]:
+                del self._jobs[key]
+
+    def shutdown(self, wait=True):
+        self._pool.shutdown(wait=wait)
@@ -0,0 +1,292 @@
+"""Precomputed forecasts indexed by (state, crop), served before fitting.
+
+`build_forecast_store` is a batch job: it forecasts every series marked
+`usable_for_sarima` in `dataset_suitability.csv` (SARIMA when the series
+is long enough, otherwise the Holt trend baseline the UI also falls back
+to) and writes the results to a SQLite file. The UI reads a series'
+forecast from there first and only fits on demand when the entry is
+missing or stale, writing its own result back.
+
+An entry is stale when the series it was computed from no longer matches
+the current data (`series_hash`) or it is older than `MAX_AGE_DAYS`.
+Names are stored in their `normalize_text` form. SQLite is opened in WAL
+mode, so the UI keeps reading while the batch job writes.
+"""
+
+from contextlib import closing
+from pathlib import Path
+from typing import NamedTuple
+import argparse
+import hashlib
+import sqlite3
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.normalize import normalize_text
+
+BASE = Path(__file__).resolve().parents[1]
+PROC = BASE / "data" / "processed"
+
+FORECAST_DB = PROC / "forecasts.sqlite"
+SUIT_FILE = PROC / "dataset_suitability.csv"
+MAX_AGE_DAYS = 30
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS series (
+    state TEXT NOT NULL,
+    crop TEXT NOT NULL,
+    method TEXT NOT NULL,
+    series_hash TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (state, crop)
+);
+CREATE TABLE IF NOT EXISTS forecasts (
+    state TEXT NOT NULL,
+    crop TEXT NOT NULL,
+    horizon INTEGER NOT NULL,
+    year INTEGER,
+    mean REAL,
+    lower REAL,
+    upper REAL,
+    PRIMARY KEY (state, crop, horizon)
+);
+"""
+
+
+def series_hash(series):
+    """sha256 of a series' index and values, as written by `prepare_sarima_series`."""
+    h = hashlib.sha256()
+    h.update(np.asarray(series.index, dtype="float64").tobytes())
+    h.update(np.asarray(series.to_numpy(), dtype="float64").tobytes())
+    return h.hexdigest()
+
+
+class ForecastEntry(NamedTuple):
+    state: str
+    crop: str
+    method: str
+    series_hash: str
+    created_at: float
+    forecast: pd.DataFrame  # horizon, year, mean, lower, upper
+
+    @property
+    def age_days(self) -> float:
+        return (time.time() - self.created_at) / 86400
+
+    def is_fresh(self, current_hash: str | None = None, max_age_days=MAX_AGE_DAYS):
+        """True unless the data changed or the entry is older than `max_age_days`."""
+        if current_hash is not None and current_hash != self.series_hash:
+            return False
+        return max_age_days is None or self.age_days <= max_age_days
+
+
+class ForecastStore:
+    """SQLite file of forecasts; every call opens its own connection."""
+
+    def __init__(self, path=FORECAST_DB):
+        self.path = Path(path)
+
+    def _connect(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        con = sqlite3.connect(self.path, timeout=30)
+        con.execute("PRAGMA journal_mode=WAL")
+        con.executescript(_SCHEMA)
+        return con
+
+    def exists(self):
+        return self.path.exists()
+
+    def put_many(self, entries):
+        """Store (state, crop, method, series_hash, years, mean, lower, upper) tuples.
+
+        Each entry replaces any previous forecast of its series. All
+        entries are written in one transaction; returns how many.
+        """
+        now = time.time()
+        n = 0
+        with closing(self._connect()) as con, con:
+            for state, crop, method, digest, years, mean, lower, upper in entries:
+                state, crop = normalize_text(state), normalize_text(crop)
+                con.execute(
+                    "INSERT OR REPLACE INTO series VALUES (?, ?, ?, ?, ?)",
+                    (state, crop, method, digest, now),
+                )
+                con.execute(
+                    "DELETE FROM forecasts WHERE state = ? AND crop = ?", (state, crop)
+                )
+                con.executemany(
+                    "INSERT INTO forecasts VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    [
+                        (
+                            state,
+                            crop,
+                            h,
+                            _int_or_none(y),
+                            _float(m),
+                            _float(lo),
+                            _float(hi),
+                        )
+                        for h, (y, m, lo, hi) in enumerate(
+                            zip(years, mean, lower, upper), start=1
+                        )
+                    ],
+                )
+                n += 1
+        return n
+
+    def put(self, state, crop, method, digest, years, mean, lower, upper):
+        """Store one series' forecast (see `put_many`)."""
+        self.put_many([(state, crop, method, digest, years, mean, lower, upper)])
+
+    def get(self, state, crop):
+        """Return the `ForecastEntry` of a series, or None if not stored."""
+        if not self.exists():
+            return None
+        state, crop = normalize_text(state), normalize_text(crop)
+        with closing(self._connect()) as con:
+            row = con.execute(
+                "SELECT method, series_hash, created_at FROM series"
+                " WHERE state = ? AND crop = ?",
+                (state, crop),
+            ).fetchone()
+            if row is None:
+                return None
+            forecast = pd.read_sql_query(
+                "SELECT horizon, year, mean, lower, upper FROM forecasts"
+                " WHERE state = ? AND crop = ? ORDER BY horizon",
+                con,
+                params=(state, crop),
+            )
+        forecast = forecast.astype({"mean": float, "lower": float, "upper": float})
+        return ForecastEntry(state, crop, row[0], row[1], row[2], forecast)
+
+    def summary(self):
+        """Return (entries, oldest created_at, newest created_at); (0, None, None) if empty."""
+        if not self.exists():
+            return 0, None, None
+        with closing(self._connect()) as con:
+            return con.execute(
+                "SELECT COUNT(*), MIN(created_at), MAX(created_at) FROM series"
+            ).fetchone()
+
+    def keys(self):
+        """Set of stored (state, crop) pairs."""
+        if not self.exists():
+            return set()
+        with closing(self._connect()) as con:
+            return set(con.execute("SELECT state, crop FROM series").fetchall())
+
+
+def _float(x):
+    return None if x is None or np.isnan(x) else float(x)
+
+
+def _int_or_none(x):
+    return None if x is None or np.isnan(x) else int(x)
+
+
+def usable_series(suit_file=None):
+    """Normalized (state, crop) pairs marked usable in the suitability report."""
+    suit = pd.read_csv(suit_file or SUIT_FILE)
+    suit = suit[suit["usable_for_sarima"].astype(bool)]
+    return sorted(
+        {
+            (normalize_text(s), normalize_text(c))
+            for s, c in zip(suit["state_name"], suit["crop"])
+        }
+    )
+
+
+def coverage(store, suit_file=None):
+    """Share of usable series with a stored forecast (None without a report)."""
+    try:
+        usable = usable_series(suit_file)
+    except (FileNotFoundError, KeyError):
+        return None
+    if not usable:
+        return None
+    return len(set(usable) & store.keys()) / len(usable)
+
+
+def build_forecast_store(
+    df, suit_file=None, store=None, steps=5, alpha=0.05, workers=None, model_store=None
+):
+    """Forecast every usable series of `df` and write them to `store`.
+
+    Series come from `prepare_sarima_series`, as in the UI. Returns
+    (sarima, baseline, failed) counts.
+    """
+    # modeling imports stay here so reading the store needs no statsmodels
+    from src.baselines import forecast_baselines
+    from src.data_preprocessing import prepare_sarima_series
+    from src.forecast import forecast_intervals
+    from src.sarima_model import train_sarima_many
+
+    store = store or ForecastStore()
+    series = {}
+    failed = 0
+    for key in usable_series(suit_file):
+        try:
+            series[key] = prepare_sarima_series(df, *key)
+        except Exception as e:
+            print(f"WARN: No series for {key[0]}/{key[1]}: {e}")
+            failed += 1
+
+    def entry(key, method, mean, lower, upper):
+        ts = series[key]
+        years = ts.index[-1] + np.arange(1, steps + 1) if len(ts) else [None] * steps
+        return (*key, method, series_hash(ts), years, mean, lower, upper)
+
+    entries = []
+    short = []
+    for result in train_sarima_many(series.items(), workers=workers, store=model_store):
+        if result.skipped:
+            short.append(result.key)
+            continue
+        try:
+            if not result.ok:
+                raise Exception(result.error)
+            mean, lower, upper = forecast_intervals(result.model, steps, alpha)
+        except Exception as e:
+            print(f"WARN: Forecast failed for {result.key[0]}/{result.key[1]}: {e}")
+            failed += 1
+            continue
+        entries.append(entry(result.key, "sarima", mean, lower, upper))
+    sarima = len(entries)
+
+    if short:
+        holt = forecast_baselines(
+            [series[k] for k in short], steps=steps, methods=("holt",)
+        )["holt"]
+        nan = np.full(steps, np.nan)
+        entries += [entry(k, "holt", row, nan, nan) for k, row in zip(short, holt)]
+
+    store.put_many(entries)
+    return sarima, len(short), failed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Precompute forecasts")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--steps", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    from src.data_loader import load_cleaned_dataset_df
+    from src.model_store import ModelStore
+
+    sarima, baseline, failed = build_forecast_store(
+        load_cleaned_dataset_df(),
+        steps=args.steps,
+        workers=args.workers,
+        model_store=ModelStore(),
+    )
+    print(
+        f"Forecasts written to {FORECAST_DB}: {sarima} SARIMA, "
+        f"{baseline} Holt baseline, {failed} failed"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -7,15 +7,17 @@ Behavior:
 - For each missing state not already in manual map, suggest a subdivision via token overlap/fuzzy match
 - By default performs a dry-run and prints suggestions. Pass `apply=True` to append suggestions to the manual CSV.
 
-This is intentionally conservative and records a backup before writing.
+This is intentionally conservative: suggestions are only appended to the mapping file
+(never rewriting existing rows), under a file lock shared with concurrent runs.
 """
 
 from pathlib import Path
 import csv
-import re
-from datetime import datetime
 import difflib
 
+from src.mapping_store import get_store
+from src.normalize import normalize_text
+
 BASE = Path(__file__).resolve().parents[1]
 RAW = BASE / "data" / "raw"
 PROC = BASE / "data" / "processed"
@@ -23,25 +25,13 @@ MANUAL_FILE = PROC / "manual_state_to_subdivision.csv"
 MISSING_FILE = PROC / "missing_year_state_counts.csv"
 RAINFALL_FILE = RAW / "rainfall_validation.csv"
 
-_token_re = re.compile(r"[a-z0-9]+")
-
-
-def normalize_text(s: str):
-    return " ".join(_token_re.findall(str(s).lower()))
-
 
 def load_manual_map(path=MANUAL_FILE):
-    mapping = {}
-    if not path.exists():
-        return mapping
-    with path.open(newline="", encoding="utf-8") as fh:
-        reader = csv.DictReader(fh)
-        for row in reader:
-            state = row.get("state") or row.get("state_name")
-            subdiv = row.get("subdivision")
-            if state and subdiv:
-                mapping[state.strip().lower()] = subdiv.strip().lower()
-    return mapping
+    try:
+        return get_store(path).load()
+    except ValueError as e:
+        print(f"WARN: Manual map file {path} {e}")
+        return {}
 
 
 def load_missing_states(path=MISSING_FILE):
@@ -53,7 +43,7 @@ def load_missing_states(path=MISSING_FILE):
         for row in reader:
             st = row.get("state_name") or row.get("state")
             if st:
-                out.append(st.strip().lower())
+                out.append(normalize_text(st))
     return out
 
 
@@ -66,102 +56,177 @@ def load_subdivisions(path=RAINFALL_FILE):
         for row in reader:
             s = row.get("SUBDIVISION") or row.get("subdivision")
             if s:
-                subs.add(s.strip().lower())
+                subs.add(normalize_text(s))
     return subs
 
 
-def suggest_mapping(missing_states=None, subdivisions=None):
-    # Build normalized token sets for subdivisions
-    subdivisions = subdivisions or set()
-    missing_states = missing_states or []
+# difflib ratio a subdivision token must reach against a state token for the
+# token-level fuzzy fallback
+TOKEN_RATIO_CUTOFF = 0.60
 
-    sub_tokens = {s: set(normalize_text(s).split()) for s in subdivisions}
 
-    suggestions = {}
-    for st in missing_states:
-        if not st:
-            continue
-        st_tokens = set(normalize_text(st).split())
+def _trigrams(s):
+    return {s[i : i + 3] for i in range(len(s) - 2)}
+
+
+class SubdivisionIndex:
+    """Lookup structures over the subdivisions, built once for many states.
+
+    - token -> positions of the subdivisions containing it, so token
+      overlap is counted from postings instead of against every subdivision;
+    - character trigram -> positions, which shortlists the subdivisions that
+      can contain (or be contained in) a state name;
+    - the token vocabulary bucketed by length, so the fuzzy fallback only
+      runs `difflib` on tokens whose length allows the cutoff ratio.
+
+    Positions follow the iteration order of `subdivisions`, and every rule
+    breaks ties by the lowest position, so `suggest` returns exactly what the
+    all-pairs scan in `suggest_mapping` used to.
+    """
+
+    def __init__(self, subdivisions):
+        self.subs = list(dict.fromkeys(subdivisions))
+        self.norms = [normalize_text(s) for s in self.subs]
+        self.postings = {}
+        self.trigram_postings = {}
+        self.short = []  # positions of names too short to have a trigram
+        self.sub_trigram_count = []
+        for pos, norm in enumerate(self.norms):
+            for tok in set(norm.split()):
+                self.postings.setdefault(tok, []).append(pos)
+            grams = _trigrams(norm)
+            self.sub_trigram_count.append(len(grams))
+            if not grams:
+                self.short.append(pos)
+            for g in grams:
+                self.trigram_postings.setdefault(g, []).append(pos)
+        self.by_length = {}
+        for tok in self.postings:
+            self.by_length.setdefault(len(tok), []).append(tok)
+
+    def best_overlap(self, tokens):
+        """Position of the subdivision sharing most tokens, or None."""
+        counts = {}
+        for tok in tokens:
+            for pos in self.postings.get(tok, ()):
+                counts[pos] = counts.get(pos, 0) + 1
+        if not counts:
+            return None
+        top = max(counts.values())
+        return min(pos for pos, c in counts.items() if c == top)
+
+    def first_containing(self, norm):
+        """Lowest position whose name contains, or is contained in, `norm`."""
+        grams = _trigrams(norm)
+        if grams:
+            # `norm in sub` needs every trigram of norm in sub
+            hits = {}
+            for g in grams:
+                for pos in self.trigram_postings.get(g, ()):
+                    hits[pos] = hits.get(pos, 0) + 1
+            candidates = {p for p, c in hits.items() if c == len(grams)}
+            # `sub in norm` needs every trigram of sub in norm
+            candidates.update(
+                p for p, c in hits.items() if c == self.sub_trigram_count[p]
+            )
+        else:
+            candidates = set(range(len(self.subs)))
+        candidates.update(self.short)
+        for pos in sorted(candidates):
+            sub_norm = self.norms[pos]
+            if norm in sub_norm or sub_norm in norm:
+                return pos
+        return None
+
+    def best_fuzzy_token(self, tokens, cutoff=TOKEN_RATIO_CUTOFF):
+        """Position of the subdivision with the most similar single token.
+
+        Returns None unless the best `difflib` ratio reaches `cutoff`.
+        """
+        best_score = {}
+        matcher = difflib.SequenceMatcher()
+        for stk in tokens:
+            matcher.set_seq2(stk)
+            n = len(stk)
+            for length, vocab in self.by_length.items():
+                # ratio <= 2 * min(len) / (len_a + len_b)
+                if 2 * min(length, n) / (length + n) < cutoff:
+                    continue
+                for tk in vocab:
+                    matcher.set_seq1(tk)
+                    if matcher.quick_ratio() < max(cutoff, best_score.get(tk, 0)):
+                        continue
+                    score = matcher.ratio()
+                    if score > best_score.get(tk, 0.0):
+                        best_score[tk] = score
+        if not best_score:
+            return None
+        top = max(best_score.values())
+        if top < cutoff:
+            return None
+        return min(self.postings[tk][0] for tk, sc in best_score.items() if sc == top)
+
+    def suggest(self, state):
+        """Suggest a subdivision for one state name, or None."""
+        norm = normalize_text(state)
+        tokens = set(norm.split())
         # find subdivision with max token overlap
-        best = None
-        best_score = 0
-        for sub, tokens in sub_tokens.items():
-            score = len(st_tokens & tokens)
-            if score > best_score:
-                best_score = score
-                best = sub
+        pos = self.best_overlap(tokens)
         # fallback: substring containment
-        if best is None or best_score == 0:
-            for sub in subdivisions:
-                if normalize_text(st) in normalize_text(sub) or normalize_text(
-                    sub
-                ) in normalize_text(st):
-                    best = sub
-                    break
+        if pos is None:
+            pos = self.first_containing(norm)
         # fallback: token-level fuzzy matching using sequence similarity
-        if best is None:
-            best_token_sub = None
-            best_token_score = 0.0
-            for sub, tokens in sub_tokens.items():
-                for tk in tokens:
-                    for stk in st_tokens:
-                        score = difflib.SequenceMatcher(None, tk, stk).ratio()
-                        if score > best_token_score:
-                            best_token_score = score
-                            best_token_sub = sub
-            if best_token_score >= 0.60:
-                best = best_token_sub
-
+        if pos is None:
+            pos = self.best_fuzzy_token(tokens)
+        if pos is not None:
+            return self.subs[pos]
         # fallback: difflib close match on raw strings
-        if best is None:
-            raw_candidates = list(subdivisions)
-            matches = difflib.get_close_matches(st, raw_candidates, n=1, cutoff=0.4)
-            if matches:
-                best = matches[0]
+        matches = difflib.get_close_matches(state, self.subs, n=1, cutoff=0.4)
+        return matches[0] if matches else None
+
+
+def suggest_mapping(missing_states=None, subdivisions=None, index=None):
+    """Suggest a subdivision for every missing state.
+
+    Rules, in order: most shared tokens, substring containment, most similar
+    single token (difflib ratio >= `TOKEN_RATIO_CUTOFF`), difflib close match
+    on the raw names. Pass a prebuilt `SubdivisionIndex` as `index` to reuse
+    it across calls.
+    """
+    missing_states = missing_states or []
+    if index is None:
+        index = SubdivisionIndex(subdivisions or ())
 
+    suggestions = {}
+    for st in missing_states:
+        if not st:
+            continue
+        best = index.suggest(st)
         if best:
             suggestions[st] = best
     return suggestions
 
 
 def append_manual_mappings(suggestions: dict, path=MANUAL_FILE, backup=True):
+    """Append suggestions for states not yet in the manual mapping file.
+
+    Rows are appended under a file lock (see `src.mapping_store`); existing
+    rows are never rewritten, so `backup` is accepted for compatibility but
+    no backup copy is needed or made. Use `compact_manual_map` to drop
+    duplicate rows.
+    """
     if not suggestions:
         print("No suggestions to append.")
         return path
-    path.parent.mkdir(parents=True, exist_ok=True)
-
-    # read existing rows (if any) and optionally backup
-    if path.exists():
-        with path.open(newline="", encoding="utf-8") as fh:
-            reader = csv.DictReader(fh)
-            fieldnames = reader.fieldnames or ["state", "subdivision"]
-            old_rows = [r for r in reader]
-        if backup:
-            ts = datetime.utcnow().strftime("%Y%m%dT%H%M%SZ")
-            bak = path.with_suffix(f".bak.{ts}")
-            path.rename(bak)
-    else:
-        fieldnames = ["state", "subdivision"]
-        old_rows = []
-
-    # Avoid duplicating states already present in old_rows
-    existing = {r["state"].strip().lower() for r in old_rows}
-    new_rows = []
-    for state, subdiv in suggestions.items():
-        if state in existing:
-            continue
-        new_rows.append({"state": state, "subdivision": subdiv})
-
-    # write merged file (old rows first, then new rows)
-    with path.open("w", newline="", encoding="utf-8") as fh:
-        writer = csv.DictWriter(fh, fieldnames=fieldnames)
-        writer.writeheader()
-        for r in old_rows:
-            writer.writerow({k: r.get(k, "") for k in fieldnames})
-        for r in new_rows:
-            writer.writerow(r)
-
-    print(f"Appended {len(new_rows)} entries to {path}")
+    added = get_store(path).append(suggestions)
+    print(f"Appended {added} entries to {path}")
+    return path
+
+
+def compact_manual_map(path=MANUAL_FILE):
+    """Atomically rewrite the manual mapping file with one row per state."""
+    rows = get_store(path).compact()
+    print(f"Compacted {path} to {rows} rows")
     return path
 
 
@@ -215,6 +280,14 @@ if __name__ == "__main__":
     p.add_argument(
         "--apply", action="store_true", help="Append suggestions to manual mapping file"
     )
+    p.add_argument(
+        "--compact",
+        action="store_true",
+        help="Rewrite the manual mapping file with one row per state",
+    )
     args = p.parse_args()
 
-    suggest_and_apply(apply=args.apply)
+    if args.compact:
+        compact_manual_map()
+    else:
+        suggest_and_apply(apply=args.apply)
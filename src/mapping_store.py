@@ -0,0 +1,225 @@
+"""Append-only store for the manual state -> subdivision mapping CSV.
+
+The file keeps its plain `state,subdivision` CSV layout so it can still be
+edited by hand, but writers never rewrite it to add rows: new mappings are
+appended under an advisory lock on a `<file>.lock` sidecar, so concurrent
+runs cannot lose each other's rows. `compact` drops duplicate and blank
+rows (keeping the header and each state's last row as written) by
+writing a snapshot to a temporary file and renaming it over the original,
+which readers see either entirely or not at all.
+
+Readers take no lock of their own beyond a shared one when the lock file
+can be opened, so a read-only directory is still readable: writers only
+append or rename a complete file into place.
+
+Each `ManualMapStore` keeps the parsed mapping in memory. `load` only
+touches the file again when it changed on disk. The store's own appends
+are applied in memory; any other change (another process, a hand edit)
+re-reads the whole file. `get_store` shares one store per path within the
+process, which is what the `load_manual_map` helpers use.
+"""
+
+from contextlib import contextmanager
+from pathlib import Path
+import csv
+import io
+import os
+
+try:
+    import fcntl
+except Exception:
+    fcntl = None
+
+try:
+    import msvcrt
+except Exception:
+    msvcrt = None
+
+from src.normalize import normalize_text
+
+FIELDNAMES = ["state", "subdivision"]
+
+
+class ManualMapStore:
+    """Normalized state -> subdivision mapping backed by an append-only CSV.
+
+    When a state appears more than once, the last row wins.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.lock_path = self.path.with_name(self.path.name + ".lock")
+        self._mapping = {}
+        self._stamp = None  # (inode, mtime_ns, size) of the parsed file
+        self._header = None
+
+    @contextmanager
+    def _read_locked(self):
+        """Shared lock if the lock file can be opened; otherwise no lock."""
+        try:
+            fh = self.lock_path.open("a+b")
+        except OSError:
+            yield
+            return
+        with fh:
+            if fcntl is not None:
+                fcntl.flock(fh, fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(fh, fcntl.LOCK_UN)
+
+    @contextmanager
+    def _locked(self):
+        self.lock_path.parent.mkdir(parents=True, exist_ok=True)
+        with self.lock_path.open("a+b") as fh:
+            if fcntl is not None:
+                fcntl.flock(fh, fcntl.LOCK_EX)
+            elif msvcrt is not None:
+                fh.seek(0)
+                msvcrt.locking(fh.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(fh, fcntl.LOCK_UN)
+                elif msvcrt is not None:
+                    fh.seek(0)
+                    msvcrt.locking(fh.fileno(), msvcrt.LK_UNLCK, 1)
+
+    @staticmethod
+    def _columns(header):
+        state_col = next((c for c in ("state", "state_name") if c in header), None)
+        if state_col is None or "subdivision" not in header:
+            raise ValueError("missing required columns 'state' and 'subdivision'")
+        return state_col, "subdivision"
+
+    def _parse(self, text, header, mapping):
+        state_col, sub_col = self._columns(header)
+        for row in csv.DictReader(io.StringIO(text), fieldnames=header):
+            state = normalize_text(row.get(state_col) or "")
+            sub = normalize_text(row.get(sub_col) or "")
+            if state and sub:
+                mapping[state] = sub
+
+    def _refresh(self):
+        """Bring the in-memory mapping up to date with the file."""
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            self._mapping, self._stamp, self._header = {}, None, None
+            return
+        stamp = (st.st_ino, st.st_mtime_ns, st.st_size)
+        if stamp == self._stamp:
+            return
+        with self.path.open("rb") as fh:
+            text = fh.read().decode("utf-8-sig")
+        header_line, _, body = text.partition("\n")
+        header = [c.strip() for c in next(csv.reader([header_line]), [])]
+        mapping = {}
+        if header:
+            self._parse(body, header, mapping)
+        self._mapping, self._header, self._stamp = mapping, header or None, stamp
+
+    def exists(self):
+        return self.path.exists()
+
+    def load(self):
+        """Return a copy of the normalized mapping ({} if there is no file).
+
+        Raises ValueError when the file lacks the state/subdivision columns.
+        """
+        with self._read_locked():
+            self._refresh()
+        return dict(self._mapping)
+
+    def get(self, state, default=None):
+        """Look up one state (any spelling `normalize_text` maps together)."""
+        with self._read_locked():
+            self._refresh()
+        return self._mapping.get(normalize_text(state), default)
+
+    def append(self, mappings):
+        """Append mappings for states not present yet; return how many."""
+        with self._locked():
+            self._refresh()
+            rows = []
+            seen = set(self._mapping)
+            for state, subdiv in mappings.items():
+                key = normalize_text(state)
+                if not key or not normalize_text(subdiv) or key in seen:
+                    continue
+                rows.append((state, subdiv))
+                seen.add(key)
+            if not rows:
+                return 0
+            header = self._header or FIELDNAMES
+            self._columns(header)
+            buf = io.StringIO()
+            writer = csv.writer(buf, lineterminator="\n")
+            if self._header is None:
+                writer.writerow(FIELDNAMES)
+            for state, subdiv in rows:
+                record = {"state": state, "state_name": state, "subdivision": subdiv}
+                writer.writerow([record.get(c, "") for c in header])
+            with self.path.open("ab+") as fh:
+                if fh.tell():
+                    fh.seek(-1, os.SEEK_END)
+                    if fh.read(1) not in (b"\n", b"\r"):
+                        fh.write(b"\n")
+                fh.write(buf.getvalue().encode("utf-8"))
+                fh.flush()
+                os.fsync(fh.fileno())
+                st = os.fstat(fh.fileno())
+            # the file is what was parsed plus these rows: no need to re-read
+            mapping = dict(self._mapping)
+            for state, subdiv in rows:
+                mapping[normalize_text(state)] = normalize_text(subdiv)
+            self._mapping, self._header = mapping, header
+            self._stamp = (st.st_ino, st.st_mtime_ns, st.st_size)
+            return len(rows)
+
+    def compact(self):
+        """Rewrite the file as one row per state, atomically; return row count.
+
+        The header (including any extra columns) is kept, and each state
+        keeps its last row as written, not its normalized form.
+        """
+        with self._locked():
+            self._stamp = None
+            self._refresh()
+            header = self._header or FIELDNAMES
+            state_col, sub_col = self._columns(header)
+            rows = {}
+            if self.path.exists():
+                text = self.path.read_bytes().decode("utf-8-sig")
+                body = text.partition("\n")[2]
+                for row in csv.DictReader(io.StringIO(body), fieldnames=header):
+                    state = normalize_text(row.get(state_col) or "")
+                    if state and normalize_text(row.get(sub_col) or ""):
+                        rows[state] = row
+            tmp = self.path.with_name(self.path.name + ".tmp")
+            with tmp.open("w", newline="", encoding="utf-8") as fh:
+                writer = csv.writer(fh, lineterminator="\n")
+                writer.writerow(header)
+                for row in rows.values():
+                    writer.writerow([row.get(c) or "" for c in header])
+                fh.flush()
+                os.fsync(fh.fileno())
+            os.replace(tmp, self.path)
+            self._stamp = None
+            self._refresh()
+            return len(rows)
+
+
+_STORES = {}
+
+
+def get_store(path):
+    """Return the process-wide `ManualMapStore` for `path`."""
+    key = os.path.abspath(path)
+    store = _STORES.get(key)
+    if store is None:
+        store = _STORES[key] = ManualMapStore(key)
+    return store
@@ -1,66 +1,150 @@
-import pandas as pd
 import os
+import shutil
+
+import pandas as pd
+
 from src.data_preprocessing import clean_data
+from src.parquet_dataset import pq, write_partitioned
+from src.schemas import read_typed_csv
 
 BASE_DIR = os.path.dirname(os.path.dirname(__file__))
 RAW_DIR = os.path.join(BASE_DIR, "data", "raw")
 OUT_DIR = os.path.join(BASE_DIR, "data")
 PROCESSED_DIR = os.path.join(BASE_DIR, "data", "processed")
+# the final dataset is also written as Parquet, one directory per state
+# (or per state and crop with ("state_name", "crop"))
+FINAL_DATASET_DIR = "final_dataset"
+FINAL_PARTITION_BY = ("state_name",)
 
 os.makedirs(PROCESSED_DIR, exist_ok=True)
 
 
-def merge_all_datasets(raw_dir=None, processed_dir=None, out_dir=None):
-    print("Loading datasets...")
+def attach_columns(df, other, on):
+    """Left-join `other` onto `df` on the `on` columns.
 
+    When the keys of `other` are unique and no other column names clash,
+    the join adds `other`'s columns to `df` in place and returns `df`, so the
+    (large) left frame is never copied. Otherwise it falls back to
+    `DataFrame.merge`, which returns a new frame.
+    """
+    values = [c for c in other.columns if c not in on]
+    if not set(on).issubset(df.columns) or not set(on).issubset(other.columns):
+        return df.merge(other, on=on, how="left")
+    if set(values) & set(df.columns) or other.duplicated(subset=on).any():
+        return df.merge(other, on=on, how="left")
+
+    keys = pd.MultiIndex.from_arrays([other[c] for c in on])
+    pos = keys.get_indexer(pd.MultiIndex.from_arrays([df[c] for c in on]))
+    for c in values:
+        df[c] = pd.api.extensions.take(other[c].to_numpy(), pos, allow_fill=True)
+    return df
+
+
+def load_crop(raw_dir=None, processed_dir=None):
+    """Cleaned crop production data (prefers the enriched file with year)."""
     RAW = raw_dir or RAW_DIR
     PROC = processed_dir or PROCESSED_DIR
-    OUT = out_dir or OUT_DIR
 
     # Prefer the already-processed crop dataset with year if present
     crop_path = os.path.join(PROC, "cleaned_crop_data_with_year.csv")
     if os.path.exists(crop_path):
-        crop = clean_data(pd.read_csv(crop_path))
-    else:
-        crop = clean_data(pd.read_csv(os.path.join(RAW, "Crop_production.csv")))
+        return clean_data(read_typed_csv(crop_path))
+    return clean_data(read_typed_csv(os.path.join(RAW, "Crop_production.csv")))
+
+
+def load_weather(raw_dir=None):
+    """Cleaned crop-level rainfall (and temperature, when available) data."""
+    RAW = raw_dir or RAW_DIR
 
     # Use the final rainfall+temperature merged file if present
     final_temp_path = os.path.join(RAW, "Final_Dataset_after_temperature.csv")
     if os.path.exists(final_temp_path):
-        rain_temp = clean_data(pd.read_csv(final_temp_path))
-    else:
-        rain_temp = clean_data(
-            pd.read_csv(os.path.join(RAW, "Data_after_rainfall.csv"))
-        )
-        # try to augment with temperature if available
-        temp_path = os.path.join(RAW, "temperature.csv")
-        if os.path.exists(temp_path):
-            temp = clean_data(pd.read_csv(temp_path))
-            # temp: state_name, temperature
-            rain_temp = rain_temp.merge(temp, on="state_name", how="left")
-
-    fertilizer = clean_data(pd.read_csv(os.path.join(RAW, "Fertilizer.csv")))
+        return clean_data(read_typed_csv(final_temp_path))
+    rain_temp = clean_data(read_typed_csv(os.path.join(RAW, "Data_after_rainfall.csv")))
+    # try to augment with temperature if available
+    temp_path = os.path.join(RAW, "temperature.csv")
+    if os.path.exists(temp_path):
+        temp = clean_data(read_typed_csv(temp_path))
+        # temp: state_name, temperature
+        rain_temp = rain_temp.merge(temp, on="state_name", how="left")
+    return rain_temp
+
+
+def load_fertilizer(raw_dir=None):
+    """Cleaned per-crop fertilizer requirements."""
+    RAW = raw_dir or RAW_DIR
+    return clean_data(read_typed_csv(os.path.join(RAW, "Fertilizer.csv")))
+
+
+def combine_datasets(
+    crop,
+    rain_temp,
+    fertilizer,
+    processed_dir=None,
+    out_dir=None,
+    partition_by=FINAL_PARTITION_BY,
+):
+    """Join the cleaned inputs, write the final dataset and the suitability report.
+
+    The final dataset goes to final_dataset.csv and, when pyarrow is
+    installed, to a Parquet dataset partitioned by `partition_by` under
+    final_dataset/ (see `src.parquet_dataset`); pass `partition_by=None`
+    to skip the Parquet copy. A Parquet copy left by an earlier run is
+    removed whenever no new one is written, so it never serves old rows.
+
+    `crop` is owned by this function: the other inputs' columns are added to
+    it in place (see `attach_columns`).
+    """
+    OUT = out_dir or OUT_DIR
 
     print("Merging datasets...")
 
     # Merge crop with rainfall/temperature on state_name & crop (rain_temp is crop-level)
-    df = crop.merge(rain_temp, on=["state_name", "crop"], how="left")
+    df = attach_columns(crop, rain_temp, ["state_name", "crop"])
 
     # Fertilizer is crop-level; merge on crop only
     if "crop" in fertilizer.columns:
-        fert = fertilizer.rename(columns={c: c for c in fertilizer.columns})
-        df = df.merge(fert, on=["crop"], how="left")
+        df = attach_columns(df, fertilizer, ["crop"])
 
     output_path = os.path.join(OUT, "final_dataset.csv")
+    root = os.path.join(OUT, FINAL_DATASET_DIR)
+    parts = [c for c in partition_by or () if c in df.columns]
+    if not parts or pq is None:
+        shutil.rmtree(root, ignore_errors=True)
     df.to_csv(output_path, index=False)
 
     print(f"Final dataset saved: {output_path}")
+    if parts and pq is not None:
+        try:
+            index = write_partitioned(df, root, parts, source=output_path)
+        except Exception as e:
+            print(f"WARN: Could not write partitioned dataset {root}: {e}")
+            shutil.rmtree(root, ignore_errors=True)
+        else:
+            print(
+                f"Partitioned dataset saved: {root} "
+                f"({len(index['partitions'])} partitions by {', '.join(parts)})"
+            )
     print("Final shape:", df.shape)
 
     # generate a small suitability report
     generate_suitability_report(df, out_dir=processed_dir)
 
 
+def merge_all_datasets(
+    raw_dir=None, processed_dir=None, out_dir=None, partition_by=FINAL_PARTITION_BY
+):
+    print("Loading datasets...")
+    combine_datasets(
+        load_crop(raw_dir, processed_dir),
+        load_weather(raw_dir),
+        load_fertilizer(raw_dir),
+        processed_dir=processed_dir,
+        out_dir=out_dir,
+        partition_by=partition_by,
+    )
+
+
 def generate_suitability_report(df, min_years=5, out_dir=None):
     """Generate a CSV with counts of unique years per (state,crop) and a usability flag."""
     if not {"state_name", "crop", "year"}.issubset(set(df.columns)):
@@ -69,7 +153,11 @@ def generate_suitability_report(df, min_years=5, out_dir=None):
         )
         return
 
-    grp = df.groupby(["state_name", "crop"])["year"].nunique().reset_index()
+    grp = (
+        df.groupby(["state_name", "crop"], observed=True)["year"]
+        .nunique()
+        .reset_index()
+    )
     grp = grp.rename(columns={"year": "year_count"})
     grp["usable_for_sarima"] = grp["year_count"] >= min_years
 
@@ -0,0 +1,239 @@
+"""On-disk store of fitted SARIMA parameters.
+
+Entries are keyed by a hash of the series values, the SARIMA order and
+seasonal order, and the installed statsmodels version, so a hit is only
+possible when a fresh fit would optimize exactly the same problem.
+
+Only the estimated parameters are stored (one small JSON file per entry),
+not the pickled results object with its copy of the data: a forecastable
+results object is rebuilt from the series and the parameters with a single
+Kalman filter pass (see `sarima_model.train_sarima`), which takes
+milliseconds instead of a full MLE fit.
+
+The store is bounded by entry count and total bytes, counting the named
+entries under `latest/` and `orders/` too; the least recently used entries
+(by file mtime, refreshed on every hit) are evicted first. Puts keep an
+approximate count and only scan the store when it goes over a bound or
+every `scan_every` puts (to see other processes' writes); an eviction then
+frees a tenth of the bounds at once, so the next one is many puts away.
+
+Entries written with a `name` (e.g. a (state, crop) pair) are also recorded
+as that name's latest fit under `latest/`, so the next update of the same
+series can start from them even though its values (and key) have changed.
+Orders chosen by `order_selection.select_order` are memoized the same way
+under `orders/`.
+"""
+
+from pathlib import Path
+import hashlib
+import json
+import os
+import tempfile
+from importlib import metadata
+
+import numpy as np
+
+BASE = Path(__file__).resolve().parents[1]
+MODEL_DIR = BASE / "data" / "models"
+
+
+def _statsmodels_version():
+    try:
+        return metadata.version("statsmodels")
+    except metadata.PackageNotFoundError:
+        return "unknown"
+
+
+def series_digest(series):
+    """Return the sha256 hex digest of the series values as float64."""
+    values = np.ascontiguousarray(np.asarray(series, dtype="float64"))
+    return hashlib.sha256(values.tobytes()).hexdigest()
+
+
+def model_key(series, order, seasonal_order, version=None):
+    """Return the hex cache key for fitting `series` with the given spec."""
+    h = hashlib.sha256()
+    h.update(series_digest(series).encode("ascii"))
+    spec = {
+        "order": list(order),
+        "seasonal_order": list(seasonal_order),
+        "statsmodels": version or _statsmodels_version(),
+    }
+    h.update(json.dumps(spec, sort_keys=True).encode("utf-8"))
+    return h.hexdigest()
+
+
+class ModelStore:
+    """Size-bounded LRU store of fitted SARIMA parameters in `root`."""
+
+    def __init__(
+        self, root=MODEL_DIR, max_entries=10000, max_bytes=64 * 2**20, scan_every=None
+    ):
+        self.root = Path(root)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.scan_every = scan_every or max(64, max_entries // 10)
+        # (entries, bytes) as of the last scan plus our writes since; None
+        # until the first scan
+        self._approx = None
+        self._puts_since_scan = 0
+
+    def _path(self, key):
+        return self.root / f"{key}.json"
+
+    def _named_path(self, kind, name):
+        digest = hashlib.sha256(json.dumps(name, default=str).encode("utf-8"))
+        return self.root / kind / f"{digest.hexdigest()}.json"
+
+    def _read_json(self, path):
+        try:
+            with path.open(encoding="utf-8") as fh:
+                return json.load(fh)
+        except (OSError, ValueError):
+            return None
+
+    @staticmethod
+    def _touch(path):
+        try:
+            os.utime(path)  # mark as recently used
+        except OSError:
+            pass
+
+    def _write_json(self, path, entry):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # a unique temp file: threads of one process may write the same key
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=path.stem, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as fh:
+                json.dump(entry, fh)
+                size = fh.tell()
+            os.replace(tmp, path)
+        except BaseException:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            raise
+        self._count_write(size)
+
+    def _count_write(self, size):
+        """Track a write; evict when the store may be over its bounds."""
+        self._puts_since_scan += 1
+        if self._approx is not None and self._puts_since_scan < self.scan_every:
+            count, total = self._approx
+            self._approx = (count + 1, total + size)
+            if count + 1 <= self.max_entries and total + size <= self.max_bytes:
+                return
+        self.evict()
+
+    def get(self, series, order, seasonal_order):
+        """Return the stored entry dict for this series/spec, or None."""
+        path = self._path(model_key(series, order, seasonal_order))
+        entry = self._read_json(path)
+        if entry is None:
+            return None
+        self._touch(path)
+        return entry
+
+    def get_latest(self, name, order, seasonal_order):
+        """Return the latest entry stored under `name` for this spec, or None.
+
+        Unlike `get`, the series values are not part of the lookup: the entry
+        describes whatever series was last fitted under that name.
+        """
+        path = self._named_path("latest", name)
+        entry = self._read_json(path)
+        if entry is None:
+            return None
+        self._touch(path)
+        same_spec = (
+            entry.get("order") == list(order)
+            and entry.get("seasonal_order") == list(seasonal_order)
+            and entry.get("statsmodels") == _statsmodels_version()
+        )
+        return entry if same_spec else None
+
+    def put(
+        self, series, results, order, seasonal_order, name=None, estimated_nobs=None
+    ):
+        """Store the fitted parameters of `results` and enforce the bounds.
+
+        `estimated_nobs` records how many observations the parameters were
+        last estimated on (defaults to the series length).
+        """
+        key = model_key(series, order, seasonal_order)
+        entry = {
+            "key": key,
+            "name": name,
+            "order": list(order),
+            "seasonal_order": list(seasonal_order),
+            "statsmodels": _statsmodels_version(),
+            "nobs": len(series),
+            "estimated_nobs": int(estimated_nobs or len(series)),
+            "param_names": list(getattr(results, "param_names", [])),
+            "params": [float(p) for p in np.asarray(results.params)],
+        }
+        self._write_json(self._path(key), entry)
+        if name is not None:
+            self._write_json(self._named_path("latest", name), entry)
+        return key
+
+    def get_order(self, name):
+        """Return the memoized order-selection entry for `name`, or None."""
+        path = self._named_path("orders", name)
+        entry = self._read_json(path)
+        if entry is not None:
+            self._touch(path)
+        return entry
+
+    def put_order(self, name, entry):
+        """Memoize an order-selection entry (a JSON-serializable dict)."""
+        self._write_json(self._named_path("orders", name), entry)
+
+    def _scan(self):
+        """(mtime_ns, size, path) of every entry, including named ones."""
+        entries = []
+        for d in (self.root, self.root / "latest", self.root / "orders"):
+            try:
+                it = os.scandir(d)
+            except FileNotFoundError:
+                continue
+            with it:
+                for de in it:
+                    if de.name.endswith(".json") and de.is_file():
+                        st = de.stat()
+                        entries.append((st.st_mtime_ns, st.st_size, de.path))
+        return entries
+
+    def evict(self):
+        """Delete least recently used entries until within both bounds.
+
+        When over a bound, entries are deleted until a tenth of it is free.
+        """
+        entries = sorted(self._scan())
+        count = len(entries)
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        if count > self.max_entries or total > self.max_bytes:
+            max_entries = self.max_entries - self.max_entries // 10
+            max_bytes = self.max_bytes - self.max_bytes // 10
+            for _, size, path in entries:
+                if count <= max_entries and total <= max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+                count -= 1
+                total -= size
+                removed += 1
+        self._approx = (count, total)
+        self._puts_since_scan = 0
+        return removed
+
+    def clear(self):
+        if not self.root.exists():
+            return
+        for pattern in ["*.json", "latest/*.json", "orders/*.json"]:
+            for p in self.root.glob(pattern):
+                p.unlink()
@@ -0,0 +1,55 @@
+"""Shared normalization of state, crop and subdivision names.
+
+All join and lookup keys in the project go through `normalize_text`:
+lower-case, `&` spelled as `and`, punctuation turned into spaces and runs
+of whitespace collapsed, e.g. " Andaman & Nicobar\nIslands " ->
+"andaman and nicobar islands".
+
+`normalize_series` normalizes a column by its distinct values only
+(factorize, normalize each unique value, map back by code), and
+`normalize_text` keeps a process-wide memo, so repeated values and repeated
+calls across the pipeline cost a dictionary lookup.
+"""
+
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+
+@lru_cache(maxsize=1 << 16)
+def _normalize_str(s):
+    s = s.lower().strip()
+    s = s.replace("&", "and")
+    # remove punctuation except whitespace
+    s = "".join(ch if ch.isalnum() or ch.isspace() else " " for ch in s)
+    return " ".join(s.split())
+
+
+def normalize_text(s):
+    """Normalize one value; missing values (None/NaN) are returned as-is."""
+    if s is None or (not isinstance(s, str) and pd.isna(s)):
+        return s
+    return _normalize_str(str(s))
+
+
+def normalize_series(values):
+    """Normalize a Series (or array-like) of names; missing values stay NaN.
+
+    Categorical input gives categorical output (one category per distinct
+    normalized name), anything else gives an object Series.
+    """
+    s = values if isinstance(values, pd.Series) else pd.Series(values)
+    codes, uniques = pd.factorize(s)
+    normalized = np.array([normalize_text(u) for u in uniques], dtype=object)
+    if isinstance(s.dtype, pd.CategoricalDtype):
+        new_codes, categories = pd.factorize(normalized, sort=True)
+        # code -1 (missing) picks the appended -1
+        codes = np.append(new_codes, -1)[codes]
+        result = pd.Categorical.from_codes(codes, categories=categories)
+        return pd.Series(result, index=s.index, name=s.name)
+    result = np.full(len(s), np.nan, dtype=object)
+    valid = codes >= 0
+    if valid.any():
+        result[valid] = normalized[codes[valid]]
+    return pd.Series(result, index=s.index, name=s.name)
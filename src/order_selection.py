@@ -0,0 +1,173 @@
+"""Automatic SARIMA order selection.
+
+Opt-in alternative to the fixed `sarima_model.ORDER` x `SEASONAL_ORDER`:
+`select_order` searches a (p,d,q)(P,D,Q,s) grid for the spec with the best
+information criterion (AIC or BIC).
+
+The search is pruned in two stages. Every admissible candidate is first
+scored with a cheap screening fit (a few optimizer iterations and no
+covariance estimate), and only the `top_k` best are re-estimated with a full
+MLE fit. statsmodels' SARIMAX has no conditional-sum-of-squares estimator
+for seasonal models, so the truncated likelihood fit plays that role.
+
+With a `model_store.ModelStore` the chosen spec is memoized per series name
+and reused until the series changes materially (history revised, or
+`reselect_every` new observations since the last search). The winning fit's
+parameters are stored too, so the `train_sarima` call that follows is a
+store hit instead of another MLE fit.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from types import SimpleNamespace
+import itertools
+import warnings
+
+import numpy as np
+
+from src import sarima_model
+from src.model_store import series_digest
+
+DEFAULT_GRID = {
+    "p": (0, 1, 2),
+    "d": (0, 1),
+    "q": (0, 1, 2),
+    "P": (0, 1),
+    "D": (0, 1),
+    "Q": (0, 1),
+    "s": (4,),
+}
+CRITERIA = ("aic", "bic")
+# optimizer iterations for the screening stage
+SCREEN_MAXITER = 15
+
+
+def candidate_specs(grid=None, nobs=None):
+    """Return the (order, seasonal_order) pairs of a search grid.
+
+    `grid` overrides keys of `DEFAULT_GRID`. With `nobs`, specs that leave
+    too few observations after differencing to estimate their parameters
+    are pruned up front.
+    """
+    grid = {**DEFAULT_GRID, **(grid or {})}
+    specs = {}
+    for p, d, q, P, D, Q, s in itertools.product(*(grid[k] for k in "pdqPDQs")):
+        if s <= 1:
+            P = D = Q = s = 0
+        if nobs is not None:
+            usable = nobs - d - D * s
+            n_params = p + q + P + Q + 1
+            if usable <= max(n_params + 1, p + P * s, q + Q * s):
+                continue
+        specs[((p, d, q), (P, D, Q, s))] = None
+    return list(specs)
+
+
+def _score(values, order, seasonal_order, criterion, maxiter=None):
+    """Fit one candidate; return (score, params, param_names), inf on failure."""
+    kwargs = {"disp": False, "cov_type": "none"}
+    if maxiter:
+        kwargs["maxiter"] = maxiter
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            model = sarima_model._build_model(values, order, seasonal_order)
+            res = model.fit(**kwargs)
+        score = float(getattr(res, criterion))
+        params = [float(p) for p in np.asarray(res.params)]
+        names = list(res.param_names)
+    except Exception:
+        return float("inf"), None, None
+    if not np.isfinite(score):
+        return float("inf"), None, None
+    return score, params, names
+
+
+def _evaluate(values, specs, criterion, maxiter, workers):
+    args = [(values, o, so, criterion, maxiter) for o, so in specs]
+    if workers <= 1 or len(args) <= 1:
+        return [_score(*a) for a in args]
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=sarima_model._limit_blas_threads,
+        initargs=(1,),
+    ) as pool:
+        return list(pool.map(_score, *zip(*args)))
+
+
+def _memo_is_current(memo, values, grid, criterion, reselect_every):
+    if memo is None or memo.get("criterion") != criterion:
+        return False
+    if memo.get("grid") != grid:
+        return False
+    nobs = int(memo.get("nobs", -1))
+    if nobs < 0 or nobs > len(values) or len(values) - nobs >= reselect_every:
+        return False
+    return series_digest(values[:nobs]) == memo.get("digest")
+
+
+def select_order(
+    series,
+    grid=None,
+    criterion="aic",
+    top_k=3,
+    workers=1,
+    store=None,
+    name=None,
+    reselect_every=None,
+):
+    """Return the best (order, seasonal_order) for `series` from a grid.
+
+    Candidates are screened in parallel over `workers` processes and the
+    `top_k` best re-fitted with full MLE; see the module docstring. The
+    memo is keyed by `name` (e.g. a (state, crop) pair) or, without one, by
+    the series values. Falls back to the fixed project spec if no candidate
+    can be fitted.
+    """
+    if criterion not in CRITERIA:
+        raise ValueError(f"criterion must be one of {CRITERIA}, got {criterion!r}")
+    values = np.asarray(series, dtype=float)
+    full_grid = {k: list(v) for k, v in {**DEFAULT_GRID, **(grid or {})}.items()}
+    if reselect_every is None:
+        reselect_every = 2 * max(max(full_grid["s"]), 1)
+    memo_name = name if name is not None else series_digest(values)
+
+    if store is not None:
+        memo = store.get_order(memo_name)
+        if _memo_is_current(memo, values, full_grid, criterion, reselect_every):
+            return tuple(memo["order"]), tuple(memo["seasonal_order"])
+
+    specs = candidate_specs(full_grid, nobs=len(values))
+    if not specs:
+        return sarima_model.ORDER, sarima_model.SEASONAL_ORDER
+
+    # stage 1: cheap screening fits of every candidate
+    screened = _evaluate(values, specs, criterion, SCREEN_MAXITER, workers)
+    ranked = sorted((r[0], i) for i, r in enumerate(screened) if np.isfinite(r[0]))
+    shortlist = [specs[i] for _, i in ranked[:top_k]]
+    if not shortlist:
+        return sarima_model.ORDER, sarima_model.SEASONAL_ORDER
+
+    # stage 2: full MLE on the shortlist only
+    final = _evaluate(values, shortlist, criterion, None, workers)
+    best = min(range(len(shortlist)), key=lambda i: final[i][0])
+    if not np.isfinite(final[best][0]):
+        return sarima_model.ORDER, sarima_model.SEASONAL_ORDER
+    order, seasonal_order = shortlist[best]
+
+    if store is not None:
+        score, params, names = final[best]
+        fitted = SimpleNamespace(params=params, param_names=names)
+        store.put(values, fitted, order, seasonal_order)
+        store.put_order(
+            memo_name,
+            {
+                "order": list(order),
+                "seasonal_order": list(seasonal_order),
+                "criterion": criterion,
+                "score": score,
+                "grid": full_grid,
+                "nobs": len(values),
+                "digest": series_digest(values),
+            },
+        )
+    return order, seasonal_order
@@ -0,0 +1,214 @@
+"""Parquet datasets partitioned by state (and optionally crop).
+
+`write_partitioned` splits a frame into one Parquet file per partition,
+in hive-style directories (``state_name=karnataka/part-0.parquet``), and
+records the partitions in an ``_index.json`` next to them. Readers use the
+index to open only the files of the requested states/crops and only the
+requested columns; filters on a column that is not a partition key are
+pushed down to the Parquet reader, which skips row groups by their
+statistics. The dataset is written to a temporary directory and swapped
+in, so readers never see a half-written dataset.
+
+A dataset written as a copy of a file (`source=`) records that file's
+mtime, size and sha256 in its index; `matches_source` tells readers
+whether the copy is still current, so they can fall back to the file.
+
+Partition values are the normalized names `clean_data` produces, and
+filter values are normalized the same way (`normalize_text`).
+"""
+
+from pathlib import Path
+from urllib.parse import quote
+import hashlib
+import json
+import os
+import shutil
+
+import pandas as pd
+
+from src.normalize import normalize_text
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except Exception:
+    pa = None
+    pq = None
+
+INDEX_FILE = "_index.json"
+PART_FILE = "part-0.parquet"
+# hive's directory name for rows whose partition value is missing
+NULL_PARTITION = "__HIVE_DEFAULT_PARTITION__"
+FILTER_COLUMNS = {"states": "state_name", "crops": "crop"}
+
+
+def _key(values):
+    return values if isinstance(values, tuple) else (values,)
+
+
+def _stamp(path, chunk_size=1 << 20):
+    st = os.stat(path)
+    h = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(chunk_size), b""):
+            h.update(block)
+    return {"mtime_ns": st.st_mtime_ns, "size": st.st_size, "sha256": h.hexdigest()}
+
+
+def matches_source(index, path):
+    """True if `path` still matches the source file recorded in `index`.
+
+    Compares mtime and size first and only hashes the file when those
+    changed. An index without a recorded source never matches.
+    """
+    source = (index or {}).get("source")
+    if source is None:
+        return False
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return False
+    if st.st_mtime_ns == source["mtime_ns"] and st.st_size == source["size"]:
+        return True
+    return _stamp(path)["sha256"] == source["sha256"]
+
+
+def write_partitioned(df, root, partition_by=("state_name",), source=None):
+    """Write `df` as a Parquet dataset under `root`; return the index dict.
+
+    `source` is the path of a file holding the same rows (see
+    `matches_source`).
+    """
+    if pq is None:
+        raise ImportError("pyarrow is required to write Parquet datasets")
+    partition_by = list(partition_by)
+    root = Path(root)
+    tmp = root.with_name(root.name + ".tmp")
+    shutil.rmtree(tmp, ignore_errors=True)
+
+    partitions = []
+    groups = df.groupby(partition_by, observed=True, sort=True, dropna=False)
+    for values, part in groups:
+        values = [None if pd.isna(v) else str(v) for v in _key(values)]
+        rel = Path(
+            *(
+                f"{c}={NULL_PARTITION if v is None else quote(v, safe='')}"
+                for c, v in zip(partition_by, values)
+            )
+        )
+        table = pa.Table.from_pandas(
+            part.drop(columns=partition_by), preserve_index=False
+        )
+        (tmp / rel).mkdir(parents=True, exist_ok=True)
+        pq.write_table(table, tmp / rel / PART_FILE)
+        partitions.append(
+            {"values": values, "path": (rel / PART_FILE).as_posix(), "rows": len(part)}
+        )
+
+    index = {
+        "partition_by": partition_by,
+        "columns": [str(c) for c in df.columns],
+        "partitions": partitions,
+    }
+    if source is not None:
+        index["source"] = _stamp(source)
+    tmp.mkdir(parents=True, exist_ok=True)
+    with (tmp / INDEX_FILE).open("w", encoding="utf-8") as fh:
+        json.dump(index, fh, indent=1)
+
+    old = root.with_name(root.name + ".old")
+    shutil.rmtree(old, ignore_errors=True)
+    if root.exists():
+        os.replace(root, old)
+    os.replace(tmp, root)
+    shutil.rmtree(old, ignore_errors=True)
+    return index
+
+
+def read_index(root):
+    """Return the dataset index under `root`, or None if there is none."""
+    try:
+        with (Path(root) / INDEX_FILE).open(encoding="utf-8") as fh:
+            return json.load(fh)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def _wanted(states=None, crops=None):
+    """{column: set of normalized values} for the filters that were given."""
+    wanted = {}
+    for arg, values in (("states", states), ("crops", crops)):
+        if values is None:
+            continue
+        if isinstance(values, str):
+            values = [values]
+        wanted[FILTER_COLUMNS[arg]] = {normalize_text(v) for v in values}
+    return wanted
+
+
+def partition_values(root, column="state_name"):
+    """Sorted distinct values of a partition column, read from the index only."""
+    index = read_index(root)
+    if index is None or column not in index["partition_by"]:
+        return []
+    pos = index["partition_by"].index(column)
+    return sorted({p["values"][pos] for p in index["partitions"]} - {None})
+
+
+def read_partitioned(root, states=None, crops=None, columns=None):
+    """Read the rows of the given states/crops and the given columns.
+
+    Only partitions matching the filters are opened; `None` means no filter.
+    Rows are returned grouped by partition.
+    """
+    root = Path(root)
+    index = read_index(root)
+    if index is None:
+        raise FileNotFoundError(f"No Parquet dataset index in {root}")
+    partition_by = index["partition_by"]
+    wanted = _wanted(states, crops)
+    # filtered columns that are not partition keys are filtered by the reader
+    row_filters = [
+        (c, "in", sorted(v)) for c, v in wanted.items() if c not in partition_by
+    ]
+    row_filters = [f for f in row_filters if f[0] in index["columns"]]
+    columns = list(index["columns"] if columns is None else columns)
+    file_columns = [c for c in columns if c not in partition_by]
+
+    frames = []
+    for part in index["partitions"]:
+        values = dict(zip(partition_by, part["values"]))
+        if any(c in wanted and values[c] not in wanted[c] for c in partition_by):
+            continue
+        table = pq.read_table(
+            root / part["path"], columns=file_columns, filters=row_filters or None
+        )
+        frame = table.to_pandas()
+        for c in partition_by:
+            if c in columns:
+                frame[c] = values[c]
+        frames.append(frame[columns])
+
+    if not frames:
+        return pd.DataFrame(columns=columns)
+    df = pd.concat(frames, ignore_index=True)
+    for c in columns:
+        if c in partition_by or isinstance(df[c].dtype, pd.CategoricalDtype):
+            # partitions may differ in categories; keep one sorted set
+            df[c] = df[c].astype(object).astype("category")
+    return df
+
+
+def filter_frame(df, states=None, crops=None, columns=None):
+    """Apply the `read_partitioned` filters to an in-memory frame."""
+    mask = None
+    for col, values in _wanted(states, crops).items():
+        if col not in df.columns:
+            continue
+        hit = df[col].isin(values)
+        mask = hit if mask is None else mask & hit
+    if mask is not None:
+        df = df[mask].reset_index(drop=True)
+    if columns is not None:
+        df = df[list(columns)]
+    return df
@@ -0,0 +1,384 @@
+"""Incremental runner for the data pipeline stages.
+
+The pipeline used to be a sequence of scripts (`merge_pipeline.py`,
+`add_year_month.main`, `merge_datasets.merge_all_datasets`,
+`suitability_report.build_action_plan`, then training via `main.py`), each
+rereading and rewriting everything. Here every stage declares the files it
+reads and writes, and the runner records a sha256 of both in
+`data/processed/pipeline_manifest.json`:
+
+- a stage whose inputs and outputs still hash to the recorded values is
+  skipped;
+- a stage that reran but wrote byte-identical outputs does not invalidate
+  the stages after it (their inputs hash the same);
+- stages whose inputs are ready run concurrently in a thread pool, e.g.
+  the weather and fertilizer cleaning.
+
+A stage whose required inputs do not exist is reported as `missing` and
+later stages use whatever files are already there; a stage that raises
+is reported as `failed` and the stages that depend on it are `blocked`.
+Files are only rehashed when their mtime or size changed.
+
+Run with ``python -m src.pipeline [--force] [--workers N] [--train]``.
+"""
+
+from collections.abc import Callable
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from functools import partial
+from pathlib import Path
+from typing import NamedTuple
+import argparse
+import json
+import os
+
+import pandas as pd
+
+from merge_pipeline import clean_in_memory
+from src import add_year_month, suitability_report
+from src.data_loader import _file_digest
+from src.parquet_dataset import INDEX_FILE, pq
+from src.merge_datasets import (
+    FINAL_DATASET_DIR,
+    combine_datasets,
+    load_crop,
+    load_fertilizer,
+    load_weather,
+)
+
+BASE = Path(__file__).resolve().parents[1]
+RAW = BASE / "data" / "raw"
+PROC = BASE / "data" / "processed"
+OUT = BASE / "data"
+
+MANIFEST_FILE = PROC / "pipeline_manifest.json"
+# cleaned inputs of the merge stage, pickled so dtypes survive unchanged
+STAGE_DIR_NAME = "pipeline"
+
+
+class Stage(NamedTuple):
+    """One pipeline step: `func()` reads `inputs` and writes `outputs`.
+
+    `optional` inputs are hashed when present but their absence does not
+    stop the stage.
+    """
+
+    name: str
+    func: Callable
+    inputs: tuple = ()
+    outputs: tuple = ()
+    optional: tuple = ()
+
+
+class _Hasher:
+    """sha256 of files, memoized on (mtime_ns, size)."""
+
+    def __init__(self, memo=None):
+        self.memo = dict(memo or {})
+
+    def __call__(self, path):
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return None
+        key = str(path)
+        entry = self.memo.get(key)
+        if (
+            entry
+            and entry["mtime_ns"] == st.st_mtime_ns
+            and entry["size"] == st.st_size
+        ):
+            return entry["sha256"]
+        digest = _file_digest(path)
+        self.memo[key] = {
+            "mtime_ns": st.st_mtime_ns,
+            "size": st.st_size,
+            "sha256": digest,
+        }
+        return digest
+
+
+def _load_manifest(path):
+    try:
+        with open(path, encoding="utf-8") as fh:
+            manifest = json.load(fh)
+    except (FileNotFoundError, ValueError):
+        return {"stages": {}, "files": {}}
+    manifest.setdefault("stages", {})
+    manifest.setdefault("files", {})
+    return manifest
+
+
+def _save_manifest(manifest, path):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    with tmp.open("w", encoding="utf-8") as fh:
+        json.dump(manifest, fh, indent=1, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def _to_pickle(df, path):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    df.to_pickle(tmp)
+    os.replace(tmp, path)
+
+
+def _dependencies(stages):
+    producers = {str(p): s.name for s in stages for p in s.outputs}
+    deps = {}
+    for s in stages:
+        reads = (str(p) for p in s.inputs + s.optional)
+        deps[s.name] = {
+            producers[p] for p in reads if p in producers and producers[p] != s.name
+        }
+    return deps
+
+
+def run(stages, force=False, workers=None, manifest_file=None):
+    """Run `stages` (listed in dependency order); return {name: status}.
+
+    Status is one of `ran`, `skipped`, `missing`, `failed` or `blocked`.
+    With `workers=1` stages run one after another in this thread.
+    """
+    manifest_file = Path(manifest_file or MANIFEST_FILE)
+    manifest = _load_manifest(manifest_file)
+    digest = _Hasher(manifest["files"])
+    deps = _dependencies(stages)
+    status = {}
+    pending = list(stages)
+    running = {}
+
+    def hashes(paths):
+        return {str(p): digest(p) for p in paths}
+
+    def finish(stage, input_hashes, error):
+        if error is not None:
+            print(f"WARN: pipeline stage {stage.name} failed: {error}")
+            status[stage.name] = "failed"
+            return
+        manifest["stages"][stage.name] = {
+            "inputs": input_hashes,
+            "outputs": hashes(stage.outputs),
+        }
+        manifest["files"] = digest.memo
+        _save_manifest(manifest, manifest_file)
+        status[stage.name] = "ran"
+
+    def call(stage):
+        try:
+            stage.func()
+        except Exception as e:
+            return e
+        return None
+
+    pool = ThreadPoolExecutor(workers) if workers is None or workers > 1 else None
+    try:
+        while pending or running:
+            for stage in list(pending):
+                if not deps[stage.name] <= status.keys():
+                    continue
+                pending.remove(stage)
+                if any(status[d] in ("failed", "blocked") for d in deps[stage.name]):
+                    status[stage.name] = "blocked"
+                    continue
+                if any(digest(p) is None for p in stage.inputs):
+                    status[stage.name] = "missing"
+                    continue
+                input_hashes = hashes(stage.inputs + stage.optional)
+                record = manifest["stages"].get(stage.name)
+                if (
+                    not force
+                    and record is not None
+                    and record["inputs"] == input_hashes
+                    and None not in record["outputs"].values()
+                    and record["outputs"] == hashes(stage.outputs)
+                ):
+                    status[stage.name] = "skipped"
+                    continue
+                print(f"Running pipeline stage: {stage.name}")
+                if pool is None:
+                    finish(stage, input_hashes, call(stage))
+                else:
+                    running[pool.submit(call, stage)] = (stage, input_hashes)
+            if running:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    stage, input_hashes = running.pop(future)
+                    finish(stage, input_hashes, future.result())
+            elif pending and not any(deps[s.name] <= status.keys() for s in pending):
+                # stages reading each other's outputs
+                names = [s.name for s in pending]
+                raise ValueError(f"dependency cycle between pipeline stages: {names}")
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    manifest["files"] = digest.memo
+    _save_manifest(manifest, manifest_file)
+    return {s.name: status[s.name] for s in stages}
+
+
+def _clean_crop(raw_dir, processed_dir, out_file):
+    _to_pickle(load_crop(str(raw_dir), str(processed_dir)), out_file)
+
+
+def _clean_weather(raw_dir, out_file):
+    _to_pickle(load_weather(str(raw_dir)), out_file)
+
+
+def _clean_fertilizer(raw_dir, out_file):
+    _to_pickle(load_fertilizer(str(raw_dir)), out_file)
+
+
+def _merge(crop_file, weather_file, fertilizer_file, processed_dir, out_dir):
+    combine_datasets(
+        pd.read_pickle(crop_file),
+        pd.read_pickle(weather_file),
+        pd.read_pickle(fertilizer_file),
+        processed_dir=str(processed_dir),
+        out_dir=str(out_dir),
+    )
+
+
+def _forecasts(data_file, suit_file, db_file, workers=None):
+    from src.data_loader import read_csv_cached
+    from src.forecast_store import ForecastStore, build_forecast_store
+    from src.model_store import ModelStore
+
+    sarima, baseline, failed = build_forecast_store(
+        read_csv_cached(str(data_file)),
+        suit_file=suit_file,
+        store=ForecastStore(db_file),
+        workers=workers,
+        model_store=ModelStore(),
+    )
+    print(f"Forecasts stored: {sarima} SARIMA, {baseline} baseline, {failed} failed")
+
+
+def build_stages(raw_dir=None, processed_dir=None, out_dir=None, train=False):
+    """Return the project's pipeline stages for the given data directories."""
+    raw = Path(raw_dir or RAW)
+    proc = Path(processed_dir or PROC)
+    out = Path(out_dir or OUT)
+    work = proc / STAGE_DIR_NAME
+
+    crop_raw = raw / "Crop_production.csv"
+    cleaned = proc / "cleaned_crop_data.csv"
+    rainfall = raw / "rainfall_validation.csv"
+    manual_map = proc / "manual_state_to_subdivision.csv"
+    seasons = proc / Path(add_year_month.SEASON_FILE).name
+    with_year = proc / "cleaned_crop_data_with_year.csv"
+    crop_pkl = work / "crop.pkl"
+    weather_pkl = work / "weather.pkl"
+    fertilizer_pkl = work / "fertilizer.pkl"
+    final = out / "final_dataset.csv"
+    suitability = proc / "dataset_suitability.csv"
+    missing = proc / "missing_year_state_counts.csv"
+    plan = proc / "suitability_action_plan.csv"
+
+    merge_outputs = (final, suitability)
+    if pq is not None:
+        merge_outputs += (out / FINAL_DATASET_DIR / INDEX_FILE,)
+
+    stages = [
+        Stage(
+            "clean_raw",
+            partial(clean_in_memory, str(crop_raw), str(cleaned)),
+            inputs=(crop_raw,),
+            outputs=(cleaned,),
+        ),
+        Stage(
+            "add_year",
+            partial(
+                add_year_month.main,
+                crop_file=str(cleaned),
+                rainfall_file=str(rainfall),
+                out_file=str(with_year),
+                manual_map_file=str(manual_map),
+                season_file=str(seasons),
+            ),
+            inputs=(cleaned, rainfall),
+            outputs=(with_year,),
+            optional=(manual_map, seasons),
+        ),
+        Stage(
+            "clean_crop",
+            partial(_clean_crop, raw, proc, crop_pkl),
+            outputs=(crop_pkl,),
+            optional=(with_year, crop_raw),
+        ),
+        Stage(
+            "clean_weather",
+            partial(_clean_weather, raw, weather_pkl),
+            outputs=(weather_pkl,),
+            optional=(
+                raw / "Final_Dataset_after_temperature.csv",
+                raw / "Data_after_rainfall.csv",
+                raw / "temperature.csv",
+            ),
+        ),
+        Stage(
+            "clean_fertilizer",
+            partial(_clean_fertilizer, raw, fertilizer_pkl),
+            inputs=(raw / "Fertilizer.csv",),
+            outputs=(fertilizer_pkl,),
+        ),
+        Stage(
+            "merge",
+            partial(_merge, crop_pkl, weather_pkl, fertilizer_pkl, proc, out),
+            inputs=(crop_pkl, weather_pkl, fertilizer_pkl),
+            outputs=merge_outputs,
+        ),
+        Stage(
+            "action_plan",
+            partial(
+                suitability_report.build_action_plan,
+                suit_file=suitability,
+                missing_file=missing,
+                out_file=plan,
+            ),
+            inputs=(suitability,),
+            outputs=(plan,),
+            optional=(missing,),
+        ),
+    ]
+    if train:
+        # fits every usable `prepare_sarima_series` series once; the fitted
+        # models are kept in the ModelStore, which has its own keys
+        forecasts = proc / "forecasts.sqlite"
+        stages.append(
+            Stage(
+                "forecasts",
+                partial(_forecasts, with_year, suitability, forecasts),
+                inputs=(with_year, suitability),
+                outputs=(forecasts,),
+            )
+        )
+    return stages
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the data pipeline")
+    parser.add_argument(
+        "--force", action="store_true", help="Rerun every stage regardless of hashes"
+    )
+    parser.add_argument(
+        "--workers", type=int, default=None, help="Stages to run at once"
+    )
+    parser.add_argument(
+        "--train",
+        action="store_true",
+        help="Also train SARIMA models and precompute their forecasts",
+    )
+    args = parser.parse_args(argv)
+
+    status = run(build_stages(train=args.train), force=args.force, workers=args.workers)
+    for name, state in status.items():
+        print(f"  {name}: {state}")
+    return status
+
+
+if __name__ == "__main__":
+    main()
@@ -2,7 +2,7 @@ def recommend_crops(df, state):
     state_df = df[df["state_name"] == state]
 
     avg_yield = (
-        state_df.groupby("crop")["yield_ton_per_hec"]
+        state_df.groupby("crop", observed=True)["yield_ton_per_hec"]
         .mean()
         .sort_values(ascending=False)
     )
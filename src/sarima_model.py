@@ -1,17 +1,327 @@
-from statsmodels.tsa.statespace.sarimax import SARIMAX
+import os
+import time
+import traceback
+from collections.abc import Hashable
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Any, NamedTuple
 
+import numpy as np
 
-def train_sarima(series):
-    if len(series) < 8:
-        return None
+try:
+    from threadpoolctl import threadpool_limits
+except Exception:
+    threadpool_limits = None
+
+ORDER = (1, 1, 1)
+SEASONAL_ORDER = (1, 1, 1, 4)
+# series shorter than this are not fitted (train_sarima returns None)
+MIN_OBSERVATIONS = 8
+
+
+def __getattr__(name):
+    # statsmodels (and scipy under it) takes about a second to import, so it
+    # is loaded on first use: `sarima_model.SARIMAX` resolves it here
+    if name == "SARIMAX":
+        from statsmodels.tsa.statespace.sarimax import SARIMAX
 
-    model = SARIMAX(
+        globals()["SARIMAX"] = SARIMAX
+        return SARIMAX
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _build_model(series, order=ORDER, seasonal_order=SEASONAL_ORDER):
+    # a module-level SARIMAX (loaded or monkeypatched) wins over a fresh import
+    sarimax = globals().get("SARIMAX") or __getattr__("SARIMAX")
+    return sarimax(
         series,
-        order=(1, 1, 1),
-        seasonal_order=(1, 1, 1, 4),
+        order=order,
+        seasonal_order=seasonal_order,
         enforce_stationarity=False,
         enforce_invertibility=False,
     )
 
+
+def _resolve_spec(series, order, seasonal_order, auto_order, store, name):
+    if auto_order:
+        from src.order_selection import select_order
+
+        return select_order(series, store=store, name=name)
+    return order or ORDER, seasonal_order or SEASONAL_ORDER
+
+
+def train_sarima(
+    series, store=None, order=None, seasonal_order=None, auto_order=False, name=None
+):
+    """Fit a SARIMA model to `series`, or return None if too short.
+
+    The spec defaults to the project-wide `ORDER` x `SEASONAL_ORDER`; with
+    `auto_order=True` it is chosen per series by
+    `order_selection.select_order` instead.
+
+    With a `model_store.ModelStore`, parameters previously fitted to the same
+    series and spec are reused: the results are rebuilt with a single filter
+    pass instead of a new MLE fit, and fresh fits are written to the store.
+    `name` (e.g. a (state, crop) pair) keys the memoized order selection,
+    so a series that gained observations keeps its order, and records the
+    fit as that name's latest (see `update_sarima`).
+    """
+    if len(series) < MIN_OBSERVATIONS:
+        return None
+
+    order, seasonal_order = _resolve_spec(
+        series, order, seasonal_order, auto_order, store, name
+    )
+    if store is not None:
+        cached = load_sarima(series, store, order, seasonal_order)
+        if cached is not None:
+            return cached
+
+    model = _build_model(series, order, seasonal_order)
+
     model_fit = model.fit(disp=False)
+    if store is not None:
+        store.put(series, model_fit, order, seasonal_order, name=name)
     return model_fit
+
+
+def load_sarima(series, store, order=None, seasonal_order=None):
+    """Rebuild results for `series` from parameters in `store`, or None.
+
+    No optimization happens here: the stored parameters are applied with a
+    single filter pass.
+    """
+    order, seasonal_order = order or ORDER, seasonal_order or SEASONAL_ORDER
+    entry = store.get(series, order, seasonal_order)
+    if entry is None:
+        return None
+    return _build_model(series, order, seasonal_order).filter(entry["params"])
+
+
+def _previous_fit(previous, series, order, seasonal_order):
+    """Return (params, nobs, estimated_nobs) of a usable previous fit, or None.
+
+    `previous` is a results object or a `ModelStore` entry dict. It is only
+    usable if it has the same spec and `series` starts with exactly the
+    observations it was fitted on.
+    """
+    values = np.asarray(series, dtype=float)
+    if isinstance(previous, dict):
+        nobs = int(previous["nobs"])
+        if nobs > len(values):
+            return None
+        from src.model_store import model_key
+
+        if model_key(values[:nobs], order, seasonal_order) != previous["key"]:
+            return None
+        estimated = int(previous.get("estimated_nobs", nobs))
+        return np.asarray(previous["params"], dtype=float), nobs, estimated
+
+    same_spec = tuple(previous.model.order) == tuple(order) and tuple(
+        previous.model.seasonal_order
+    ) == tuple(seasonal_order)
+    if not same_spec:
+        return None
+    prev_endog = np.asarray(previous.model.endog, dtype=float).ravel()
+    nobs = len(prev_endog)
+    if nobs > len(values) or not np.array_equal(prev_endog, values[:nobs]):
+        return None
+    estimated = int(getattr(previous, "estimated_nobs", nobs))
+    return np.asarray(previous.params, dtype=float), nobs, estimated
+
+
+def update_sarima(
+    series,
+    previous=None,
+    store=None,
+    name=None,
+    refit_every=None,
+    order=None,
+    seasonal_order=None,
+    auto_order=False,
+):
+    """Update a fitted SARIMA model after new observations were appended.
+
+    `previous` is the results object (or `ModelStore` entry) fitted on a
+    prefix of `series`; when omitted it is looked up in `store` under
+    `name`. While fewer than `refit_every` observations (default: one
+    seasonal period) have arrived since the parameters were last estimated,
+    the previous parameters are kept and only extended over the new data
+    with a filter pass. Otherwise the model is re-estimated with
+    `start_params` seeded from the previous fit, which converges in far
+    fewer iterations than a cold start. Without a usable previous fit (or
+    if the spec changed) the model is fitted from scratch. `order`,
+    `seasonal_order` and `auto_order` are as in `train_sarima`; automatic
+    selection is memoized under `name`.
+
+    The returned results carry an `estimated_nobs` attribute and are
+    forecast with `forecast.forecast_future` as usual.
+    """
+    if len(series) < MIN_OBSERVATIONS:
+        return None
+
+    order, seasonal_order = _resolve_spec(
+        series, order, seasonal_order, auto_order, store, name
+    )
+    if refit_every is None:
+        refit_every = seasonal_order[3] or 1
+
+    if previous is None and store is not None:
+        previous = store.get(series, order, seasonal_order)
+        if previous is None and name is not None:
+            previous = store.get_latest(name, order, seasonal_order)
+    prev = None
+    if previous is not None:
+        prev = _previous_fit(previous, series, order, seasonal_order)
+
+    model = _build_model(series, order, seasonal_order)
+    if prev is None:
+        model_fit = model.fit(disp=False)
+        estimated_nobs = len(series)
+    else:
+        params, _, estimated_nobs = prev
+        if len(series) - estimated_nobs < refit_every:
+            # extend: same parameters, state filtered over the new observations
+            model_fit = model.filter(params)
+        else:
+            model_fit = model.fit(start_params=params, disp=False)
+            estimated_nobs = len(series)
+
+    model_fit.estimated_nobs = estimated_nobs
+    if store is not None:
+        store.put(
+            series,
+            model_fit,
+            order,
+            seasonal_order,
+            name=name,
+            estimated_nobs=estimated_nobs,
+        )
+    return model_fit
+
+
+class FitResult(NamedTuple):
+    """Outcome of fitting one series in `train_sarima_many`."""
+
+    key: Hashable
+    model: Any
+    seconds: float
+    error: str | None = None
+    skipped: bool = False
+
+    @property
+    def ok(self) -> bool:
+        return self.model is not None and self.error is None
+
+
+def _limit_blas_threads(blas_threads):
+    """Pool initializer: cap BLAS/OpenMP threads for the worker process.
+
+    Without this every worker starts one BLAS thread per core and the pool
+    oversubscribes the machine.
+    """
+    if threadpool_limits is not None and blas_threads:
+        threadpool_limits(limits=blas_threads)
+
+
+def _fit_one(key, series, store=None, incremental=False, auto_order=False):
+    start = time.perf_counter()
+    try:
+        if incremental:
+            model = update_sarima(series, store=store, name=key, auto_order=auto_order)
+        else:
+            model = train_sarima(series, store=store, auto_order=auto_order, name=key)
+        return FitResult(key, model, time.perf_counter() - start)
+    except Exception:
+        return FitResult(key, None, time.perf_counter() - start, traceback.format_exc())
+
+
+def bounded_map(func, items, workers=None, blas_threads=1, on_error=None):
+    """Run `func(*args)` for the (key, args) pairs of `items` in a process pool.
+
+    Yields (key, result) pairs in completion order. At most `2 * workers`
+    calls are in flight, so `items` may be lazy. An item whose args are
+    None is not run and yields (key, None) right away. If a worker dies
+    (e.g. BrokenProcessPool) the pair is (key, on_error(key, traceback)).
+    Each worker is capped to `blas_threads` BLAS threads; `workers=1` runs
+    inline under the same cap.
+    """
+    workers = workers or os.cpu_count() or 1
+
+    if workers <= 1:
+        for key, args in items:
+            if args is None:
+                yield key, None
+            elif threadpool_limits is not None and blas_threads:
+                with threadpool_limits(limits=blas_threads):
+                    yield key, func(*args)
+            else:
+                yield key, func(*args)
+        return
+
+    def drain(futures):
+        for fut in futures:
+            key = pending.pop(fut)
+            try:
+                yield key, fut.result()
+            except Exception:
+                # the worker itself died (e.g. BrokenProcessPool)
+                yield key, on_error(key, traceback.format_exc())
+
+    pending = {}
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_limit_blas_threads,
+        initargs=(blas_threads,),
+    ) as pool:
+        for key, args in items:
+            if args is None:
+                yield key, None
+                continue
+            pending[pool.submit(func, *args)] = key
+            if len(pending) >= 2 * workers:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                yield from drain(done)
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            yield from drain(done)
+
+
+def train_sarima_many(
+    series_iter,
+    workers=None,
+    blas_threads=1,
+    store=None,
+    incremental=False,
+    auto_order=False,
+):
+    """Fit SARIMA models for many series in parallel.
+
+    `series_iter` yields (key, series) pairs, e.g. a
+    `time_series_builder.SeriesIndex`. Fits run in a process pool of
+    `workers` processes (default: one per CPU; `workers=1` fits inline),
+    each capped to `blas_threads` BLAS threads.
+
+    This is a generator: a `FitResult` is yielded for every input series as
+    soon as it is available, so results arrive in completion order, not
+    input order. Series shorter than `MIN_OBSERVATIONS` are yielded as
+    skipped without being submitted, and a failing fit is yielded with its
+    traceback in `error` instead of aborting the batch. Only a bounded
+    number of series is in flight at a time, so `series_iter` may be lazy.
+    An optional `store` is passed through to `train_sarima`; with
+    `incremental=True` each series is instead updated from its previous fit
+    in the store via `update_sarima`, using its key as the name.
+    `auto_order` selects each series' spec as in `train_sarima`.
+    """
+
+    def items():
+        for key, series in series_iter:
+            if len(series) < MIN_OBSERVATIONS:
+                yield key, None
+            else:
+                yield key, (key, series, store, incremental, auto_order)
+
+    def broken(key, error):
+        return FitResult(key, None, 0.0, error)
+
+    for key, result in bounded_map(_fit_one, items(), workers, blas_threads, broken):
+        yield result or FitResult(key, None, 0.0, skipped=True)
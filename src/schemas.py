@@ -0,0 +1,250 @@
+"""Column schemas of the project's CSV inputs, for typed, projected reads.
+
+Each known input kind maps to a function that picks, from a CSV header,
+the columns that kind needs and the dtype to read them with:
+
+- `crop`: crop production (state, crop, year, production, ...)
+- `rainfall`: subdivision-level monthly rainfall (`rainfall_validation.csv`)
+- `temperature`: state-level monthly temperatures
+- `fertilizer`: per-crop N/P/K requirements
+- `final`: crop-level rainfall/temperature data and the final dataset
+
+State, subdivision and crop names are read as `category`, years as
+`int16` and measures as `float32`. Column matching is case- and
+whitespace-insensitive and follows the same rules `clean_data` uses to
+find its columns, so projecting with `usecols` never drops a column it
+would keep. `read_typed_csv` detects the kind from the header when not
+given, and parses with pyarrow's CSV reader when pyarrow is installed.
+"""
+
+import csv
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+except Exception:
+    pa = None
+    pa_csv = None
+
+NAME = "category"
+YEAR = "int16"
+MEASURE = "float32"
+
+# monthly column names as they appear in the temperature and rainfall files
+TEMPERATURE_MONTHS = {
+    "jan",
+    "feb",
+    "mar",
+    "apr",
+    "may",
+    "june",
+    "july",
+    "aug",
+    "sep",
+    "oct",
+    "nov",
+    "dec",
+}
+RAINFALL_MONTHS = [
+    "jan",
+    "feb",
+    "mar",
+    "apr",
+    "may",
+    "jun",
+    "jul",
+    "aug",
+    "sep",
+    "oct",
+    "nov",
+    "dec",
+]
+PRODUCTION_COLUMNS = ["production", "production_in_tons", "production_tons"]
+MEASURE_COLUMNS = [
+    "rainfall",
+    "temperature",
+    "area_in_hectares",
+    "production_in_tons",
+    "yield_ton_per_hec",
+]
+
+
+def _key(column):
+    return str(column).strip().lower()
+
+
+def _first(keys, exact, contains=None):
+    found = next((c for c in exact if c in keys), None)
+    if found is None and contains:
+        found = next((c for c in keys if contains in c), None)
+    return found
+
+
+def _crop_columns(keys):
+    cols = {"year": YEAR}
+    for name in (
+        _first(keys, ["state_name", "state"]),
+        _first(keys, ["crop", "crop_name"]),
+    ):
+        if name:
+            cols[name] = NAME
+    cols[_first(keys, PRODUCTION_COLUMNS)] = MEASURE
+    for c in ["area_in_hectares", "yield_ton_per_hec"]:
+        cols[c] = MEASURE
+    cols["crop_type"] = NAME
+    return cols
+
+
+def _final_columns(keys):
+    cols = {"year": YEAR}
+    for name in (
+        _first(keys, ["state_name", "state"], contains="state"),
+        _first(keys, ["crop", "crop_name"], contains="crop"),
+        "crop_type",
+    ):
+        if name:
+            cols[name] = NAME
+    for c in MEASURE_COLUMNS:
+        cols[c] = MEASURE
+    return cols
+
+
+def _fertilizer_columns(keys):
+    return {"crop": NAME, "n": MEASURE, "p": MEASURE, "k": MEASURE, "ph": MEASURE}
+
+
+def _temperature_columns(keys):
+    # the state column is the first non-month column (often unnamed)
+    cols = {c: MEASURE for c in keys if c in TEMPERATURE_MONTHS}
+    state = next((c for c in keys if c not in TEMPERATURE_MONTHS), None)
+    if state is not None:
+        cols[state] = NAME
+    return cols
+
+
+def _rainfall_columns(keys):
+    cols = {c: MEASURE for c in RAINFALL_MONTHS}
+    cols[_first(keys, ["subdivision", "state_name"])] = NAME
+    cols[_first(keys, ["year"], contains="year")] = YEAR
+    return cols
+
+
+SCHEMAS = {
+    "crop": _crop_columns,
+    "rainfall": _rainfall_columns,
+    "temperature": _temperature_columns,
+    "fertilizer": _fertilizer_columns,
+    "final": _final_columns,
+}
+
+
+def detect_kind(columns):
+    """Return the schema kind for a header, or None if it is not recognized.
+
+    The checks mirror the order `clean_data` uses to tell its inputs apart.
+    Rainfall is told apart by its shape (a subdivision column, monthly
+    columns and no crop column): `add_year_month` writes a `subdivision`
+    column into the crop data too.
+    """
+    keys = {_key(c) for c in columns}
+    if {"n", "p", "k"}.issubset(keys) and "crop" in keys:
+        return "fertilizer"
+    if (
+        "subdivision" in keys
+        and set(RAINFALL_MONTHS) & keys
+        and not keys & {"crop", "crop_name"}
+    ):
+        return "rainfall"
+    if TEMPERATURE_MONTHS & keys:
+        return "temperature"
+    if "rainfall" in keys:
+        return "final"
+    if "year" in keys and any(k in keys for k in PRODUCTION_COLUMNS):
+        return "crop"
+    return None
+
+
+def read_header(path):
+    """Return the column names of a CSV as written in its first line."""
+    with open(path, newline="", encoding="utf-8-sig") as fh:
+        return next(csv.reader(fh), [])
+
+
+def schema_dtypes(header, kind):
+    """Return {column: dtype} for the columns of `header` used by `kind`."""
+    keys = [_key(c) for c in header]
+    wanted = SCHEMAS[kind](keys)
+    return {c: wanted[k] for c, k in zip(header, keys) if k in wanted}
+
+
+def _arrow_type(dtype):
+    return {
+        NAME: pa.dictionary(pa.int32(), pa.string()),
+        YEAR: pa.int16(),
+        MEASURE: pa.float32(),
+    }[dtype]
+
+
+def _read_arrow(path, dtype, usecols):
+    """Parse with pyarrow, decoding names straight into dictionary arrays.
+
+    Names never exist as one Python string per row, which keeps the peak
+    memory of a read close to the size of the typed result.
+    """
+    convert = pa_csv.ConvertOptions(
+        column_types={c: _arrow_type(t) for c, t in dtype.items()},
+        include_columns=usecols or [],
+        # blank names are missing, as with pd.read_csv
+        strings_can_be_null=True,
+        quoted_strings_can_be_null=True,
+    )
+    df = pa_csv.read_csv(path, convert_options=convert).to_pandas()
+    # same category order as pandas' own `dtype="category"` reads
+    for c, t in dtype.items():
+        if t == NAME and c in df.columns:
+            df[c] = df[c].cat.set_categories(sorted(df[c].cat.categories))
+    return df
+
+
+def read_typed_csv(path, kind=None, project=True):
+    """Read a CSV with the dtypes of its schema kind.
+
+    With `project=True` only the schema's columns are parsed (`usecols`);
+    otherwise every column is read and only the known ones get explicit
+    dtypes. Files of no known kind are read with plain `pd.read_csv`. If a
+    column does not fit its dtype (e.g. missing years), it is left to
+    pandas' inference instead.
+    """
+    header = read_header(path)
+    kind = kind or detect_kind(header)
+    if kind is None:
+        return pd.read_csv(path)
+
+    dtype = schema_dtypes(header, kind)
+    no_ints = {c: t for c, t in dtype.items() if t != YEAR}
+    unique = len(set(header)) == len(header)
+
+    if pa_csv is not None and unique:
+        usecols = list(dtype) if project else None
+        for attempt in (dtype, no_ints):
+            try:
+                return _read_arrow(path, attempt, usecols)
+            except (ValueError, TypeError, pa.ArrowException):
+                continue
+        return _read_arrow(path, {}, usecols)
+
+    kwargs = {}
+    if project and all(header) and unique:
+        kwargs["usecols"] = list(dtype)
+    else:
+        # pandas renames empty and duplicate headers; leave those untyped
+        dtype = {c: t for c, t in dtype.items() if c and header.count(c) == 1}
+        no_ints = {c: t for c, t in dtype.items() if t != YEAR}
+    for attempt in (dtype, no_ints):
+        try:
+            return pd.read_csv(path, dtype=attempt, **kwargs)
+        except (ValueError, TypeError):
+            continue
+    return pd.read_csv(path, **kwargs)
@@ -20,17 +20,20 @@ MISSING_FILE = PROC / "missing_year_state_counts.csv"
 OUT_FILE = PROC / "suitability_action_plan.csv"
 
 
-def build_action_plan(min_years=5):
-    if not SUIT_FILE.exists():
+def build_action_plan(min_years=5, suit_file=None, missing_file=None, out_file=None):
+    suit_file = Path(suit_file or SUIT_FILE)
+    missing_file = Path(missing_file or MISSING_FILE)
+    out_file = Path(out_file or OUT_FILE)
+    if not suit_file.exists():
         print(
-            f"Suitability file not found: {SUIT_FILE}. Try running merge_datasets.merge_all_datasets() to generate it."
+            f"Suitability file not found: {suit_file}. Try running merge_datasets.merge_all_datasets() to generate it."
         )
         return None
 
-    suit = pd.read_csv(SUIT_FILE)
+    suit = pd.read_csv(suit_file)
     miss = (
-        pd.read_csv(MISSING_FILE)
-        if MISSING_FILE.exists()
+        pd.read_csv(missing_file)
+        if missing_file.exists()
         else pd.DataFrame(columns=["state_name", "count"])
     )
 
@@ -48,13 +51,13 @@ def build_action_plan(min_years=5):
 
     out["action"] = out.apply(recommend, axis=1)
 
-    OUT_FILE.parent.mkdir(parents=True, exist_ok=True)
-    out.to_csv(OUT_FILE, index=False)
-    print(f"Suitability action plan written to: {OUT_FILE}")
+    out_file.parent.mkdir(parents=True, exist_ok=True)
+    out.to_csv(out_file, index=False)
+    print(f"Suitability action plan written to: {out_file}")
     # summary
     summary = out.groupby("action").size().reset_index(name="count")
     print(summary.to_string(index=False))
-    return OUT_FILE
+    return out_file
 
 
 if __name__ == "__main__":
@@ -2,42 +2,183 @@
 
 This module provides `build_time_series` which converts a tabular dataset
 with columns for state, crop and year into a 1-indexed pandas Series of
-production values suitable for time-series modeling.
+production values suitable for time-series modeling, and
+`build_all_time_series` which indexes every (state, crop) series of a
+dataset in a single pass.
 
 Expected behavior and notes:
 - Column names are handled case-insensitively: underscores and casing are
-  normalized internally.
+  normalized internally. State and crop values are matched on their
+  `src.normalize.normalize_text` form.
 - Required columns: `state_name`, `crop`, `year` (case-insensitive).
 - Production columns supported (in order of preference): `yield`,
-  `production_in_tons`, `yield_ton_per_hec`.
+  `production_in_tons`, `yield_ton_per_hec`, `production` (the column
+  `clean_data` and `add_year_month` write).
 - If a production column has non-numeric values, a clear exception is
   raised during conversion to float.
 """
 
+from collections.abc import Iterator
+
+import numpy as np
 import pandas as pd
-from typing import Optional
 
+from src.normalize import normalize_series, normalize_text
+
+PROD_CANDIDATES = ["yield", "production_in_tons", "yield_ton_per_hec", "production"]
 
-def _ensure_lower_cols(df: pd.DataFrame) -> pd.DataFrame:
-    """Return a copy of df with column names normalized to lowercase.
 
-    This helps make the function tolerant to different input dataset
-    column naming conventions used across the project.
+def _lower_col_map(df: pd.DataFrame) -> dict:
+    """Map normalized (stripped, lowercase) column names to the originals.
+
+    This helps make the functions tolerant to different input dataset
+    column naming conventions used across the project without copying the
+    whole frame just to rename its columns.
     """
-    df = df.copy()
-    df.columns = df.columns.str.strip().str.lower()
-    return df
+    mapping = {}
+    for c in df.columns:
+        mapping.setdefault(str(c).strip().lower(), c)
+    return mapping
 
 
-def build_time_series(df: pd.DataFrame, state: str, crop: str) -> pd.Series:
-    """Build a time-indexed pandas Series of production values.
+class SeriesIndex:
+    """All (state, crop) production series of a dataset, indexed once.
+
+    The dataset is normalized and sorted by (state, crop, year) a single
+    time on construction; afterwards each series is a contiguous slice of
+    the sorted values, so lookups are O(1) dictionary hits plus the cost of
+    materializing the returned Series.
 
     Parameters
     ----------
     df : pd.DataFrame
+        Tabular data with `state_name`, `crop` and `year` columns
+        (case-insensitive) and one of the production columns listed in
+        `PROD_CANDIDATES`.
+
+    Raises
+    ------
+    Exception
+        If required columns are missing or no production column exists.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        cols = _lower_col_map(df)
+
+        # Required columns
+        required = {"state_name", "crop", "year"}
+        if not required.issubset(set(cols)):
+            missing = required - set(cols)
+            raise Exception(f"Missing required columns: {', '.join(sorted(missing))}")
+
+        # Choose a production column, in `PROD_CANDIDATES` order
+        prod_col: str | None = next((c for c in PROD_CANDIDATES if c in cols), None)
+        if prod_col is None:
+            raise Exception(
+                "No production column found (expected one of: "
+                f"{', '.join(PROD_CANDIDATES)})"
+            )
+
+        # Normalize string columns used for matching, once for all series
+        frame = pd.DataFrame(
+            {
+                "state_name": normalize_series(df[cols["state_name"]].astype(str)),
+                "crop": normalize_series(df[cols["crop"]].astype(str)),
+                "year": df[cols["year"]],
+                "value": df[cols[prod_col]],
+            }
+        )
+        # stable sort keeps the original row order for duplicate years
+        frame = frame.sort_values(by=["state_name", "crop", "year"], kind="mergesort")
+
+        self.prod_col = prod_col
+        self.n_rows = len(frame)
+        self._values = frame["value"].to_numpy()
+        self._years = frame["year"].to_numpy()
+
+        states = frame["state_name"].to_numpy()
+        crops = frame["crop"].to_numpy()
+        n = len(frame)
+        if n:
+            boundary = np.ones(n, dtype=bool)
+            boundary[1:] = (states[1:] != states[:-1]) | (crops[1:] != crops[:-1])
+            starts = np.flatnonzero(boundary)
+            stops = np.append(starts[1:], n)
+        else:
+            starts = stops = np.empty(0, dtype=int)
+
+        self._slices = {
+            (states[i], crops[i]): (int(i), int(j)) for i, j in zip(starts, stops)
+        }
+
+    def __len__(self) -> int:
+        return len(self._slices)
+
+    def __contains__(self, key) -> bool:
+        state, crop = key
+        return (normalize_text(state), normalize_text(crop)) in self._slices
+
+    def keys(self):
+        """Return the normalized (state, crop) pairs in sorted order."""
+        return self._slices.keys()
+
+    def years(self, state: str, crop: str) -> np.ndarray:
+        """Return the sorted `year` values backing the given series."""
+        i, j = self._slice(state, crop)
+        return self._years[i:j]
+
+    def _slice(self, state: str, crop: str) -> tuple[int, int]:
+        state = normalize_text(state)
+        crop = normalize_text(crop)
+        try:
+            return self._slices[(state, crop)]
+        except KeyError:
+            raise Exception(
+                f"No data found for state='{state}' and crop='{crop}'. Rows in dataset: {self.n_rows}"
+            ) from None
+
+    def get(self, state: str, crop: str) -> pd.Series:
+        """Return the 1-indexed float Series for a state/crop pair.
+
+        Matching is case-insensitive. Raises if the pair is not present or
+        if its production values cannot be converted to float.
+        """
+        i, j = self._slice(state, crop)
+        index = pd.RangeIndex(start=1, stop=j - i + 1, name="time_index")
+        # Convert production values to float; any invalid values will raise
+        return pd.Series(self._values[i:j], index=index, name=self.prod_col).astype(
+            float
+        )
+
+    def __getitem__(self, key: tuple[str, str]) -> pd.Series:
+        state, crop = key
+        return self.get(state, crop)
+
+    def __iter__(self) -> Iterator[tuple[tuple[str, str], pd.Series]]:
+        """Yield ((state, crop), series) for every series in sorted order."""
+        for state, crop in self._slices:
+            yield (state, crop), self.get(state, crop)
+
+
+def build_all_time_series(df: pd.DataFrame) -> SeriesIndex:
+    """Index every (state, crop) time series of `df` in one pass.
+
+    See `SeriesIndex` for the accepted input and lookup semantics.
+    """
+    return SeriesIndex(df)
+
+
+def build_time_series(df, state: str, crop: str) -> pd.Series:
+    """Build a time-indexed pandas Series of production values.
+
+    Parameters
+    ----------
+    df : pd.DataFrame or SeriesIndex
         Tabular data that must contain `state_name`, `crop` and `year` columns
         (case-insensitive). The production column can be one of a few accepted
-        names and is selected automatically.
+        names and is selected automatically. Passing a prebuilt `SeriesIndex`
+        skips re-indexing the dataset, which is much faster when building
+        many series from the same data.
     state : str
         State name to filter the dataset by (matching is case-insensitive).
     crop : str
@@ -56,44 +197,5 @@ def build_time_series(df: pd.DataFrame, state: str, crop: str) -> pd.Series:
         there are no rows matching the state/crop filter, or if production
         values cannot be converted to float.
     """
-    df = _ensure_lower_cols(df)
-
-    # Required columns
-    required = {"state_name", "crop", "year"}
-    if not required.issubset(set(df.columns)):
-        missing = required - set(df.columns)
-        raise Exception(f"Missing required columns: {', '.join(sorted(missing))}")
-
-    # Normalize string columns used for matching
-    df["state_name"] = df["state_name"].astype(str).str.strip().str.lower()
-    df["crop"] = df["crop"].astype(str).str.strip().str.lower()
-
-    state = state.strip().lower()
-    crop = crop.strip().lower()
-
-    # Choose a production column (prefer 'yield', then 'production_in_tons', then 'yield_ton_per_hec')
-    prod_candidates = ["yield", "production_in_tons", "yield_ton_per_hec"]
-    prod_col: Optional[str] = next(
-        (c for c in prod_candidates if c in df.columns), None
-    )
-    if prod_col is None:
-        raise Exception(
-            "No production column found (expected one of: yield, production_in_tons, yield_ton_per_hec)"
-        )
-
-    filtered = df[(df["state_name"] == state) & (df["crop"] == crop)]
-
-    if filtered.empty:
-        raise Exception(
-            f"No data found for state='{state}' and crop='{crop}'. Rows in dataset: {len(df)}"
-        )
-
-    # Sort by year (ascending) and reset index
-    filtered = filtered.sort_values(by="year").reset_index(drop=True)
-    filtered["time_index"] = pd.RangeIndex(start=1, stop=len(filtered) + 1)
-
-    # Convert production values to float; any invalid values will raise
-    series = filtered[prod_col].astype(float)
-    series.index = filtered["time_index"]
-
-    return series
+    index = df if isinstance(df, SeriesIndex) else build_all_time_series(df)
+    return index.get(state, crop)
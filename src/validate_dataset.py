@@ -1,5 +1,6 @@
 import sys
 from src.data_loader import load_cleaned_dataset
+from src.normalize import normalize_series
 
 
 def main():
@@ -31,7 +32,7 @@ def main():
 
     # quick time-series build sanity check
     try:
-        from src.time_series_builder import build_time_series
+        from src.time_series_builder import build_all_time_series, build_time_series
 
         state_col = [c for c in df.columns if "state" in c.lower()][0]
         crop_col = [
@@ -39,7 +40,9 @@ def main():
         ][0]
         sample_state = df[state_col].dropna().unique()[0]
         sample_crop = df[crop_col].dropna().unique()[0]
-        ts = build_time_series(df, sample_state, sample_crop)
+        # index all series once; the checks below are lookups into it
+        series_index = build_all_time_series(df)
+        ts = build_time_series(series_index, sample_state, sample_crop)
         if ts.empty:
             print("WARN: time-series built but empty")
         else:
@@ -51,10 +54,12 @@ def main():
 
         # Known-case sanity check: Andaman & Nicobar Islands + Arecanut
         try:
-            states = df[state_col].dropna().str.lower().unique()
-            crops = df[crop_col].dropna().str.lower().unique()
+            states = normalize_series(df[state_col].dropna()).unique()
+            crops = normalize_series(df[crop_col].dropna()).unique()
             if "andaman and nicobar islands" in states and "arecanut" in crops:
-                ts2 = build_time_series(df, "Andaman And Nicobar Islands", "Arecanut")
+                ts2 = build_time_series(
+                    series_index, "Andaman And Nicobar Islands", "Arecanut"
+                )
                 if ts2.empty:
                     print(
                         "FAIL: Known sample (Andaman/Arecanut) produced empty series."
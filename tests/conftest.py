@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--run-slow", action="store_true", help="also run tests marked slow"
+    )
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "slow: long-running test, needs --run-slow")
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption("--run-slow"):
+        return
+    skip = pytest.mark.skip(reason="slow: run with --run-slow")
+    for item in items:
+        if "slow" in item.keywords:
+            item.add_marker(skip)
+
+
+@pytest.fixture
+def make_series():
+    """Factory of seeded series: a linear trend plus normal noise.
+
+    `make_series(n=24, seed=0, walk=False)`; with `walk=True` the noise is
+    accumulated into a random walk around the trend. A shorter series is a
+    prefix of a longer one with the same seed.
+    """
+
+    def make(n=24, seed=0, walk=False):
+        noise = np.random.default_rng(seed).normal(size=n)
+        if walk:
+            noise = np.cumsum(noise)
+        return pd.Series(np.arange(n, dtype=float) + noise)
+
+    return make
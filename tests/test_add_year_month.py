@@ -92,3 +92,84 @@ def test_load_manual_map_reads(tmp_path):
     m = add_year_month.load_manual_map(str(p))
     assert isinstance(m, dict)
     assert m.get("foo") == "bar"
+
+
+def test_assign_seasonal_rainfall_with_extra_seasons(tmp_path):
+    season_csv = tmp_path / "season_definitions.csv"
+    pd.DataFrame(
+        {
+            "season": ["summer", "winter"],
+            "keywords": ["summer,zaid", "winter"],
+            "months": ["mar,apr,may,jun", "dec,jan,feb"],
+        }
+    ).to_csv(season_csv, index=False)
+    seasons = add_year_month.load_seasons(str(season_csv))
+    assert [s[0] for s in seasons] == ["kharif", "rabi", "summer", "winter"]
+
+    merged = pd.DataFrame(
+        {
+            "crop_type": ["Kharif", "rabi", "Zaid", "WINTER", "whole year", None],
+            "kharif_rain": [1.0] * 6,
+            "rabi_rain": [2.0] * 6,
+            "summer_rain": [3.0] * 6,
+            "winter_rain": [4.0] * 6,
+            "whole_year_rain": [5.0] * 6,
+        }
+    )
+    out = add_year_month.assign_seasonal_rainfall(merged, seasons)
+    assert list(out) == [1.0, 2.0, 3.0, 4.0, 5.0, 5.0]
+
+
+def test_load_seasons_skips_blank_cells(tmp_path):
+    season_csv = tmp_path / "season_definitions.csv"
+    season_csv.write_text(
+        'season,keywords,months\nsummer,,"mar,apr"\n,winter,dec\nautumn,autumn,\n',
+        encoding="utf-8",
+    )
+    seasons = add_year_month.load_seasons(str(season_csv))
+    assert [s[0] for s in seasons] == ["kharif", "rabi"]
+
+    merged = pd.DataFrame(
+        {
+            "crop_type": [float("nan")],
+            "kharif_rain": [1.0],
+            "rabi_rain": [2.0],
+            "whole_year_rain": [5.0],
+        }
+    )
+    assert list(add_year_month.assign_seasonal_rainfall(merged, seasons)) == [5.0]
+
+
+def test_overriding_a_built_in_season_keeps_its_precedence(tmp_path):
+    season_csv = tmp_path / "season_definitions.csv"
+    pd.DataFrame(
+        {"season": ["kharif"], "keywords": ["kharif,rabi"], "months": ["jun,jul"]}
+    ).to_csv(season_csv, index=False)
+    seasons = add_year_month.load_seasons(str(season_csv))
+    assert seasons[0] == ("kharif", ("kharif", "rabi"), ["jun", "jul"])
+    assert [s[0] for s in seasons] == ["kharif", "rabi"]
+
+
+def test_assign_seasonal_rainfall_without_crop_type():
+    seasons = add_year_month.load_seasons("")
+    merged = pd.DataFrame(
+        {"kharif_rain": [1.0], "rabi_rain": [2.0], "whole_year_rain": [9.0]}
+    )
+    assert list(add_year_month.assign_seasonal_rainfall(merged, seasons)) == [9.0]
+
+
+def test_resolve_subdivisions_rule_order():
+    states = pd.Series(["kerala", "odisha", "kerala", "gujarat", "goa", None])
+    subdivisions = ["kerala", "orissa", "gujarat region", "saurashtra and kutch"]
+    manual = {"odisha": "orissa", "kerala": "orissa", "goa": "konkan and goa"}
+    out = add_year_month.resolve_subdivisions(states, subdivisions, manual)
+    by_state = out.set_index("state_name")
+    assert len(out) == 4
+    # exact match wins over a manual entry
+    assert by_state.loc["kerala", "subdivision"] == "kerala"
+    assert by_state.loc["kerala", "match"] == "exact"
+    assert by_state.loc["odisha", "match"] == "manual"
+    assert by_state.loc["gujarat", "subdivision"] == "gujarat region"
+    assert by_state.loc["gujarat", "match"] == "fuzzy"
+    # a manual target missing from the rainfall data does not count
+    assert pd.isna(by_state.loc["goa", "subdivision"])
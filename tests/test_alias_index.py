@@ -0,0 +1,75 @@
+import random
+
+from src.alias_index import AliasIndex, load_state_aliases
+from src.normalize import normalize_text
+
+STATES = [
+    "Andhra Pradesh",
+    "Arunachal Pradesh",
+    "Odisha",
+    "Tamil Nadu",
+    "Nagaland",
+    "Manipur",
+    "West Bengal",
+]
+
+
+def scan_match(candidates, val):
+    """The per-click scan the index replaces."""
+    val_l = normalize_text(val)
+    candidates = [(c, normalize_text(c)) for c in sorted(candidates)]
+    for c, cl in candidates:
+        if cl == val_l:
+            return c
+    for c, cl in candidates:
+        if val_l in cl or cl in val_l:
+            return c
+    val_tokens = [t for t in val_l.split() if t]
+    for c, cl in candidates:
+        if any(tok in cl for tok in val_tokens):
+            return c
+    return None
+
+
+def test_match_agrees_with_scan():
+    index = AliasIndex(STATES)
+    queries = [
+        "odisha",
+        " TAMIL-nadu ",
+        "pradesh",
+        "bengal west side",
+        "x pradesh",
+        "nadu",
+        "goa",
+        "West Bengal and more",
+        "a",
+    ]
+    rng = random.Random(0)
+    queries += [
+        "".join(rng.choice("aeinrst dh") for _ in range(rng.randint(1, 8)))
+        for _ in range(300)
+    ]
+    for q in queries:
+        if normalize_text(q):  # the scan matched blank input to anything
+            assert index.match(q) == scan_match(STATES, q), q
+    assert index.match("  ") is None
+
+
+def test_aliases_and_search(tmp_path):
+    manual = tmp_path / "manual_state_to_subdivision.csv"
+    manual.write_text("state,subdivision\nwest bengal,gangetic west bengal\n")
+    aliases = load_state_aliases(manual)
+    index = AliasIndex(STATES, aliases)
+
+    assert index.match("Orissa") == "Odisha"
+    assert index.match("Gangetic West Bengal") == "West Bengal"
+    # shared by nagaland/manipur/mizoram: ambiguous, not an alias
+    assert index.match("naga mani mizo tripura") == "Manipur"  # token fallback
+    # an alias never shadows a real name (puducherry -> tamil nadu)
+    assert index.match("tamil nadu") == "Tamil Nadu"
+
+    assert index.search("pradesh") == ["Andhra Pradesh", "Arunachal Pradesh"]
+    assert index.search("ORISSA") == ["Odisha"]
+    assert index.search("") == sorted(STATES)
+    assert index.search("kerala") == []
+    assert index.match(None) is None
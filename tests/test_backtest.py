@@ -0,0 +1,40 @@
+import numpy as np
+from src import backtest, sarima_model
+
+
+def test_backtest_rolls_origin_without_refitting(monkeypatch, make_series):
+    calls = []
+    real_fit = sarima_model.SARIMAX.fit
+
+    def spy_fit(self, *args, **kwargs):
+        calls.append(1)
+        return real_fit(self, *args, **kwargs)
+
+    monkeypatch.setattr(sarima_model.SARIMAX, "fit", spy_fit)
+    s = make_series(30)
+    out = backtest.backtest_many(
+        [(("a", "x"), s), (("b", "y"), s[:5])], horizon=2, initial=24, workers=1
+    )
+    # one MLE fit for the only long-enough series
+    assert len(calls) == 1
+    assert list(out.columns) == backtest.BACKTEST_COLUMNS
+    # origins 24..29, two horizons each except the last origin
+    assert len(out) == 11
+    assert set(out["state"]) == {"a"}
+
+    # the extended state matches filtering the longer window with the same params
+    first = sarima_model.train_sarima(s.to_numpy()[:24])
+    at_26 = sarima_model._build_model(s.to_numpy()[:26]).filter(first.params)
+    rows = out[out["origin"] == 26].sort_values("horizon")
+    np.testing.assert_allclose(rows["forecast"], at_26.forecast(steps=2))
+    np.testing.assert_allclose(rows["actual"], s.to_numpy()[26:28])
+
+
+def test_backtest_process_pool_and_summary(make_series):
+    series = [((str(i), "x"), make_series(28, seed=i)) for i in range(3)]
+    out = backtest.backtest_many(series, horizon=3, initial=24, workers=2)
+    assert set(out["state"]) == {"0", "1", "2"}
+    summary = backtest.summarize_backtest(out)
+    assert list(summary["horizon"]) == [1, 2, 3]
+    assert list(summary["n"]) == [12, 9, 6]
+    assert (summary["rmse"] >= summary["mae"]).all()
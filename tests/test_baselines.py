@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+from src import baselines
+
+
+def test_pad_series_right_aligns():
+    values, lengths = baselines.pad_series([[1, 2, 3], [4]])
+    assert list(lengths) == [3, 1]
+    assert np.isnan(values[1, :2]).all()
+    assert values[1, 2] == 4
+
+
+def test_naive_seasonal_naive_and_drift_on_ragged_series():
+    series = [[1, 2, 3, 4, 5, 6], [10, 20], [7]]
+    out = baselines.forecast_baselines(
+        series, steps=3, methods=("naive", "seasonal_naive", "drift"), season_length=4
+    )
+    np.testing.assert_allclose(out["naive"], [[6, 6, 6], [20, 20, 20], [7, 7, 7]])
+    # rows shorter than one season fall back to naive
+    np.testing.assert_allclose(
+        out["seasonal_naive"], [[3, 4, 5], [20, 20, 20], [7, 7, 7]]
+    )
+    np.testing.assert_allclose(out["drift"], [[7, 8, 9], [30, 40, 50], [7, 7, 7]])
+
+
+def test_ses_and_holt():
+    series = [[5, 5, 5, 5], [1, 3, 5, 7, 9], [2]]
+    out = baselines.forecast_baselines(series, steps=2, methods=("ses", "holt"))
+    np.testing.assert_allclose(out["ses"][0], [5, 5])
+    # a perfectly linear series is extrapolated exactly by Holt
+    np.testing.assert_allclose(out["holt"][1], [11, 13])
+    np.testing.assert_allclose(out["holt"][2], [2, 2])
+
+
+def test_ses_matches_scalar_recursion():
+    y = np.array([3.0, 5.0, 4.0, 6.0, 8.0])
+    level = y[0]
+    for v in y[1:]:
+        level = level + 0.4 * (v - level)
+    values, _ = baselines.pad_series([y])
+    np.testing.assert_allclose(baselines.ses(values, 1, alpha=0.4), [[level]])
+
+
+def test_forecast_baselines_rejects_unknown_method():
+    with pytest.raises(ValueError):
+        baselines.forecast_baselines([[1, 2]], methods=("arima",))
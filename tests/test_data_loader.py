@@ -50,3 +50,43 @@ def test_load_cleaned_dataset_falls_back(tmp_path):
         mp.undo()
     assert src == "cleaned"
     assert df["a"].iloc[0] == 3
+
+
+def test_read_csv_cached_writes_and_reuses_sidecar(tmp_path):
+    path = tmp_path / "data.csv"
+    write_csv(path, pd.DataFrame({"state_name": ["a", "b"], "year": [2001, 2002]}))
+
+    df = data_loader.read_csv_cached(str(path))
+    cache = tmp_path / ("data" + data_loader.CACHE_SUFFIX)
+    assert cache.exists()
+    assert list(df["year"]) == [2001, 2002]
+
+    # a fresh sidecar is served without re-parsing the CSV
+    from _pytest.monkeypatch import MonkeyPatch
+
+    mp = MonkeyPatch()
+
+    def no_csv(*args, **kwargs):
+        raise AssertionError("CSV should not be parsed when cache is fresh")
+
+    mp.setattr(pd, "read_csv", no_csv)
+    mp.setattr(data_loader, "read_typed_csv", no_csv)
+    try:
+        cached = data_loader.read_csv_cached(str(path))
+    finally:
+        mp.undo()
+    pd.testing.assert_frame_equal(cached, df)
+
+
+def test_read_csv_cached_invalidated_when_source_changes(tmp_path):
+    import os
+
+    path = tmp_path / "data.csv"
+    write_csv(path, pd.DataFrame({"a": [1]}))
+    assert data_loader.read_csv_cached(str(path))["a"].iloc[0] == 1
+
+    write_csv(path, pd.DataFrame({"a": [5, 6]}))
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    df = data_loader.read_csv_cached(str(path))
+    assert list(df["a"]) == [5, 6]
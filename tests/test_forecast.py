@@ -0,0 +1,35 @@
+import numpy as np
+import pandas as pd
+
+from src import forecast, sarima_model
+
+
+def test_export_forecasts_long_format(tmp_path):
+    rng = np.random.default_rng(0)
+    series = pd.Series(np.arange(24, dtype=float) + rng.normal(size=24))
+    model = sarima_model.train_sarima(series)
+
+    class Broken:
+        def get_forecast(self, steps):
+            raise ValueError("no forecast")
+
+    out = tmp_path / "forecasts.parquet"
+    models = [
+        (("a", "x"), model, 2010),
+        (("b", "y"), Broken(), 2010),
+        (("c", "z"), model),
+    ]
+    n = forecast.export_forecasts(models, path=out, steps=3, row_group_size=4)
+    assert n == 2
+
+    df = forecast.read_forecasts(out)
+    assert list(df.columns) == forecast.FORECAST_COLUMNS
+    assert len(df) == 6
+    a = df[df["state"] == "a"]
+    assert list(a["year"]) == [2011, 2012, 2013]
+    assert (a["lower"] <= a["mean"]).all() and (a["mean"] <= a["upper"]).all()
+    np.testing.assert_allclose(a["mean"], forecast.forecast_future(model, steps=3))
+    assert df.loc[df["state"] == "c", "year"].isna().all()
+
+    only_c = forecast.read_forecasts(out, state="C")
+    assert set(only_c["state"]) == {"c"}
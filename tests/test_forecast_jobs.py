@@ -0,0 +1,64 @@
+import threading
+
+from src.forecast_jobs import DONE, FAILED, JobQueue
+
+
+def test_duplicate_submits_share_one_job():
+    queue = JobQueue(workers=2)
+    release = threading.Event()
+    calls = []
+
+    def fit(state, report):
+        calls.append(state)
+        report("Fitting", 0.5)
+        release.wait(10)
+        return state.upper()
+
+    first = queue.submit(("v1", "karnataka", "rice"), fit, "karnataka")
+    second = queue.submit(("v1", "karnataka", "rice"), fit, "karnataka")
+    assert second is first
+    assert queue.active() == 1
+
+    release.set()
+    assert first.wait(10)
+    assert first.state == DONE and first.result == "KARNATAKA"
+    assert first.progress == 1.0
+    # finished jobs are reused too
+    assert queue.submit(("v1", "karnataka", "rice"), fit, "karnataka") is first
+    assert calls == ["karnataka"]
+    queue.shutdown()
+
+
+def test_failed_job_reports_error_and_is_retried():
+    queue = JobQueue(workers=1)
+    attempts = []
+
+    def flaky(report):
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise ValueError("no data")
+        return "ok"
+
+    job = queue.submit("k", flaky)
+    job.wait(10)
+    assert job.state == FAILED
+    assert "ValueError: no data" in job.message
+
+    retry = queue.submit("k", flaky)
+    assert retry is not job
+    retry.wait(10)
+    assert retry.state == DONE and queue.get("k") is retry
+    queue.shutdown()
+
+
+def test_finished_jobs_are_bounded():
+    queue = JobQueue(workers=1, max_finished=2)
+    for key in range(4):
+        queue.submit(key, lambda report: None).wait(10)
+    queue.submit("last", lambda report: None).wait(10)
+    assert queue.get(0) is None and queue.get(1) is None
+    assert queue.get("last") is not None
+
+    queue.clear_finished()
+    assert queue.get("last") is None
+    queue.shutdown()
@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+
+from src.data_preprocessing import prepare_sarima_series
+from src.forecast_store import (
+    ForecastStore,
+    build_forecast_store,
+    coverage,
+    series_hash,
+)
+
+
+def make_data(tmp_path):
+    rng = np.random.default_rng(0)
+    rows = [
+        ("Karnataka", "Rice", 2000 + i, 100 + 5 * i + rng.normal()) for i in range(12)
+    ]
+    rows += [("Odisha", "Wheat", 2010 + i, 50.0 + i) for i in range(5)]
+    rows += [("Goa", "Maize", 2010 + i, 10.0) for i in range(2)]
+    df = pd.DataFrame(rows, columns=["state_name", "crop", "year", "production"])
+    suit = tmp_path / "dataset_suitability.csv"
+    pd.DataFrame(
+        {
+            "state_name": ["karnataka", "odisha", "goa"],
+            "crop": ["rice", "wheat", "maize"],
+            "year_count": [12, 5, 2],
+            "usable_for_sarima": [True, True, False],
+        }
+    ).to_csv(suit, index=False)
+    return df, suit
+
+
+def test_build_forecast_store_covers_usable_series(tmp_path):
+    df, suit = make_data(tmp_path)
+    store = ForecastStore(tmp_path / "forecasts.sqlite")
+    assert coverage(store, suit) == 0.0
+
+    counts = build_forecast_store(df, suit_file=suit, store=store, steps=3, workers=1)
+    assert counts == (1, 1, 0)
+    assert store.keys() == {("karnataka", "rice"), ("odisha", "wheat")}
+    assert coverage(store, suit) == 1.0
+    assert store.summary()[0] == 2
+
+    entry = store.get("Karnataka ", "RICE")
+    assert entry.method == "sarima"
+    assert entry.forecast["year"].tolist() == [2012, 2013, 2014]
+    assert (entry.forecast["lower"] <= entry.forecast["upper"]).all()
+    ts = prepare_sarima_series(df, "karnataka", "rice")
+    assert entry.is_fresh(series_hash(ts))
+
+    holt = store.get("odisha", "wheat")
+    assert holt.method == "holt" and holt.forecast["lower"].isna().all()
+    np.testing.assert_allclose(holt.forecast["mean"], [55.0, 56.0, 57.0])
+    assert store.get("goa", "maize") is None
+
+
+def test_entries_go_stale_and_are_replaced(tmp_path):
+    df, suit = make_data(tmp_path)
+    store = ForecastStore(tmp_path / "forecasts.sqlite")
+    build_forecast_store(df, suit_file=suit, store=store, steps=3, workers=1)
+    entry = store.get("odisha", "wheat")
+
+    df.loc[df["state_name"] == "Odisha", "production"] += 1
+    changed = series_hash(prepare_sarima_series(df, "odisha", "wheat"))
+    assert not entry.is_fresh(changed)
+    assert not entry.is_fresh(max_age_days=-1)
+
+    store.put(
+        "Odisha",
+        "Wheat",
+        "holt",
+        changed,
+        [2015, 2016],
+        [1.0, 2.0],
+        [np.nan] * 2,
+        [np.nan] * 2,
+    )
+    entry = store.get("odisha", "wheat")
+    assert entry.is_fresh(changed)
+    assert entry.forecast["mean"].tolist() == [1.0, 2.0]
+    assert store.summary()[0] == 2
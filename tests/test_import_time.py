@@ -0,0 +1,73 @@
+"""Import-time guard: light entry points must not load the modeling stack.
+
+Each module is imported in a fresh interpreter under ``python -X importtime``
+and the report is checked for heavy packages (statsmodels, scipy, sklearn)
+and for the time spent in the project's own modules.
+"""
+
+from pathlib import Path
+import subprocess
+import sys
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+HEAVY = ("statsmodels", "scipy", "sklearn")
+# what the UI, the data tools and the pipeline import at startup
+LIGHT_MODULES = [
+    "src.alias_index",
+    "src.backtest",
+    "src.baselines",
+    "src.data_loader",
+    "src.data_preprocessing",
+    "src.evaluation",
+    "src.forecast",
+    "src.forecast_jobs",
+    "src.forecast_store",
+    "src.model_store",
+    "src.order_selection",
+    "src.pipeline",
+    "src.sarima_model",
+    "src.time_series_builder",
+    "src.validate_dataset",
+]
+# self time of all project modules imported by one entry point
+PROJECT_BUDGET_US = 250_000
+
+
+def import_profile(module):
+    """Return [(name, self_us, cumulative_us)] from ``-X importtime``."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+@pytest.mark.parametrize("module", LIGHT_MODULES)
+def test_light_modules_do_not_import_modeling_stack(module):
+    rows = import_profile(module)
+    assert any(name == module for name, _, _ in rows)
+    heavy = sorted({n for n, _, _ in rows if n.split(".")[0] in HEAVY})
+    assert not heavy, f"importing {module} loads {', '.join(heavy[:5])}"
+    project = sum(s for n, s, _ in rows if n.startswith("src.") or n == "src")
+    assert project < PROJECT_BUDGET_US
+
+
+def test_sarimax_is_loaded_on_first_use():
+    code = (
+        "import sys; from src import sarima_model; "
+        "assert 'statsmodels' not in sys.modules; "
+        "sarima_model._build_model([1.0, 2.0, 3.0, 4.0]); "
+        "assert 'statsmodels' in sys.modules"
+    )
+    subprocess.run([sys.executable, "-c", code], cwd=ROOT, check=True)
@@ -66,3 +66,110 @@ def test_suggest_and_apply_dry_run(tmp_path, monkeypatch):
     mf = proc / "manual_state_to_subdivision.csv"
     if mf.exists():
         mf.unlink()
+
+
+def _suggest_all_pairs(missing_states, subdivisions):
+    """The pre-index implementation of suggest_mapping, used as reference."""
+    import difflib
+
+    from src.normalize import normalize_text
+
+    sub_tokens = {s: set(normalize_text(s).split()) for s in subdivisions}
+    out = {}
+    for st in missing_states:
+        st_tokens = set(normalize_text(st).split())
+        best, best_score = None, 0
+        for sub, tokens in sub_tokens.items():
+            if len(st_tokens & tokens) > best_score:
+                best_score, best = len(st_tokens & tokens), sub
+        if best is None:
+            for sub in subdivisions:
+                a, b = normalize_text(st), normalize_text(sub)
+                if a in b or b in a:
+                    best = sub
+                    break
+        if best is None:
+            token_sub, token_score = None, 0.0
+            for sub, tokens in sub_tokens.items():
+                for tk in tokens:
+                    for stk in st_tokens:
+                        score = difflib.SequenceMatcher(None, tk, stk).ratio()
+                        if score > token_score:
+                            token_score, token_sub = score, sub
+            if token_score >= 0.60:
+                best = token_sub
+        if best is None:
+            matches = difflib.get_close_matches(st, list(subdivisions), cutoff=0.4)
+            best = matches[0] if matches else None
+        if best:
+            out[st] = best
+    return out
+
+
+def test_suggest_mapping_matches_all_pairs_scan():
+    import random
+
+    from src.manual_map_updater import SubdivisionIndex
+
+    subs = [
+        "andaman & nicobar islands",
+        "arunachal pradesh",
+        "assam & meghalaya",
+        "naga mani mizo tripura",
+        "sub himalayan west bengal & sikkim",
+        "gangetic west bengal",
+        "orissa",
+        "jharkhand",
+        "bihar",
+        "east uttar pradesh",
+        "west uttar pradesh",
+        "uttarakhand",
+        "haryana delhi & chandigarh",
+        "punjab",
+        "himachal pradesh",
+        "jammu & kashmir",
+        "west rajasthan",
+        "east rajasthan",
+        "west madhya pradesh",
+        "east madhya pradesh",
+        "gujarat region",
+        "saurashtra & kutch",
+        "konkan & goa",
+        "madhya maharashtra",
+        "matathwada",
+        "vidarbha",
+        "chhattisgarh",
+        "coastal andhra pradesh",
+        "telangana",
+        "rayalseema",
+        "tamil nadu",
+        "coastal karnataka",
+        "north interior karnataka",
+        "south interior karnataka",
+        "kerala",
+        "lakshadweep",
+        "ka",
+    ]
+    rng = random.Random(0)
+    states = [
+        "odisha",
+        "nagaland",
+        "andaman and nicobar islands",
+        "puducherry",
+        "dadra and nagar haveli",
+        "goa",
+        "telengana",
+        "chandigarh",
+        "pondicherry",
+        "xyz",
+        "mp",
+    ]
+    letters = "abcdefghijklmnopqrstuvwxyz "
+    for _ in range(200):
+        word = list(rng.choice(subs))
+        for _ in range(rng.randint(1, 4)):
+            word[rng.randrange(len(word))] = rng.choice(letters)
+        states.append("".join(word).strip())
+
+    index = SubdivisionIndex(subs)
+    assert suggest_mapping(states, index=index) == _suggest_all_pairs(states, subs)
@@ -0,0 +1,107 @@
+import csv
+from concurrent.futures import ProcessPoolExecutor
+
+from src.mapping_store import ManualMapStore, get_store
+
+
+def _append_many(path, start):
+    store = ManualMapStore(path)
+    for i in range(start, start + 20):
+        store.append({f"state {i}": f"sub {i}"})
+
+
+def test_append_only_adds_new_rows(tmp_path):
+    path = tmp_path / "manual_state_to_subdivision.csv"
+    path.write_text("state,subdivision\nodisha,orissa", encoding="utf-8")
+    before = path.read_bytes()
+
+    store = ManualMapStore(path)
+    assert store.append({"Odisha": "x", "Nagaland": "naga mani mizo tripura"}) == 1
+    assert path.read_bytes().startswith(before)
+    assert list(tmp_path.glob("*.bak*")) == []
+    rows = list(csv.DictReader(path.open(encoding="utf-8")))
+    assert [r["state"] for r in rows] == ["odisha", "Nagaland"]
+    assert store.get("NAGALAND ") == "naga mani mizo tripura"
+    assert store.load() == {"odisha": "orissa", "nagaland": "naga mani mizo tripura"}
+
+
+def test_store_sees_appends_from_other_writers_and_compacts(tmp_path):
+    path = tmp_path / "map.csv"
+    reader = get_store(path)
+    assert reader.load() == {}
+    ManualMapStore(path).append({"goa": "konkan & goa"})
+    assert reader.get("goa") == "konkan and goa"
+
+    # hand-edited duplicate: last row wins, compact keeps one row per state
+    with path.open("a", encoding="utf-8") as fh:
+        fh.write("goa,konkan\n")
+    assert reader.get("goa") == "konkan"
+    assert reader.compact() == 1
+    assert path.read_text(encoding="utf-8") == "state,subdivision\ngoa,konkan\n"
+    assert ManualMapStore(path).load() == {"goa": "konkan"}
+
+
+def test_concurrent_appends_do_not_lose_rows(tmp_path):
+    path = tmp_path / "map.csv"
+    with ProcessPoolExecutor(max_workers=4) as pool:
+        list(pool.map(_append_many, [path] * 4, [0, 20, 40, 60]))
+    mapping = ManualMapStore(path).load()
+    assert len(mapping) == 80
+    assert path.read_text(encoding="utf-8").count("state,subdivision") == 1
+
+
+def test_in_place_edit_that_grows_the_file_is_reread(tmp_path):
+    path = tmp_path / "map.csv"
+    path.write_text("state,subdivision\nodisha,orissa\n", encoding="utf-8")
+    store = ManualMapStore(path)
+    assert store.load() == {"odisha": "orissa"}
+
+    with path.open("r+", encoding="utf-8") as fh:
+        fh.write("state,subdivision\nodisha,coastal orissa\n")
+    assert store.load() == {"odisha": "coastal orissa"}
+
+    store.append({"goa": "konkan goa"})
+    assert store.get("goa") == "konkan goa"
+    assert store.load() == ManualMapStore(path).load()
+
+
+def test_reads_need_no_write_access(tmp_path, monkeypatch):
+    from src import add_year_month
+
+    path = tmp_path / "map.csv"
+    path.write_text("state,subdivision\nodisha,coastal orissa\n", encoding="utf-8")
+    store = ManualMapStore(path)
+    real_open = type(store.lock_path).open
+
+    def read_only(self, mode="r", *args, **kwargs):
+        if self == store.lock_path or any(m in mode for m in "wa+"):
+            raise PermissionError(13, "Read-only file system", str(self))
+        return real_open(self, mode, *args, **kwargs)
+
+    monkeypatch.setattr(type(store.lock_path), "open", read_only)
+    assert store.load() == {"odisha": "coastal orissa"}
+    assert store.get("Odisha") == "coastal orissa"
+    assert not store.lock_path.exists()
+    assert add_year_month.load_manual_map(path) == {"odisha": "coastal orissa"}
+
+    missing = ManualMapStore(tmp_path / "no" / "such" / "map.csv")
+    assert missing.load() == {}
+    assert not (tmp_path / "no").exists()
+
+
+def test_compact_keeps_extra_columns_and_original_spelling(tmp_path):
+    path = tmp_path / "map.csv"
+    path.write_text(
+        "state,subdivision,note\n"
+        "Odisha,Orissa,first\n"
+        "Goa,Konkan & Goa,coast\n"
+        ",,\n"
+        "ODISHA ,Coastal Orissa,checked\n",
+        encoding="utf-8",
+    )
+    assert ManualMapStore(path).compact() == 2
+    assert path.read_text(encoding="utf-8") == (
+        "state,subdivision,note\n"
+        "ODISHA ,Coastal Orissa,checked\n"
+        "Goa,Konkan & Goa,coast\n"
+    )
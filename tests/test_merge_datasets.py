@@ -1,5 +1,9 @@
+import sys
+
 import pandas as pd
-from src.merge_datasets import merge_all_datasets
+import pytest
+from src import add_year_month
+from src.merge_datasets import load_crop, merge_all_datasets
 
 
 def test_clean_data_and_merge(tmp_path, monkeypatch):
@@ -59,3 +63,132 @@ def test_clean_data_and_merge(tmp_path, monkeypatch):
     assert "n" in df.columns or "N" in df.columns
     # check that fertilizer values were attached
     assert df["production"].sum() == 220
+
+
+def test_load_crop_reads_add_year_month_output(tmp_path):
+    raw_dir = tmp_path / "raw"
+    proc_dir = tmp_path / "processed"
+    raw_dir.mkdir()
+    proc_dir.mkdir()
+    pd.DataFrame(
+        {
+            "state_name": ["Odisha"],
+            "crop": ["Rice"],
+            "crop_year": [2010],
+            "crop_type": ["kharif"],
+            "production": [100],
+        }
+    ).to_csv(proc_dir / "cleaned_crop_data.csv", index=False)
+    months = ["jan", "feb", "mar", "apr", "may", "jun"]
+    months += ["jul", "aug", "sep", "oct", "nov", "dec"]
+    rain = pd.DataFrame({"SUBDIVISION": ["orissa"], "YEAR": [2010]})
+    for m in months:
+        rain[m.upper()] = 10.0
+    rain.to_csv(raw_dir / "rainfall_validation.csv", index=False)
+
+    add_year_month.main(
+        crop_file=str(proc_dir / "cleaned_crop_data.csv"),
+        rainfall_file=str(raw_dir / "rainfall_validation.csv"),
+        out_file=str(proc_dir / "cleaned_crop_data_with_year.csv"),
+        manual_map_file=str(proc_dir / "manual_state_to_subdivision.csv"),
+    )
+    assert "subdivision" in pd.read_csv(proc_dir / "cleaned_crop_data_with_year.csv")
+
+    crop = load_crop(raw_dir=str(raw_dir), processed_dir=str(proc_dir))
+    assert crop["state_name"].astype(str).tolist() == ["odisha"]
+    assert crop["year"].tolist() == [2010]
+    assert crop["production"].tolist() == [100]
+
+
+_PEAK_RSS_SCRIPT = """
+import json, sys
+from src.merge_datasets import merge_all_datasets
+
+
+def status(field):
+    with open("/proc/self/status") as fh:
+        line = next(l for l in fh if l.startswith(field + ":"))
+    return int(line.split()[1]) * 1024
+
+
+raw_dir, proc_dir, out_dir = sys.argv[1:4]
+# reset the peak RSS (VmHWM) to the current RSS, so imports do not count
+with open("/proc/self/clear_refs", "w") as fh:
+    fh.write("5")
+before = status("VmRSS")
+merge_all_datasets(raw_dir=raw_dir, processed_dir=proc_dir, out_dir=out_dir)
+print(json.dumps({"peak_growth": status("VmHWM") - before}))
+"""
+
+
+@pytest.mark.slow
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="reads /proc")
+def test_merge_all_datasets_peak_memory_near_one_copy_of_crop_data(tmp_path):
+    import json
+    import subprocess
+    from pathlib import Path
+
+    import numpy as np
+
+    raw_dir = tmp_path / "raw"
+    proc_dir = tmp_path / "processed"
+    raw_dir.mkdir()
+    proc_dir.mkdir()
+    rng = np.random.default_rng(0)
+    n = 500_000
+    states = np.array([f"state {i}" for i in range(36)])
+    crops = np.array([f"crop {i}" for i in range(120)])
+    crop = pd.DataFrame(
+        {
+            "state_name": states[rng.integers(0, len(states), n)],
+            "crop": crops[rng.integers(0, len(crops), n)],
+            "year": rng.integers(1997, 2020, n),
+            "production": rng.random(n) * 1000,
+            "area_in_hectares": rng.random(n) * 100,
+        }
+    )
+    crop.to_csv(proc_dir / "cleaned_crop_data_with_year.csv", index=False)
+    # one copy of the crop data, as pandas holds it after a plain read_csv
+    one_copy = crop.memory_usage(deep=True).sum()
+    del crop
+    pd.DataFrame(
+        {
+            "state_name": np.repeat(states, len(crops)),
+            "crop": np.tile(crops, len(states)),
+            "rainfall": rng.random(len(states) * len(crops)),
+            "temperature": rng.random(len(states) * len(crops)),
+        }
+    ).to_csv(raw_dir / "Final_Dataset_after_temperature.csv", index=False)
+    pd.DataFrame({"Crop": crops, "N": 80, "P": 40, "K": 40}).to_csv(
+        raw_dir / "Fertilizer.csv", index=False
+    )
+
+    out = subprocess.run(
+        [sys.executable, "-c", _PEAK_RSS_SCRIPT, raw_dir, proc_dir, tmp_path],
+        cwd=Path(__file__).resolve().parents[1],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    peak_growth = json.loads(out.stdout.strip().splitlines()[-1])["peak_growth"]
+    assert (tmp_path / "final_dataset.csv").exists()
+    assert peak_growth < 1.4 * one_copy
+
+
+def test_attach_columns_matches_left_merge_without_copying_left():
+    from src.merge_datasets import attach_columns
+
+    left = pd.DataFrame(
+        {"state_name": ["a", "b", "c", "a"], "crop": ["x", "y", "x", "z"], "v": 1.0}
+    )
+    right = pd.DataFrame(
+        {"state_name": ["a", "b"], "crop": ["x", "y"], "rainfall": [10.0, 20.0]}
+    )
+    expected = left.merge(right, on=["state_name", "crop"], how="left")
+    out = attach_columns(left, right, ["state_name", "crop"])
+    assert out is left
+    pd.testing.assert_frame_equal(out, expected)
+
+    # duplicate keys on the right multiply rows, as merge does
+    dup = pd.concat([right, right])
+    assert len(attach_columns(left.drop(columns="rainfall"), dup, ["crop"])) > 4
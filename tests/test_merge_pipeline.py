@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+
+import merge_pipeline
+
+
+def write_raw(path, n=50):
+    rng = np.random.default_rng(0)
+    area = rng.integers(1, 100, size=n).astype(float)
+    area[[3, 17, 40]] = np.nan
+    df = pd.DataFrame(
+        {
+            "Unnamed: 0": range(n),
+            "State_Name": [" Karnataka", "Odisha "] * (n // 2),
+            "Crop": ["Rice", " WHEAT"] * (n // 2),
+            "Crop_Year": rng.integers(1997, 2015, size=n),
+            "Area": area,
+            "Production": rng.normal(100, 10, size=n),
+        }
+    )
+    df.to_csv(path, index=False)
+
+
+def test_streaming_matches_in_memory_output(tmp_path):
+    raw = tmp_path / "Crop_production.csv"
+    write_raw(raw)
+    in_memory = tmp_path / "in_memory.csv"
+    streamed = tmp_path / "streamed.csv"
+
+    merge_pipeline.clean_in_memory(str(raw), str(in_memory))
+    shape = merge_pipeline.clean_streaming(str(raw), str(streamed), chunksize=7)
+
+    expected = pd.read_csv(in_memory)
+    out = pd.read_csv(streamed)
+    assert shape == expected.shape
+    pd.testing.assert_frame_equal(out, expected)
+    assert out["Area"].notna().all()
+    assert set(out["State_Name"]) == {"karnataka", "odisha"}
+
+
+def test_streaming_median_is_bounded_and_close():
+    est = merge_pipeline.StreamingMedian(size=500)
+    rng = np.random.default_rng(1)
+    data = rng.normal(50, 5, size=20_000)
+    for chunk in np.array_split(data, 40):
+        est.update(chunk)
+    assert len(est.sample) == 500
+    assert est.seen == 20_000
+    assert abs(est.median() - np.median(data)) < 1.0
@@ -0,0 +1,97 @@
+import os
+
+import numpy as np
+from src import sarima_model
+from src.model_store import ModelStore, model_key
+
+
+class Results:
+    """Stand-in for fitted results: only what `ModelStore.put` reads."""
+
+    params = np.array([0.1, 0.2])
+    param_names = ("a", "b")
+
+
+def test_model_key_depends_on_values_and_spec(make_series):
+    s = make_series()
+    k = model_key(s, (1, 1, 1), (1, 1, 1, 4))
+    assert k == model_key(s.copy(), (1, 1, 1), (1, 1, 1, 4))
+    assert k != model_key(s + 1, (1, 1, 1), (1, 1, 1, 4))
+    assert k != model_key(s, (2, 1, 1), (1, 1, 1, 4))
+    assert k != model_key(s, (1, 1, 1), (1, 1, 1, 4), version="0.0")
+
+
+def test_train_sarima_reuses_stored_params(tmp_path, monkeypatch, make_series):
+    store = ModelStore(tmp_path)
+    s = make_series()
+    fitted = sarima_model.train_sarima(s, store=store)
+    assert len(list(tmp_path.glob("*.json"))) == 1
+
+    def no_fit(*args, **kwargs):
+        raise AssertionError("MLE fit should be skipped on a store hit")
+
+    monkeypatch.setattr(sarima_model.SARIMAX, "fit", no_fit)
+    cached = sarima_model.train_sarima(s, store=store)
+    np.testing.assert_allclose(cached.params, fitted.params)
+    np.testing.assert_allclose(cached.forecast(steps=3), fitted.forecast(steps=3))
+
+
+def test_model_store_evicts_least_recently_used(tmp_path, make_series):
+
+    store = ModelStore(tmp_path, max_entries=2)
+    spec = ((1, 1, 1), (1, 1, 1, 4))
+    series = [make_series(seed=i) for i in range(3)]
+    keys = [store.put(series[0], Results(), *spec)]
+    keys.append(store.put(series[1], Results(), *spec))
+    # make entry 0 older than entry 1, then touch it through a hit
+    os.utime(tmp_path / f"{keys[0]}.json", ns=(1, 1))
+    os.utime(tmp_path / f"{keys[1]}.json", ns=(2, 2))
+    assert store.get(series[0], *spec)["params"] == [0.1, 0.2]
+
+    store.put(series[2], Results(), *spec)
+    assert store.get(series[1], *spec) is None
+    assert store.get(series[0], *spec) is not None
+    assert store.get(series[2], *spec) is not None
+
+
+def test_model_store_scans_lazily_and_bounds_named_entries(
+    tmp_path, monkeypatch, make_series
+):
+
+    scans = []
+    scandir = os.scandir
+
+    def spy(path):
+        scans.append(path)
+        return scandir(path)
+
+    monkeypatch.setattr(os, "scandir", spy)
+    store = ModelStore(tmp_path, max_entries=100, scan_every=1000)
+    spec = ((1, 1, 1), (1, 1, 1, 4))
+    for i in range(100):
+        store.put(make_series(seed=i), Results(), *spec, name=("s", i))
+        store.put_order(("s", i), {"order": [1, 1, 1]})
+
+    files = list(tmp_path.rglob("*.json"))
+    assert 90 <= len(files) <= 100
+    assert any(p.parent.name == "latest" for p in files)
+    assert any(p.parent.name == "orders" for p in files)
+    # 300 writes; each eviction frees 10 entries and scans three directories
+    assert len(scans) <= 3 * 25
+
+
+def test_concurrent_puts_of_one_key_from_threads(tmp_path, make_series):
+    from concurrent.futures import ThreadPoolExecutor
+
+    store = ModelStore(tmp_path)
+    spec = ((1, 1, 1), (1, 1, 1, 4))
+    s = make_series()
+
+    def put(_):
+        return store.put(s, Results(), *spec, name=("a", "x"))
+
+    with ThreadPoolExecutor(8) as pool:
+        keys = set(pool.map(put, range(200)))
+    assert len(keys) == 1
+    assert store.get(s, *spec)["params"] == [0.1, 0.2]
+    assert not list(tmp_path.rglob("*.tmp"))
@@ -0,0 +1,41 @@
+import numpy as np
+import pandas as pd
+
+from src.normalize import _normalize_str, normalize_series, normalize_text
+
+
+def test_normalize_text_rules():
+    assert (
+        normalize_text(" Andaman & Nicobar\nIslands ") == "andaman and nicobar islands"
+    )
+    assert normalize_text("Jammu-Kashmir") == "jammu kashmir"
+    assert normalize_text(1998) == "1998"
+    assert normalize_text(None) is None
+    assert np.isnan(normalize_text(np.nan))
+
+
+def test_normalize_series_matches_scalar_and_keeps_index():
+    values = pd.Series(
+        ["Rice ", "RICE", np.nan, "Arhar/Tur", "rice"],
+        index=[5, 6, 7, 8, 9],
+        name="crop",
+    )
+    out = normalize_series(values)
+    assert out.name == "crop"
+    assert list(out.index) == [5, 6, 7, 8, 9]
+    assert out.iloc[[0, 1, 3, 4]].tolist() == ["rice", "rice", "arhar tur", "rice"]
+    assert pd.isna(out.iloc[2])
+
+    categorical = normalize_series(values.astype("category"))
+    assert isinstance(categorical.dtype, pd.CategoricalDtype)
+    assert sorted(categorical.cat.categories) == ["arhar tur", "rice"]
+    assert categorical.astype(object).equals(out)
+    assert normalize_series(pd.Series([], dtype=object)).empty
+
+
+def test_normalize_series_normalizes_each_distinct_value_once():
+    _normalize_str.cache_clear()
+    normalize_series(pd.Series(["Kerala", "Goa"] * 1000))
+    assert _normalize_str.cache_info().misses == 2
+    normalize_series(pd.Series(["GOA", "Kerala"]))
+    assert _normalize_str.cache_info().misses == 3
@@ -0,0 +1,88 @@
+from src import order_selection, sarima_model
+from src.model_store import ModelStore
+
+SMALL_GRID = {"p": (0, 1), "d": (1,), "q": (0, 1), "P": (0,), "D": (0,), "Q": (0,)}
+
+
+def test_candidate_specs_prunes_unestimable_specs():
+    all_specs = order_selection.candidate_specs()
+    assert ((1, 1, 1), (1, 1, 1, 4)) in all_specs
+    short = order_selection.candidate_specs(nobs=8)
+    assert 0 < len(short) < len(all_specs)
+    assert ((2, 1, 2), (1, 1, 1, 4)) not in short
+
+
+def test_select_order_returns_spec_from_grid(make_series):
+    order, seasonal = order_selection.select_order(
+        make_series(walk=True), grid=SMALL_GRID
+    )
+    assert (order, seasonal) in order_selection.candidate_specs(SMALL_GRID)
+
+
+def test_select_order_memoizes_until_series_changes(tmp_path, monkeypatch, make_series):
+    store = ModelStore(tmp_path)
+    s = make_series(40, walk=True)
+    spec = order_selection.select_order(
+        s[:24], grid=SMALL_GRID, store=store, name=("a", "x")
+    )
+
+    calls = []
+    real_score = order_selection._score
+
+    def spy(*args, **kwargs):
+        calls.append(args)
+        return real_score(*args, **kwargs)
+
+    monkeypatch.setattr(order_selection, "_score", spy)
+    # one new observation: memoized spec is reused without any fits
+    again = order_selection.select_order(
+        s[:25], grid=SMALL_GRID, store=store, name=("a", "x")
+    )
+    assert again == spec and calls == []
+
+    # many new observations: the grid is searched again
+    order_selection.select_order(s, grid=SMALL_GRID, store=store, name=("a", "x"))
+    assert calls
+
+
+def test_train_sarima_auto_order_reuses_selected_fit(
+    tmp_path, monkeypatch, make_series
+):
+    store = ModelStore(tmp_path)
+    monkeypatch.setattr(
+        order_selection, "DEFAULT_GRID", {**order_selection.DEFAULT_GRID, **SMALL_GRID}
+    )
+    s = make_series(walk=True)
+    fitted = sarima_model.train_sarima(s, store=store, auto_order=True)
+    assert (fitted.model.order, fitted.model.seasonal_order[:3]) in [
+        (o, so[:3]) for o, so in order_selection.candidate_specs(SMALL_GRID)
+    ]
+
+
+def test_train_sarima_many_keeps_order_after_a_new_observation(
+    tmp_path, monkeypatch, make_series
+):
+    store = ModelStore(tmp_path)
+    monkeypatch.setattr(
+        order_selection, "DEFAULT_GRID", {**order_selection.DEFAULT_GRID, **SMALL_GRID}
+    )
+    s = make_series(25, walk=True)
+    key = ("a", "x")
+    (first,) = sarima_model.train_sarima_many(
+        [(key, s[:24])], workers=1, store=store, auto_order=True
+    )
+    assert first.ok
+
+    calls = []
+    real_score = order_selection._score
+
+    def spy(*args, **kwargs):
+        calls.append(args)
+        return real_score(*args, **kwargs)
+
+    monkeypatch.setattr(order_selection, "_score", spy)
+    (second,) = sarima_model.train_sarima_many(
+        [(key, s)], workers=1, store=store, auto_order=True
+    )
+    assert second.ok and calls == []
+    assert second.model.model.order == first.model.model.order
@@ -0,0 +1,152 @@
+import pandas as pd
+import pytest
+
+from src import data_loader, parquet_dataset
+from src.merge_datasets import merge_all_datasets
+from src.parquet_dataset import (
+    filter_frame,
+    partition_values,
+    read_partitioned,
+    write_partitioned,
+)
+
+pytest.importorskip("pyarrow")
+
+
+def make_frame():
+    return pd.DataFrame(
+        {
+            "state_name": ["karnataka", "odisha", "karnataka", "andhra pradesh"] * 3,
+            "crop": ["rice", "wheat", "maize", "rice"] * 3,
+            "year": list(range(2000, 2012)),
+            "production": [float(i) for i in range(12)],
+        }
+    ).astype({"state_name": "category", "crop": "category"})
+
+
+def sort(df):
+    df = df.astype({c: object for c in ("state_name", "crop") if c in df})
+    return df.sort_values("year").reset_index(drop=True)
+
+
+def test_filters_open_only_matching_partitions(tmp_path, monkeypatch):
+    df = make_frame()
+    root = tmp_path / "final_dataset"
+    write_partitioned(df, root)
+    assert partition_values(root) == ["andhra pradesh", "karnataka", "odisha"]
+
+    opened = []
+    read_table = parquet_dataset.pq.read_table
+
+    def spy(path, **kwargs):
+        opened.append(path.parent.name)
+        return read_table(path, **kwargs)
+
+    monkeypatch.setattr(parquet_dataset.pq, "read_table", spy)
+    out = read_partitioned(root, states=["Karnataka "], columns=["year", "crop"])
+    assert opened == ["state_name=karnataka"]
+    assert list(out.columns) == ["year", "crop"]
+    expected = filter_frame(df, states="karnataka", columns=["year", "crop"])
+    pd.testing.assert_frame_equal(sort(out), sort(expected))
+
+    # crop is not a partition key here: filtered inside the files
+    out = read_partitioned(root, crops="rice")
+    assert set(out["crop"]) == {"rice"}
+    pd.testing.assert_frame_equal(
+        sort(out[df.columns]), sort(filter_frame(df, crops="rice"))
+    )
+
+
+def test_state_and_crop_partitions_round_trip(tmp_path):
+    df = make_frame()
+    root = tmp_path / "final_dataset"
+    index = write_partitioned(df, root, ["state_name", "crop"])
+    assert len(index["partitions"]) == 4
+    out = read_partitioned(root)
+    assert list(out.columns) == list(df.columns)
+    assert isinstance(out["state_name"].dtype, pd.CategoricalDtype)
+    pd.testing.assert_frame_equal(sort(out), sort(df))
+
+    out = read_partitioned(root, states="karnataka", crops=["maize"])
+    assert out["year"].tolist() == [2002, 2006, 2010]
+    assert read_partitioned(root, states="goa").empty
+
+    # rewriting replaces the previous partitions
+    write_partitioned(df[df["state_name"] == "odisha"], root)
+    assert partition_values(root) == ["odisha"]
+    assert not (root / "state_name=karnataka").exists()
+
+
+def test_load_final_dataset_reads_partitions(tmp_path, monkeypatch):
+    raw, proc = tmp_path / "raw", tmp_path / "processed"
+    raw.mkdir()
+    proc.mkdir()
+    make_frame().to_csv(proc / "cleaned_crop_data_with_year.csv", index=False)
+    pd.DataFrame(
+        {
+            "state_name": ["karnataka", "odisha"],
+            "crop": ["rice", "wheat"],
+            "rainfall": [1.0, 2.0],
+        }
+    ).to_csv(raw / "Final_Dataset_after_temperature.csv", index=False)
+    pd.DataFrame([{"Crop": "Rice", "N": 80, "P": 40, "K": 40}]).to_csv(
+        raw / "Fertilizer.csv", index=False
+    )
+    merge_all_datasets(raw_dir=str(raw), processed_dir=str(proc), out_dir=str(tmp_path))
+    monkeypatch.setattr(data_loader, "DATA_DIR", str(tmp_path))
+
+    assert data_loader.final_dataset_states() == [
+        "andhra pradesh",
+        "karnataka",
+        "odisha",
+    ]
+    out = data_loader.load_final_dataset(states="odisha", columns=["year", "rainfall"])
+    assert out["rainfall"].tolist() == [2.0] * 3
+
+    # the CSV path gives the same rows
+    csv = data_loader.load_final_dataset(
+        use_cache=False, states="odisha", columns=["year", "rainfall"]
+    )
+    pd.testing.assert_frame_equal(sort(out), sort(csv), check_dtype=False)
+
+
+def test_stale_partitions_fall_back_to_csv(tmp_path, monkeypatch):
+    from src.merge_datasets import combine_datasets
+
+    monkeypatch.setattr(data_loader, "DATA_DIR", str(tmp_path))
+    fert = pd.DataFrame({"crop": ["rice"], "n": [1.0]})
+    weather = pd.DataFrame({"state_name": ["odisha"], "crop": ["rice"]})
+    crop = pd.DataFrame(
+        {
+            "state_name": ["odisha"],
+            "crop": ["rice"],
+            "year": [2001],
+            "production": [1.0],
+        }
+    )
+
+    def combine(production, **kwargs):
+        combine_datasets(
+            crop.assign(production=production),
+            weather,
+            fert,
+            processed_dir=str(tmp_path),
+            out_dir=str(tmp_path),
+            **kwargs,
+        )
+
+    combine(1.0)
+    assert (tmp_path / "final_dataset" / "_index.json").exists()
+    assert data_loader.load_final_dataset()["production"].tolist() == [1.0]
+
+    # a rewrite without the Parquet copy removes the old one
+    combine(999.0, partition_by=None)
+    assert not (tmp_path / "final_dataset").exists()
+    assert data_loader.load_final_dataset()["production"].tolist() == [999.0]
+
+    # a CSV changed behind the copy's back is read instead of the copy
+    combine(1.0)
+    csv = tmp_path / "final_dataset.csv"
+    csv.write_text(csv.read_text().replace("1.0", "5.0"))
+    assert data_loader.load_final_dataset()["production"].tolist() == [5.0]
+    assert data_loader.final_dataset_states() == ["odisha"]
@@ -0,0 +1,157 @@
+import threading
+
+import pandas as pd
+
+from src import pipeline
+from src.pipeline import Stage
+
+
+def _copy_stage(name, src, dst, calls, transform=str.upper):
+    def func():
+        calls.append(name)
+        dst.write_text(transform(src.read_text()))
+
+    return Stage(name, func, inputs=(src,), outputs=(dst,))
+
+
+def test_run_skips_unchanged_and_reruns_only_dependents(tmp_path):
+    manifest = tmp_path / "manifest.json"
+    a_in, b_in = tmp_path / "a.txt", tmp_path / "b.txt"
+    a_out, b_out, c_out = (tmp_path / n for n in ("a.out", "b.out", "c.out"))
+    a_in.write_text("x")
+    b_in.write_text("y")
+    calls = []
+    stages = [
+        _copy_stage("a", a_in, a_out, calls, transform=str.strip),
+        _copy_stage("b", b_in, b_out, calls),
+        _copy_stage("c", a_out, c_out, calls),
+    ]
+
+    status = pipeline.run(stages, workers=1, manifest_file=manifest)
+    assert status == {"a": "ran", "b": "ran", "c": "ran"}
+
+    calls.clear()
+    status = pipeline.run(stages, workers=1, manifest_file=manifest)
+    assert set(status.values()) == {"skipped"} and calls == []
+
+    # a changes: only a and its dependent c rerun
+    a_in.write_text("z")
+    status = pipeline.run(stages, workers=1, manifest_file=manifest)
+    assert status == {"a": "ran", "b": "skipped", "c": "ran"}
+
+    # a reruns but writes the same output: c is not invalidated
+    a_in.write_text("z\n")
+    status = pipeline.run(stages, workers=1, manifest_file=manifest)
+    assert status == {"a": "ran", "b": "skipped", "c": "skipped"}
+
+    # a deleted output is rebuilt
+    b_out.unlink()
+    assert pipeline.run(stages, workers=1, manifest_file=manifest)["b"] == "ran"
+
+
+def test_run_reports_missing_failed_and_blocked(tmp_path, capsys):
+    out = tmp_path / "out.txt"
+
+    def boom():
+        raise RuntimeError("bad input")
+
+    stages = [
+        Stage("absent", lambda: None, inputs=(tmp_path / "nope.csv",)),
+        Stage("broken", boom, outputs=(out,)),
+        Stage("after", lambda: None, inputs=(out,)),
+    ]
+    status = pipeline.run(stages, workers=1, manifest_file=tmp_path / "m.json")
+    assert status == {"absent": "missing", "broken": "failed", "after": "blocked"}
+    assert "WARN: pipeline stage broken failed: bad input" in capsys.readouterr().out
+
+
+def test_independent_stages_run_concurrently(tmp_path):
+    # both stages must be inside func() at the same time to pass the barrier
+    barrier = threading.Barrier(2, timeout=10)
+    stages = [
+        Stage(name, barrier.wait, outputs=(tmp_path / f"{name}.out",))
+        for name in ("weather", "fertilizer")
+    ]
+    status = pipeline.run(stages, workers=2, manifest_file=tmp_path / "m.json")
+    assert status == {"weather": "ran", "fertilizer": "ran"}
+
+
+def test_build_stages_merges_and_skips_on_rerun(tmp_path):
+    raw, proc = tmp_path / "raw", tmp_path / "processed"
+    raw.mkdir()
+    proc.mkdir()
+    pd.DataFrame(
+        {
+            "state_name": ["andhra pradesh"] * 6,
+            "crop": ["rice"] * 6,
+            "year": range(2010, 2016),
+            "production": range(100, 106),
+        }
+    ).to_csv(proc / "cleaned_crop_data_with_year.csv", index=False)
+    pd.DataFrame(
+        [{"state_name": "andhra pradesh", "crop": "rice", "rainfall": 654.3}]
+    ).to_csv(raw / "Final_Dataset_after_temperature.csv", index=False)
+    fert = raw / "Fertilizer.csv"
+    pd.DataFrame([{"Crop": "Rice", "N": 80, "P": 40, "K": 40}]).to_csv(
+        fert, index=False
+    )
+    stages = pipeline.build_stages(raw, proc, tmp_path)
+    manifest = tmp_path / "manifest.json"
+
+    status = pipeline.run(stages, manifest_file=manifest)
+    assert status["clean_raw"] == status["add_year"] == "missing"
+    assert {k: v for k, v in status.items() if v != "missing"} == {
+        "clean_crop": "ran",
+        "clean_weather": "ran",
+        "clean_fertilizer": "ran",
+        "merge": "ran",
+        "action_plan": "ran",
+    }
+    final = pd.read_csv(tmp_path / "final_dataset.csv")
+    assert {"rainfall", "n"}.issubset(final.columns)
+
+    status = pipeline.run(stages, manifest_file=manifest)
+    assert set(status.values()) == {"missing", "skipped"}
+
+    # new fertilizer figures do not change the suitability report
+    pd.DataFrame([{"Crop": "Rice", "N": 90, "P": 40, "K": 40}]).to_csv(
+        fert, index=False
+    )
+    status = pipeline.run(stages, manifest_file=manifest)
+    assert status["clean_fertilizer"] == status["merge"] == "ran"
+    assert status["clean_crop"] == status["clean_weather"] == "skipped"
+    assert status["action_plan"] == "skipped"
+    assert pd.read_csv(tmp_path / "final_dataset.csv")["n"].tolist() == [90] * 6
+
+
+def test_add_year_reruns_when_season_definitions_change(tmp_path):
+    raw, proc = tmp_path / "raw", tmp_path / "processed"
+    raw.mkdir()
+    proc.mkdir()
+    pd.DataFrame(
+        {
+            "state_name": ["odisha"],
+            "crop": ["rice"],
+            "crop_type": ["summer"],
+            "production": [1.0],
+        }
+    ).to_csv(proc / "cleaned_crop_data.csv", index=False)
+    rain = pd.DataFrame({"SUBDIVISION": ["orissa"], "YEAR": [2010]})
+    for m in ["JAN", "FEB", "MAR", "APR", "MAY", "JUN"]:
+        rain[m] = 1.0
+    rain.to_csv(raw / "rainfall_validation.csv", index=False)
+    stages = [
+        s for s in pipeline.build_stages(raw, proc, tmp_path) if s.name == "add_year"
+    ]
+    manifest = tmp_path / "manifest.json"
+
+    assert pipeline.run(stages, manifest_file=manifest) == {"add_year": "ran"}
+    assert pipeline.run(stages, manifest_file=manifest) == {"add_year": "skipped"}
+    with_year = proc / "cleaned_crop_data_with_year.csv"
+    assert pd.read_csv(with_year)["seasonal_rainfall"].tolist() == [6.0]
+
+    pd.DataFrame(
+        {"season": ["summer"], "keywords": ["summer"], "months": ["apr,may"]}
+    ).to_csv(proc / "season_definitions.csv", index=False)
+    assert pipeline.run(stages, manifest_file=manifest) == {"add_year": "ran"}
+    assert pd.read_csv(with_year)["seasonal_rainfall"].tolist() == [2.0]
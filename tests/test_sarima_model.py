@@ -19,3 +19,111 @@ def test_train_sarima_calls_sarimax(monkeypatch):
     s = pd.Series(range(10))
     out = sarima_model.train_sarima(s)
     assert out == "fitted"
+
+
+def test_train_sarima_many_inline_skips_and_captures_failures(monkeypatch):
+    class DummyModel:
+        def __init__(self, series, **kwargs):
+            if series.iloc[0] < 0:
+                raise ValueError("bad series")
+
+        def fit(self, disp=False):
+            return "fitted"
+
+    monkeypatch.setattr(sarima_model, "SARIMAX", DummyModel)
+    series = [
+        ("short", pd.Series([1, 2, 3])),
+        ("bad", pd.Series([-1] + list(range(9)))),
+        ("good", pd.Series(range(10))),
+    ]
+    results = {r.key: r for r in sarima_model.train_sarima_many(series, workers=1)}
+    assert results["short"].skipped and results["short"].model is None
+    assert "bad series" in results["bad"].error
+    assert results["good"].ok and results["good"].model == "fitted"
+    assert results["good"].seconds >= 0
+
+
+def test_train_sarima_many_process_pool():
+    import numpy as np
+
+    rng = np.random.default_rng(0)
+    series = [(i, pd.Series(np.arange(16) + rng.normal(size=16) + i)) for i in range(3)]
+    series.append(("short", pd.Series([1.0, 2.0])))
+    results = list(sarima_model.train_sarima_many(series, workers=2))
+    assert sorted(map(str, (r.key for r in results))) == ["0", "1", "2", "short"]
+    fitted = [r for r in results if not r.skipped]
+    assert all(r.ok for r in fitted)
+    assert all(len(r.model.forecast(steps=2)) == 2 for r in fitted)
+
+
+def test_update_sarima_extends_then_warm_refits(monkeypatch, make_series):
+    import numpy as np
+
+    first = sarima_model.train_sarima(make_series(24))
+
+    fit_calls = []
+    real_fit = sarima_model.SARIMAX.fit
+
+    def spy_fit(self, *args, **kwargs):
+        fit_calls.append(kwargs)
+        return real_fit(self, *args, **kwargs)
+
+    monkeypatch.setattr(sarima_model.SARIMAX, "fit", spy_fit)
+
+    # one new year: parameters are kept, only the state is extended
+    extended = sarima_model.update_sarima(make_series(25), previous=first)
+    assert fit_calls == []
+    assert extended.estimated_nobs == 24
+    np.testing.assert_allclose(extended.params, first.params)
+    assert len(extended.forecast(steps=2)) == 2
+
+    # a full season since the last estimation: warm-started refit
+    refit = sarima_model.update_sarima(make_series(28), previous=extended)
+    assert len(fit_calls) == 1
+    np.testing.assert_allclose(fit_calls[0]["start_params"], first.params)
+    assert refit.estimated_nobs == 28
+
+
+def test_update_sarima_changed_history_fits_cold(monkeypatch, make_series):
+    first = sarima_model.train_sarima(make_series(24))
+    revised = make_series(25).copy()
+    revised.iloc[0] += 100
+
+    fit_calls = []
+    real_fit = sarima_model.SARIMAX.fit
+
+    def spy_fit(self, *args, **kwargs):
+        fit_calls.append(kwargs)
+        return real_fit(self, *args, **kwargs)
+
+    monkeypatch.setattr(sarima_model.SARIMAX, "fit", spy_fit)
+    sarima_model.update_sarima(revised, previous=first)
+    assert len(fit_calls) == 1
+    assert "start_params" not in fit_calls[0]
+
+
+def test_update_sarima_uses_latest_fit_from_store(tmp_path, monkeypatch, make_series):
+    from src.model_store import ModelStore
+
+    store = ModelStore(tmp_path)
+    sarima_model.update_sarima(make_series(24), store=store, name=("a", "x"))
+
+    def no_fit(*args, **kwargs):
+        raise AssertionError("should extend the stored fit")
+
+    monkeypatch.setattr(sarima_model.SARIMAX, "fit", no_fit)
+    out = sarima_model.update_sarima(make_series(25), store=store, name=("a", "x"))
+    assert out.estimated_nobs == 24
+    assert store.get_latest(("a", "x"), (1, 1, 1), (1, 1, 1, 4))["nobs"] == 25
+
+
+def test_bounded_map_passes_through_and_reports_dead_workers():
+    import os
+
+    items = [("skip", None), ("dead", (1,))]
+    out = dict(
+        sarima_model.bounded_map(
+            os._exit, items, workers=2, on_error=lambda key, error: f"{key}: broken"
+        )
+    )
+    assert out == {"skip": None, "dead": "dead: broken"}
@@ -0,0 +1,78 @@
+import pandas as pd
+
+from src.data_preprocessing import clean_data
+from src.schemas import detect_kind, read_typed_csv
+
+
+def test_detect_kind():
+    assert detect_kind(["Crop", "N", "P", "K"]) == "fertilizer"
+    assert detect_kind(["", "Jan", "Feb"]) == "temperature"
+    assert detect_kind(["SUBDIVISION", "YEAR", "JAN"]) == "rainfall"
+    assert detect_kind(["state_name", "crop", "rainfall"]) == "final"
+    assert detect_kind(["State_Name", "Crop", "Year", "Production"]) == "crop"
+    assert detect_kind(["a", "b"]) is None
+    # add_year_month output: crop data with a subdivision column
+    enriched = ["state_name", "crop", "crop_year", "production", "subdivision", "year"]
+    assert detect_kind(enriched) == "crop"
+
+
+def test_rainfall_prefers_exact_year_column(tmp_path):
+    path = tmp_path / "rain.csv"
+    path.write_text("subdivision,crop_year,year,jan\norissa,1,2010,5\n")
+    df = read_typed_csv(path)
+    assert "year" in df.columns and "crop_year" not in df.columns
+
+
+def test_read_typed_csv_projects_and_types(tmp_path):
+    path = tmp_path / "crop.csv"
+    pd.DataFrame(
+        {
+            "State_Name": ["Goa", "Goa", "Kerala"],
+            "District": ["x", "y", "z"],
+            "Crop": ["Rice", "Rice", "Maize"],
+            "Year": [2001, 2002, 2001],
+            "Production": [1.5, 2.5, 3.0],
+        }
+    ).to_csv(path, index=False)
+
+    df = read_typed_csv(path)
+    assert list(df.columns) == ["State_Name", "Crop", "Year", "Production"]
+    assert isinstance(df["State_Name"].dtype, pd.CategoricalDtype)
+    assert df["Year"].dtype == "int16"
+    assert df["Production"].dtype == "float32"
+    assert "District" in read_typed_csv(path, project=False).columns
+
+    typed = clean_data(df)
+    plain = clean_data(pd.read_csv(path))
+    pd.testing.assert_frame_equal(
+        typed.astype({"state_name": object, "crop": object, "year": int}),
+        plain.astype({"production": "float32"}),
+    )
+
+
+def test_read_typed_csv_falls_back_on_missing_years(tmp_path):
+    path = tmp_path / "crop.csv"
+    path.write_text("state_name,crop,year,production\ngoa,rice,,1\n", encoding="utf-8")
+    df = read_typed_csv(path)
+    assert df["year"].isna().all()
+    assert df["production"].dtype == "float32"
+
+
+def test_read_typed_csv_temperature_with_unnamed_state_column(tmp_path):
+    path = tmp_path / "temperature.csv"
+    path.write_text(",Jan,Feb\nbihar,18.5,22.5\n", encoding="utf-8")
+    out = clean_data(read_typed_csv(path))
+    assert out["state_name"].tolist() == ["bihar"]
+    assert out["temperature"].iat[0] == 20.5
+
+
+def test_read_typed_csv_blank_names_are_missing(tmp_path):
+    path = tmp_path / "crop.csv"
+    path.write_text(
+        "state_name,crop,crop_type,year,production\n"
+        'goa,,kharif,2001,1\n,rice,"",2002,2\nkerala,maize,,2003,3\n',
+        encoding="utf-8",
+    )
+    typed = read_typed_csv(path)
+    plain = pd.read_csv(path)
+    pd.testing.assert_frame_equal(typed.isna(), plain[typed.columns].isna())
@@ -1,6 +1,6 @@
 import pandas as pd
 import pytest
-from src.time_series_builder import build_time_series
+from src.time_series_builder import build_all_time_series, build_time_series
 from src.data_preprocessing import prepare_sarima_series
 
 
@@ -119,6 +119,21 @@ def test_build_time_series_column_case_insensitive_and_prod_cols():
     assert ts2.sum() == 20
 
 
+def test_series_index_reads_plain_production_column():
+    # the column clean_data and add_year_month write
+    df = pd.DataFrame(
+        {
+            "state_name": ["A", "A"],
+            "crop": ["X", "X"],
+            "year": [2019, 2020],
+            "production": [5.0, 7.0],
+        }
+    )
+    index = build_all_time_series(df)
+    assert index.prod_col == "production"
+    assert index.get("a", "x").tolist() == [5.0, 7.0]
+
+
 def test_build_time_series_missing_production_column_raises():
     df = pd.DataFrame(
         {"state_name": ["A", "A"], "crop": ["X", "X"], "year": [2019, 2020]}
@@ -174,3 +189,62 @@ def test_build_time_series_missing_required_columns():
     with pytest.raises(Exception) as exc:
         build_time_series(df, "A", "X")
     assert "Missing required columns" in str(exc.value)
+
+
+def test_build_all_time_series_lookup_and_iteration():
+    df = pd.DataFrame(
+        {
+            "State_Name": ["A", "B", "A", " a ", "B"],
+            "Crop": ["X", "Y", "X", "Z", "Y"],
+            "Year": [2020, 2019, 2018, 2019, 2018],
+            "yield": [20, 3, 5, 7, 1],
+        }
+    )
+    index = build_all_time_series(df)
+    assert len(index) == 3
+    assert ("a", "X") in index
+
+    ts = index.get("A", "x")
+    assert list(ts.values) == [5.0, 20.0]
+    assert list(ts.index) == [1, 2]
+    assert ts.dtype == float
+    assert list(index.years("b", "y")) == [2018, 2019]
+
+    series = dict(index)
+    assert set(series) == {("a", "x"), ("a", "z"), ("b", "y")}
+    assert list(series[("b", "y")].values) == [1.0, 3.0]
+
+
+def test_build_time_series_accepts_series_index():
+    df = pd.DataFrame(
+        {
+            "state_name": ["A", "A"],
+            "crop": ["X", "X"],
+            "year": [2020, 2019],
+            "yield": [2, 1],
+        }
+    )
+    index = build_all_time_series(df)
+    pd.testing.assert_series_equal(
+        build_time_series(index, "A", "X"), build_time_series(df, "A", "X")
+    )
+    with pytest.raises(Exception) as exc:
+        build_time_series(index, "B", "X")
+    assert "No data found" in str(exc.value)
+
+
+def test_prepare_sarima_series_leaves_caller_frame_untouched():
+    df = pd.DataFrame(
+        {
+            " State ": ["A", "A"],
+            "Crop": ["X", "X"],
+            "Year": [2019.0, 2020.0],
+            "Production": [4, 6],
+        }
+    )
+    before = df.copy()
+    ts = prepare_sarima_series(df, "a", "x")
+    pd.testing.assert_frame_equal(df, before)
+    assert ts.index.name == "year"
+    assert ts.name == "production"
+    assert list(ts.index) == [2019, 2020]
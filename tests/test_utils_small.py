@@ -29,3 +29,31 @@ def test_recommender_order():
     best, worst = recommender.recommend_crops(df, "A")
     assert "X" in best.index
     assert best.index[0] == "X"
+
+
+def test_metrics_vectorized_with_nan_masking():
+    import numpy as np
+
+    actual = np.array([[1.0, 2.0, 4.0], [2.0, 4.0, np.nan]])
+    predicted = np.array([[1.0, 3.0, 2.0], [4.0, 4.0, 9.0]])
+    np.testing.assert_allclose(evaluation.mae(actual, predicted), [1.0, 1.0])
+    np.testing.assert_allclose(
+        evaluation.rmse(actual, predicted), [np.sqrt(5 / 3), np.sqrt(2)]
+    )
+    np.testing.assert_allclose(evaluation.mape(actual, predicted), [100 / 3, 50.0])
+    np.testing.assert_allclose(
+        evaluation.smape(actual, predicted),
+        [(0 + 200 / 5 + 200 * 2 / 6) / 3, (200 * 2 / 6) / 2],
+    )
+    insample = np.array([[0.0, 1.0, 2.0], [0.0, 2.0, np.nan]])
+    np.testing.assert_allclose(evaluation.mase(actual, predicted, insample), [1.0, 0.5])
+    # a row without any valid position scores NaN rather than raising
+    assert np.isnan(evaluation.rmse([[np.nan]], [[1.0]])[0])
+
+
+def test_evaluate_matches_rmse_and_checks_shapes():
+    import pytest
+
+    assert evaluation.evaluate([1, 2, 3], [2, 2, 3]) == pytest.approx((1 / 3) ** 0.5)
+    with pytest.raises(ValueError):
+        evaluation.evaluate([1, 2], [1, 2, 3])
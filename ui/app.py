@@ -1,12 +1,18 @@
 import sys
 import os
+import time
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 import streamlit as st
+import numpy as np
 import pandas as pd
 from pathlib import Path
 
+from src.alias_index import AliasIndex, load_state_aliases
+from src.forecast_jobs import DONE, JobQueue
+from src.normalize import normalize_text
+
 # try to import existing project helpers, but fail gracefully
 try:
     from src.data_loader import load_final_dataset, load_cleaned_dataset
@@ -24,6 +30,259 @@ try:
 except Exception:
     train_sarima = None
 
+try:
+    from src.forecast import forecast_future
+except Exception:
+    forecast_future = None
+
+try:
+    from src.baselines import forecast_baselines
+except Exception:
+    forecast_baselines = None
+
+try:
+    from src.model_store import ModelStore
+
+    model_store = ModelStore()
+except Exception:
+    model_store = None
+
+try:
+    from src.forecast import forecast_intervals
+    from src.forecast_store import ForecastStore, coverage, series_hash
+
+    forecast_store = ForecastStore()
+except Exception:
+    forecast_store = None
+
+FORECAST_STEPS = 5
+# concurrent background fits for the whole server, and how often a page
+# waiting for one reruns to check on it
+FORECAST_WORKERS = 2
+POLL_SECONDS = 1.0
+
+
+# ----- caching -----
+# Streamlit reruns this script on every interaction. Datasets are cached by
+# (kind, path, mtime_ns) of the file behind them, so an updated file is
+# picked up on the next rerun; lookups derived from a dataset are cached
+# under the same key, and finished forecasts live in the job queue.
+# "Refresh Data" clears everything.
+
+
+def _mtime_ns(path):
+    try:
+        return path.stat().st_mtime_ns
+    except OSError:
+        return None
+
+
+def resolve_dataset(choice):
+    """Dataset kind ('final', 'enriched' or 'cleaned') for a sidebar choice."""
+    if choice == "Final dataset" and load_final_dataset:
+        return "final"
+    if choice == "Enriched (with YEAR)" and load_cleaned_dataset:
+        return "enriched"
+    if choice == "Cleaned (raw)" and load_cleaned_dataset:
+        return "cleaned"
+    # Auto or any other option: prefer enriched when available
+    if load_cleaned_dataset:
+        return "enriched"
+    if load_final_dataset:
+        return "final"
+    return None
+
+
+def dataset_key(kind):
+    """Cache key of a dataset kind: (kind, path, mtime_ns) of its file.
+
+    The final dataset's key covers both the CSV and its Parquet copy.
+    """
+    if kind == "final":
+        index = final_dir / "_index.json"
+        return kind, str(final_path), (_mtime_ns(final_path), _mtime_ns(index))
+    if kind == "enriched" and enriched_path.exists():
+        path = enriched_path
+    else:
+        path = cleaned_path
+    return kind, str(path), _mtime_ns(path)
+
+
+@st.cache_data(show_spinner="Loading dataset...", max_entries=4)
+def load_dataset(kind, path, mtime_ns):
+    """Return (df, source) for a dataset key (see `dataset_key`)."""
+    if kind == "final":
+        return load_final_dataset(), "final"
+    return load_cleaned_dataset(prefer_enriched=kind == "enriched")
+
+
+def _distinct(df, column, title=False):
+    values = df[column].astype(str)
+    if title:
+        values = values.str.title()
+    return sorted(values.unique())
+
+
+@st.cache_resource(show_spinner=False, max_entries=32)
+def _cached_distinct(key, column, title, _df):
+    return _distinct(_df, column, title)
+
+
+def distinct_values(df, column, title=False):
+    """Sorted distinct values of a name column, computed once per dataset."""
+    if data_key is None:
+        return _distinct(df, column, title)
+    return _cached_distinct(data_key, column, title, df)
+
+
+@st.cache_resource
+def forecast_jobs():
+    """Background forecast jobs, one queue per server shared by all sessions."""
+    return JobQueue(workers=FORECAST_WORKERS)
+
+
+def clear_caches():
+    """Drop every cached dataset, lookup and finished forecast."""
+    for cached in (
+        load_dataset,
+        _cached_distinct,
+        _cached_alias_index,
+        _cached_series_hash,
+    ):
+        cached.clear()
+    forecast_jobs().clear_finished()
+    forecast_readiness.clear()
+
+
+def _build_alias_index(df, column, title, states):
+    aliases = load_state_aliases(manual_map_path) if states else ()
+    return AliasIndex(distinct_values(df, column, title), aliases)
+
+
+@st.cache_resource(show_spinner=False, max_entries=32)
+def _cached_alias_index(key, column, title, states, aliases_mtime, _df):
+    return _build_alias_index(_df, column, title, states)
+
+
+def alias_index(df, column, title=False, states=False):
+    """`AliasIndex` of a name column, built once per dataset version.
+
+    With `states=True` the state aliases of the manual subdivision map are
+    included, and the index is rebuilt when that file changes.
+    """
+    if data_key is None:
+        return _build_alias_index(df, column, title, states)
+    aliases_mtime = _mtime_ns(manual_map_path) if states else None
+    return _cached_alias_index(data_key, column, title, states, aliases_mtime, df)
+
+
+def run_forecast(df, state, crop, state_index, crop_index, report):
+    """Forecast a state/crop series: SARIMA when long enough, else a Holt baseline.
+
+    Runs as a background job (see `forecast_jobs`), so it must not call
+    Streamlit; `report(message, progress)` updates the job status. When
+    the exact state/crop has no rows, the closest names in `state_index`
+    and `crop_index` (`AliasIndex`) are used instead, before any model is
+    fitted. Returns
+    (forecast, notes) where notes are messages to show with the chart.
+    """
+    notes = []
+    report("Preparing series", 0.05)
+    try:
+        ts = prepare_sarima_series(df, state, crop)
+    except Exception as e:
+        # Try tolerant fallback matching when exact filter yields no data
+        state_match = state_index.match(state)
+        crop_match = crop_index.match(crop)
+        if state_match is None or crop_match is None:
+            raise
+        if (state_match, crop_match) == (state, crop):
+            raise
+        notes.append(
+            f"Initial lookup failed: {e}. Using matched values: "
+            f"State='{state_match}', Crop='{crop_match}'"
+        )
+        ts = prepare_sarima_series(df, state_match, crop_match)
+        ts.attrs["matched"] = (state_match, crop_match)
+
+    report("Fitting SARIMA model", 0.2)
+    model = train_sarima(ts, store=model_store)
+    report("Forecasting", 0.9)
+    nan = np.full(FORECAST_STEPS, np.nan)
+    if model is not None:
+        method = "sarima"
+        if forecast_store is not None:
+            mean, lower, upper = forecast_intervals(model, FORECAST_STEPS)
+        else:
+            mean = np.asarray(forecast_future(model, steps=FORECAST_STEPS))
+            lower = upper = nan
+    else:
+        if forecast_baselines is None:
+            raise Exception("Series too short for SARIMA and no baseline available")
+        notes.append(
+            "Too few years for SARIMA — showing a Holt trend baseline instead."
+        )
+        method = "holt"
+        holt = forecast_baselines([ts], steps=FORECAST_STEPS, methods=("holt",))
+        mean, lower, upper = holt["holt"][0], nan, nan
+
+    if forecast_store is not None:
+        # fill the store so the next request for this series is served from it
+        years = ts.index[-1] + np.arange(1, FORECAST_STEPS + 1)
+        name = ts.attrs.get("matched", (state, crop))
+        try:
+            forecast_store.put(
+                *name, method, series_hash(ts), years, mean, lower, upper
+            )
+        except Exception as e:
+            print(f"WARN: Could not store forecast for {name}: {e}")
+    return pd.Series(np.asarray(mean)), notes
+
+
+def _series_hash(df, state, crop):
+    try:
+        return series_hash(prepare_sarima_series(df, state, crop))
+    except Exception:
+        return None
+
+
+@st.cache_data(show_spinner=False, max_entries=1024)
+def _cached_series_hash(key, state, crop, _df):
+    return _series_hash(_df, state, crop)
+
+
+def stored_forecast(df, state, crop):
+    """Fresh precomputed forecast of a series, or None if missing or stale."""
+    if forecast_store is None:
+        return None
+    entry = forecast_store.get(state, crop)
+    if entry is None or prepare_sarima_series is None:
+        return None
+    if data_key is None:
+        current = _series_hash(df, state, crop)
+    else:
+        current = _cached_series_hash(data_key, state, crop, df)
+    return entry if entry.is_fresh(current) else None
+
+
+def _ago(seconds):
+    if seconds < 3600:
+        return f"{max(seconds // 60, 1):.0f} min ago"
+    if seconds < 86400:
+        return f"{seconds / 3600:.0f} h ago"
+    return f"{seconds / 86400:.0f} d ago"
+
+
+@st.cache_data(ttl=60, show_spinner=False)
+def forecast_readiness():
+    """(coverage of usable series or None, stored entries, seconds since newest)."""
+    if forecast_store is None:
+        return None, 0, None
+    count, _, newest = forecast_store.summary()
+    age = None if newest is None else time.time() - newest
+    return coverage(forecast_store), count, age
+
+
 # Page config
 st.set_page_config(page_title="AgroDash", page_icon="🌾", layout="wide")
 
@@ -59,13 +318,15 @@ processed_dir = Path(__file__).parent.parent / "data" / "processed"
 cleaned_path = processed_dir / "cleaned_crop_data.csv"
 enriched_path = processed_dir / "cleaned_crop_data_with_year.csv"
 final_path = Path(__file__).parent.parent / "data" / "final_dataset.csv"
+final_dir = final_path.with_suffix("")  # partitioned Parquet copy
+manual_map_path = processed_dir / "manual_state_to_subdivision.csv"
 
 dataset_options = ["Auto (prefer enriched)"]
 if enriched_path.exists():
     dataset_options.append("Enriched (with YEAR)")
 if cleaned_path.exists():
     dataset_options.append("Cleaned (raw)")
-if final_path.exists():
+if final_path.exists() or final_dir.exists():
     dataset_options.append("Final dataset")
 
 dataset_choice = st.sidebar.selectbox("Dataset source", dataset_options, index=0)
@@ -87,23 +348,15 @@ menu = st.sidebar.radio(
 data_root = Path(__file__).parent.parent / "data"
 app_data = None
 dataset_source = None
+data_key = None
 try:
-    if dataset_choice == "Final dataset" and load_final_dataset:
-        app_data = load_final_dataset()
-        dataset_source = "final"
-    elif dataset_choice == "Enriched (with YEAR)" and load_cleaned_dataset:
-        app_data, dataset_source = load_cleaned_dataset(prefer_enriched=True)
-    elif dataset_choice == "Cleaned (raw)" and load_cleaned_dataset:
-        app_data, dataset_source = load_cleaned_dataset(prefer_enriched=False)
-    else:
-        # Auto or any other option: prefer enriched when available
-        if load_cleaned_dataset:
-            app_data, dataset_source = load_cleaned_dataset(prefer_enriched=True)
-        elif load_final_dataset:
-            app_data = load_final_dataset()
-            dataset_source = "final"
+    dataset_kind = resolve_dataset(dataset_choice)
+    if dataset_kind:
+        data_key = dataset_key(dataset_kind)
+        app_data, dataset_source = load_dataset(*data_key)
 except Exception:
-    # Last-resort fallback
+    # Last-resort fallback (not cached)
+    data_key = None
     try:
         app_data = pd.read_csv(data_root / "processed" / "cleaned_crop_data.csv")
         dataset_source = "cleaned-fallback"
@@ -175,7 +428,18 @@ if menu == "Dashboard":
     col1.metric("Active States", str(active_states) if active_states else "—")
     col2.metric("Alerts", "5", "-1")
     col3.metric("Avg Yield (t/ha)", str(avg_yield) if avg_yield is not None else "—")
-    col4.metric("Forecast Ready", "Yes")
+    ready, stored, age = forecast_readiness()
+    if ready is not None:
+        ready_text = f"{ready:.0%}"
+    else:
+        ready_text = f"{stored} series" if stored else "No"
+    col4.metric(
+        "Forecast Ready",
+        ready_text,
+        f"updated {_ago(age)}" if age is not None else None,
+        delta_color="off",
+        help="Share of usable series (dataset_suitability.csv) with a stored forecast",
+    )
 
     st.markdown("### Quick Alerts")
     st.info("⚠️ Low rainfall alert for *Karnataka* — 20% below normal")
@@ -184,10 +448,8 @@ if menu == "Dashboard":
     st.markdown("### Action Buttons")
     a1, a2, a3 = st.columns(3)
     if a1.button("📥 Refresh Data"):
-        import time
-
-        st.experimental_set_query_params(_refresh=int(time.time()))
-        st.success("Refresh requested — reloading data")
+        clear_caches()
+        st.rerun()
     if a2.button("🔔 Send Alerts"):
         st.success("Alerts queued")
     if a3.button("📄 Export Report"):
@@ -252,19 +514,21 @@ elif menu == "Crop Management":
             st.write("[Field image placeholder]")
 
         # State search: allow quick search/select of all Indian states present in dataset
-        def get_states(df):
+        def get_state_index(df):
             if df is None:
-                return []
+                return None
             for col in ["state_name", "State_Name", "STATE_NAME", "State_Name"]:
                 if col in df.columns:
-                    return sorted(df[col].astype(str).str.title().unique())
-            return []
+                    return alias_index(df, col, title=True, states=True)
+            return None
 
-        states = get_states(df)
+        state_index = get_state_index(df)
+        states = state_index.names if state_index is not None else []
         state_query = st.text_input("Search states")
         if states:
             if state_query:
-                matches = [s for s in states if state_query.lower() in s.lower()]
+                # substring of a state name, or a known alias (e.g. "Orissa")
+                matches = state_index.search(state_query)
                 if matches:
                     state_sel = st.selectbox("Matched States", matches)
                 else:
@@ -298,9 +562,10 @@ elif menu == "Crop Management":
                 "Dataset not loaded or missing state/crop columns. Check dataset selection in the sidebar."
             )
         else:
-            state = st.selectbox("State", sorted(df[state_col].astype(str).unique()))
-            crop = st.selectbox("Crop", sorted(df[crop_col].astype(str).unique()))
+            state = st.selectbox("State", distinct_values(df, state_col))
+            crop = st.selectbox("Crop", distinct_values(df, crop_col))
 
+            job_key = (data_key, normalize_text(state), normalize_text(crop))
             if st.button("Run Forecast"):
                 if prepare_sarima_series and train_sarima:
                     if year_col is None:
@@ -308,57 +573,44 @@ elif menu == "Crop Management":
                             "Selected dataset doesn't contain a 'year' column required for time-series. Use an enriched dataset."
                         )
                     else:
-                        try:
-                            ts = prepare_sarima_series(df, state, crop)
-                            forecast = train_sarima(ts)
-                            st.line_chart(forecast)
-                        except Exception as e:
-                            # Try tolerant fallback matching when exact filter yields no data
-                            st.warning(
-                                f"Initial forecast failed: {e}. Trying tolerant matching..."
-                            )
-
-                            def find_best_match(col, val):
-                                val_l = val.lower().strip()
-                                candidates = sorted(df[col].astype(str).unique())
-                                # 1) exact ignore-case
-                                for c in candidates:
-                                    if c.lower().strip() == val_l:
-                                        return c
-                                # 2) substring contains
-                                for c in candidates:
-                                    if val_l in c.lower() or c.lower() in val_l:
-                                        return c
-                                # 3) token overlap
-                                val_tokens = [t for t in val_l.split() if t]
-                                for c in candidates:
-                                    cl = c.lower()
-                                    if any(tok in cl for tok in val_tokens):
-                                        return c
-                                return None
-
-                            state_match = find_best_match(state_col, state)
-                            crop_match = find_best_match(crop_col, crop)
-
-                            if state_match is None or crop_match is None:
-                                st.error(f"Forecast failed: {e}")
-                            else:
-                                st.info(
-                                    f"Using matched values: State='{state_match}', Crop='{crop_match}'"
-                                )
-                                try:
-                                    ts2 = prepare_sarima_series(
-                                        df, state_match, crop_match
-                                    )
-                                    forecast2 = train_sarima(ts2)
-                                    st.line_chart(forecast2)
-                                except Exception as e2:
-                                    st.error(
-                                        f"Forecast failed after tolerant matching: {e2}"
-                                    )
+                        # same state/crop already queued or running (any
+                        # session): this returns that job instead
+                        forecast_jobs().submit(
+                            job_key,
+                            run_forecast,
+                            df,
+                            state,
+                            crop,
+                            alias_index(df, state_col, states=True),
+                            alias_index(df, crop_col),
+                        )
+                        st.session_state["forecast_job"] = job_key
                 else:
                     st.warning("Modeling functions not available in this environment")
 
+            job = None
+            if st.session_state.get("forecast_job") == job_key:
+                job = forecast_jobs().get(job_key)
+            entry = stored_forecast(df, state, crop) if job is None else None
+            if entry is not None:
+                st.caption(
+                    f"Precomputed {entry.method.upper()} forecast "
+                    f"({_ago(entry.age_days * 86400)}) — Run Forecast to refit"
+                )
+                st.line_chart(pd.Series(entry.forecast["mean"].to_numpy()))
+            if job is not None and not job.finished:
+                st.progress(job.progress, text=f"{job.message}… ({job.elapsed:.0f}s)")
+                # poll: rerun the page until the job has finished
+                time.sleep(POLL_SECONDS)
+                st.rerun()
+            elif job is not None and job.state == DONE:
+                forecast, notes = job.result
+                for note in notes:
+                    st.info(note)
+                st.line_chart(forecast)
+            elif job is not None:
+                st.error(f"Forecast failed: {job.message}")
+
     if sub == "Recommendations":
         st.subheader("Recommendations")
         st.write("(Use your recommender module to show best/worst crops per state)")